@@ -4,7 +4,8 @@ import multiprocessing as mp
 import os
 from pprint import pp
 
-from openfilter.filter_runtime.filter import Filter, PROP_EXIT_FLAGS, PROP_EXIT, OBEY_EXIT
+from openfilter.filter_runtime.filter import Filter, PROP_EXIT_FLAGS, PROP_EXIT, OBEY_EXIT, RUNNER_MODES, RUNNER_MODE, \
+    RESTART_FLAGS, RUNNER_RESTART, RUNNER_PLACEMENTS, RUNNER_PLACEMENT
 from openfilter.filter_runtime.utils import dict_without
 
 from .common import SCRIPT, parse_filters
@@ -25,7 +26,7 @@ def cmd_run(args):
     opts   = args[:idx]
     parser = argparse.ArgumentParser(prog=f'{SCRIPT} run', formatter_class=argparse.RawTextHelpFormatter,
         usage=f"""
-usage: {SCRIPT} run [-h] [--ipc] [-s] [-f] [-p {{all,clean,error,none}}] [-o {{all,clean,error,none}}] [--dry] FILTER [FILTER ...]
+usage: {SCRIPT} run [-h] [--ipc] [-s] [-f] [--fuse] [-m {{process,forkserver,thread}}] [-r {{never,on-error,always}}] [-p {{all,clean,error,none}}] [-o {{all,clean,error,none}}] [--dry] FILTER [FILTER ...]
         """.strip(),
         description="""
 Run one or more Filters.
@@ -43,6 +44,15 @@ examples:
       autochain filters:
     {SCRIPT} run - VideoIn --sources file://video.mp4 - Webvis
 
+  Run a whole chain in a single process passing frames directly between filters:
+    {SCRIPT} run --fuse - VideoIn --sources file://video.mp4 - Util --xforms 'resize 640x360' - Webvis
+
+  Run all Filters as threads in this process for fast startup and low memory:
+    {SCRIPT} run -m thread - VideoIn --sources file://video.mp4 - Webvis
+
+  Restart a crashing filter automatically (up to RUNNER_MAX_RESTARTS times) instead of stopping everything:
+    {SCRIPT} run -r on-error - VideoIn --sources rtsp://camera - Webvis
+
   Connect via ids:
     {SCRIPT} run - VideoIn --id myvideo --sources file://video.mp4 - webvis --sources myvideo
       autogenerated id:
@@ -65,6 +75,28 @@ notes:
         action = 'store_true',
         help   = "run Filters using 'fork' method instead of 'spawn', doesn't work with CUDA",
     )
+    parser.add_argument('--fuse',
+        action = 'store_true',
+        help   = 'run all Filters fused in a single process, passing frames between them by reference',
+    )
+    parser.add_argument('-m', '--mode',
+        type    = str,
+        default = RUNNER_MODE,
+        choices = list(RUNNER_MODES),
+        help    = "run Filters as processes, processes from a preloaded 'forkserver' or threads (default: %(default)s)",
+    )
+    parser.add_argument('-r', '--restart',
+        type    = str,
+        default = RUNNER_RESTART,
+        choices = list(RESTART_FLAGS),
+        help    = 'restart Filters which exit with error or at all, with exponential backoff (default: %(default)s)',
+    )
+    parser.add_argument('--placement',
+        type    = str,
+        default = RUNNER_PLACEMENT,
+        choices = list(RUNNER_PLACEMENTS),
+        help    = "CPU placement of Filters, 'numa' keeps adjacent Filters on the same NUMA node (default: %(default)s)",
+    )
     parser.add_argument('-p', '--prop-exit',
         type    = str,
         default = PROP_EXIT,
@@ -92,20 +124,26 @@ notes:
 
     # run
 
-    if not opts.fork:
+    if not opts.fork and opts.mode == 'process':
         mp.set_start_method('spawn')
 
     if opts.solo and len(filters) > 1:
         raise ValueError("can only run a single Filter '--solo'")
+    if opts.solo and opts.fuse:
+        raise ValueError("can not use '--solo' and '--fuse' together")
 
     if opts.dry:
         for _, config, name in filters:
             print(f'\n{name}:\n{"-" * (len(name) + 1)}')
             pp(config)
 
+    elif opts.fuse:
+        Filter.run_fused([(cls, dict_without(config, '__env_compose')) for cls, config, _ in filters],
+            prop_exit=opts.prop_exit, obey_exit=opts.obey_exit)
     elif opts.solo:
         filters[0][0].run(dict_without(filters[0][1], '__env_compose'),
             prop_exit=opts.prop_exit, obey_exit=opts.obey_exit)
     else:
         Filter.run_multi([(cls, dict_without(config, '__env_compose')) for cls, config, _ in filters],
-            prop_exit=opts.prop_exit, obey_exit=opts.obey_exit)
+            prop_exit=opts.prop_exit, obey_exit=opts.obey_exit, mode=opts.mode, restart=opts.restart,
+            placement=opts.placement)
@@ -1,2 +1,3 @@
+from . import startup  # first, so that import profiling (if enabled) sees everything else
 from .filter import FilterConfig, Filter
 from .frame import Frame
@@ -0,0 +1,129 @@
+"""Size-keyed pool of image buffers to avoid allocating a new multi-megabyte ndarray for every frame. Buffers handed out
+are tracked by the pool and are considered returned as soon as nothing else references them anymore, including views
+of them, so a buffer is free for reuse once the Frame(s) holding it are dropped. No explicit release is needed and a
+leaked reference just means that buffer is not reused.
+
+The pool is per process, so every filter running in its own process has its own. Idle buffers are kept for reuse, so
+by default the pool only tracks as many buffers as a filter plausibly has in flight, FRAME_POOL_FRAMES times the largest
+buffer it has handed out, up to FRAME_POOL_SIZE. A filter at 720p then holds at most about 45MB while a 4K one hits
+the cap.
+
+Environment variables:
+    FRAME_POOL_SIZE: Maximum number of bytes the pool will track, 0 disables pooling. Default 256_000_000.
+
+    FRAME_POOL_FRAMES: The pool tracks at most this many times the bytes of the largest buffer it has handed out, up to
+        FRAME_POOL_SIZE. 0 for only the FRAME_POOL_SIZE limit. Default 16.
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from sys import getrefcount
+from threading import Lock
+from typing import Any
+
+import numpy as np
+from numpy import ndarray
+
+__all__ = ['BufferPool', 'buffer_pool']
+
+logger = logging.getLogger(__name__)
+
+FRAME_POOL_SIZE   = int(os.getenv('FRAME_POOL_SIZE') or 256_000_000)
+FRAME_POOL_FRAMES = int(os.getenv('FRAME_POOL_FRAMES') or 16)
+
+
+def _idle_refcount() -> int:  # refcount of a buffer seen from the scan loop when only the pool holds it
+    for buf in [np.empty(1)]:
+        return getrefcount(buf)
+
+IDLE_REFCOUNT = _idle_refcount()
+
+
+class BufferPool:
+    """Thread-safe pool of ndarrays keyed by (shape, dtype)."""
+
+    def __init__(self, max_bytes: int | None = None, max_frames: int | None = None):
+        self.max_bytes  = FRAME_POOL_SIZE if max_bytes is None else max_bytes
+        self.max_frames = FRAME_POOL_FRAMES if max_frames is None else max_frames
+        self.limit      = self.max_bytes if not self.max_frames else 0  # current byte limit, grows with largest buffer
+        self.bufs       = OrderedDict()  # {(shape, dtype): [ndarray, ...], ...} in LRU order
+        self.nbytes     = 0
+        self.hits       = 0
+        self.misses     = 0
+        self.lock       = Lock()
+
+    def empty(self, shape: tuple, dtype: Any = np.uint8) -> ndarray:
+        """Drop-in for np.empty(), returns a writable uninitialized buffer, reused if a free one is available."""
+
+        if not self.max_bytes:
+            return np.empty(shape, dtype)
+
+        key = (shape := tuple(shape), dtype := np.dtype(dtype))
+
+        with self.lock:
+            if (bufs := self.bufs.get(key)) is not None:
+                self.bufs.move_to_end(key)
+
+                for buf in bufs:
+                    if getrefcount(buf) == IDLE_REFCOUNT:
+                        self.hits += 1
+
+                        if not buf.flags.writeable:  # Frame marks readonly images as such
+                            buf.flags.writeable = True
+
+                        return buf
+
+            self.misses += 1
+            buf          = np.empty(shape, dtype)
+
+            if (nbytes := buf.nbytes) * self.max_frames > self.limit:
+                self.limit = min(self.max_bytes, nbytes * self.max_frames)
+
+            if self.nbytes + nbytes > self.limit and not self.trim(nbytes):
+                return buf  # untracked, just a normal allocation
+
+            if bufs is None:
+                self.bufs[key] = bufs = []
+
+            bufs.append(buf)
+
+            self.nbytes += nbytes
+
+        return buf
+
+    def trim(self, nbytes: int = 0) -> bool:
+        """Drop idle buffers, least recently used sizes first, until `nbytes` more would fit. Call with lock held."""
+
+        for key in list(self.bufs):
+            bufs = self.bufs[key]
+
+            for i in range(len(bufs) - 1, -1, -1):
+                if getrefcount(bufs[i]) == IDLE_REFCOUNT - 1:  # no loop variable here
+                    self.nbytes -= bufs.pop(i).nbytes
+
+            if not bufs:
+                del self.bufs[key]
+
+            if self.nbytes + nbytes <= self.limit:
+                return True
+
+        return False
+
+    def clear(self):
+        with self.lock:
+            self.bufs.clear()
+
+            self.nbytes = 0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            'hits':     (hits := self.hits),
+            'misses':   (misses := self.misses),
+            'hit_rate': hits / total if (total := hits + misses) else 0.,
+            'buffers':  sum(len(bufs) for bufs in self.bufs.values()),
+            'bytes':    self.nbytes,
+        }
+
+
+buffer_pool = BufferPool()
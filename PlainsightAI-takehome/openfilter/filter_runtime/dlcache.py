@@ -20,8 +20,6 @@ from base64 import b64encode
 from datetime import datetime
 from threading import Thread
 
-import requests
-
 from .utils import sanitize_pathname, FnmLock
 
 __all__ = ['is_cached_file', 'DLCache', 'dlcache']
@@ -52,6 +50,8 @@ class DLCache:
         return sanitize_pathname(os.path.normpath(os.path.join(self.cache_path, 'jfrog', dlcuri[8:])))
 
     def ensure(self, dlcuri: str, fnm: str) -> bool:
+        import requests  # only here, is slow to import and most filters never download anything
+
         file_exists = os.path.isfile(fnm)
 
         try:
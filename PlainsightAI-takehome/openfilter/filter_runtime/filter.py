@@ -2,19 +2,28 @@ import logging
 import multiprocessing as mp
 import os
 import re
+import signal
 import sys
 import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from multiprocessing import synchronize
-from time import time
+from multiprocessing.util import Finalize
+from queue import Queue, Empty, Full
+from time import perf_counter, time
 from typing import Any, Callable, Literal
 
 from .dlcache import is_cached_file, dlcache
 from .frame import Frame
 from .mq import POLL_TIMEOUT_MS, is_mq_addr, MQ
+from .zeromq import ZMQReceiver
 from .logging import Logger
+from .profiler import PROFILE_SIGNAL, SamplingProfiler
+from .startup import PROFILE_STARTUP, start_time, log_import_times
 from .utils import JSONType, json_getval, simpledeepcopy, dict_without, split_commas_maybe, rndstr, \
-    timestr, parse_time_interval, parse_date_and_or_time, hide_uri_users_and_pwds, \
+    sizestr, timestr, parse_time_interval, parse_date_and_or_time, hide_uri_users_and_pwds, \
     get_real_module_name, get_packages, get_package_version, set_env_vars, running_in_container, \
+    parse_cpu_list, numa_nodes, sanitize_filename, \
     adict, DaemonicTimer, SignalStopper
 
 __all__ = ['is_cached_file', 'is_mq_addr', 'FilterConfig', 'Filter']
@@ -51,15 +60,29 @@ logging.basicConfig(
     datefmt = '%Y-%m-%d %H:%M:%S',
 )
 
-LOOP_EXC         = bool(json_getval((os.getenv('LOOP_EXC') or 'true').lower()))
-PROP_EXIT        = (os.getenv('PROP_EXIT') or 'clean').lower()
-OBEY_EXIT        = (os.getenv('OBEY_EXIT') or 'all').lower()
-STOP_EXIT        = (os.getenv('STOP_EXIT') or 'error').lower()
-AUTO_DOWNLOAD    = bool(json_getval((os.getenv('AUTO_DOWNLOAD') or 'true').lower()))
-ENVIRONMENT      = os.getenv('ENVIRONMENT')
-
-PROP_EXIT_FLAGS  = {'all': 3, 'clean': 1, 'error': 2, 'none': 0}
-POLL_TIMEOUT_SEC = POLL_TIMEOUT_MS / 1000
+LOOP_EXC                   = bool(json_getval((os.getenv('LOOP_EXC') or 'true').lower()))
+PROP_EXIT                  = (os.getenv('PROP_EXIT') or 'clean').lower()
+OBEY_EXIT                  = (os.getenv('OBEY_EXIT') or 'all').lower()
+STOP_EXIT                  = (os.getenv('STOP_EXIT') or 'error').lower()
+RUNNER_MODE                = (os.getenv('RUNNER_MODE') or 'process').lower()
+RUNNER_RESTART             = (os.getenv('RUNNER_RESTART') or 'never').lower()
+RUNNER_MAX_RESTARTS        = int(os.getenv('RUNNER_MAX_RESTARTS') or 5)
+RUNNER_RESTART_BACKOFF     = float(os.getenv('RUNNER_RESTART_BACKOFF') or 1)
+RUNNER_RESTART_BACKOFF_MAX = float(os.getenv('RUNNER_RESTART_BACKOFF_MAX') or 60)
+RUNNER_RESTART_RESET       = float(os.getenv('RUNNER_RESTART_RESET') or 300)
+RUNNER_HEALTH_TIMEOUT      = float(os.getenv('RUNNER_HEALTH_TIMEOUT') or 0)
+RUNNER_PLACEMENT           = (os.getenv('RUNNER_PLACEMENT') or 'none').lower()
+FORKSERVER_PRELOAD         = [m for m in (os.getenv('FORKSERVER_PRELOAD') or 'numpy,cv2,zmq,openfilter.filter_runtime.filter').split(',') if m]
+AUTO_DOWNLOAD              = bool(json_getval((os.getenv('AUTO_DOWNLOAD') or 'true').lower()))
+ENVIRONMENT                = os.getenv('ENVIRONMENT')
+
+PROP_EXIT_FLAGS   = {'all': 3, 'clean': 1, 'error': 2, 'none': 0}
+RUNNER_MODES      = ('process', 'forkserver', 'thread')
+RUNNER_PLACEMENTS = ('none', 'numa')
+THREADS_ENV_VARS  = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+    'OPENCV_FOR_THREADS_NUM')
+RESTART_FLAGS     = {'never': 0, 'on-error': 2, 'always': 3}  # which exits (as in PROP_EXIT_FLAGS) cause a restart
+POLL_TIMEOUT_SEC  = POLL_TIMEOUT_MS / 1000
 
 if PROP_EXIT not in PROP_EXIT_FLAGS:
     raise ValueError(f'invalid PROP_EXIT {PROP_EXIT!r}, can only be one of: {", ".join(PROP_EXIT_FLAGS)}')
@@ -67,6 +90,14 @@ if OBEY_EXIT not in PROP_EXIT_FLAGS:
     raise ValueError(f'invalid OBEY_EXIT {OBEY_EXIT!r}, can only be one of: {", ".join(PROP_EXIT_FLAGS)}')
 if STOP_EXIT not in PROP_EXIT_FLAGS:
     raise ValueError(f'invalid STOP_EXIT {STOP_EXIT!r}, can only be one of: {", ".join(PROP_EXIT_FLAGS)}')
+if RUNNER_MODE not in RUNNER_MODES:
+    raise ValueError(f'invalid RUNNER_MODE {RUNNER_MODE!r}, can only be one of: {", ".join(RUNNER_MODES)}')
+if RUNNER_PLACEMENT not in RUNNER_PLACEMENTS:
+    raise ValueError(f'invalid RUNNER_PLACEMENT {RUNNER_PLACEMENT!r}, can only be one of: {", ".join(RUNNER_PLACEMENTS)}')
+if RUNNER_RESTART not in RESTART_FLAGS:
+    raise ValueError(f'invalid RUNNER_RESTART {RUNNER_RESTART!r}, can only be one of: {", ".join(RESTART_FLAGS)}')
+
+profiler_lock = threading.Lock()  # Filter.profile() may be called from the signal handler and the out-of-band thread
 
 
 class FilterConfig(adict):  # types are informative to you as in the end they're all just adicts, maybe in future do something with them (defaults, coercion and/or validation)
@@ -83,9 +114,19 @@ class FilterConfig(adict):  # types are informative to you as in the end they're
     outputs_required:    str | None
     outputs_metrics:     str | bool | None
     outputs_jpg:         bool | None
+    outputs_crops:       bool | None
+    outputs_dedup:       bool | None
 
     exit_after:          float | str | None  # '[[[days:]hrs:]mins:]secs[.subsecs]' or '@date/time/datetime'
 
+    pipeline:            bool | int | None
+    workers:             int | None
+    workers_mode:        str | None  # 'thread' or 'process'
+
+    cpu_affinity:        str | list[int] | None  # '0-3,8' or [0, 1, 2, 3, 8]
+    numa_node:           int | None
+    threads:             int | None
+
     environment:         str | None
     log_path:            str | Literal[False] | None
     metrics_interval:    float | None
@@ -159,6 +200,51 @@ class Filter:
             process() as such, None uses env var default which is normally to pass them on as they are returned from
             process(). Global env var default ZMQ_LOW_LATENCY. Gloval env var default OUTPUTS_JPG.
 
+        outputs_crops:
+            Whether to send Frame crops (from `Frame.crop()`) which go out on the same message as their parent Frame as
+            references into the parent image instead of as separately encoded images. Every downstream filter must then
+            receive the parent topic as well. None uses env var default OUTPUTS_CROPS which is normally False.
+
+        outputs_dedup:
+            Whether to send an image which is identical to the previous one sent on the same topic as a small "same as
+            previous" marker instead of the whole image, for static scenes. Only safe if every receiver gets every
+            message (no ephemeral listeners), so can not be used with `outputs_balance`. None uses env var default
+            OUTPUTS_DEDUP which is normally False (and is not applied to balanced outputs).
+
+        pipeline:
+            If set then receive, process() and send run in three separate threads connected by bounded queues so that
+            process() can run while waiting for downstream to request the previous result and upstream to deliver the
+            next. True means queue depth 1, an int sets the depth. Message order and ids are preserved. process() still
+            runs in the main thread. Default None is the plain sequential loop.
+
+        workers:
+            Run process() in this many workers in parallel (implies `pipeline`). Consecutive messages are handed out to
+            free workers in order and results are sent in the original message order. In 'thread' mode process() must
+            be thread-safe. In 'process' mode each worker process creates its own instance of the filter and calls
+            setup() on it, frames are pickled to and from the workers and process() can not return a Callable, the
+            'process' timings then cover the whole round trip to the worker. Default None or 1 means process() runs in
+            the main thread.
+
+        workers_mode:
+            Either 'thread' (default) or 'process'.
+
+        cpu_affinity:
+            Pin the filter to these CPUs, as a list of ints or a string like '0-3,8'. Applied before anything else is
+            started so that all the filter's threads and child processes inherit it. In Runner 'thread' mode only
+            threads started by the filter get it. Default None is no pinning.
+
+        numa_node:
+            Pin the filter to the CPUs of this NUMA node (intersected with `cpu_affinity` if both given). Memory is not
+            bound explicitly but Linux allocates it on the node of the CPU which first touches it so most of it will
+            end up local. Default None.
+
+        threads:
+            Cap the size of the thread pools of OpenCV, OpenMP, MKL, OpenBLAS and numexpr to this many threads, to
+            avoid oversubscribing CPUs when many filters run on one machine. Libraries which are already loaded when
+            the filter starts only see this if the filter is started by the Runner (which sets the environment variables
+            for the child), except for OpenCV which is set directly. Ignored with a warning for filters running in a
+            Runner 'thread' mode since all of this is process-global. Default None leaves the library defaults.
+
         exit_after:
             Exit after this amount of time in seconds or as a formatted string '[[[days[d]:]hrs:]mins:]secs[.subsecs]'.
             If the `exit_after` string starts with '@' then this sets an actual clock date/time to exit at (in local
@@ -216,6 +302,46 @@ class Filter:
         STOP_EXIT:
             Multi-filter Runner exit policy, can be 'all', 'error', 'clean', or 'none'. Default 'error'.
 
+        RUNNER_MODE:
+            How the multi-filter Runner hosts filters, 'process' (a process per filter using the current start method),
+            'forkserver' (a process per filter forked from a server which has already imported FORKSERVER_PRELOAD and
+            the filters' modules) or 'thread' (all filters as threads in this process). Default 'process'.
+
+        FORKSERVER_PRELOAD:
+            Comma separated list of modules the forkserver imports once up front for RUNNER_MODE 'forkserver'. Default
+            'numpy,cv2,zmq,openfilter.filter_runtime.filter'.
+
+        RUNNER_RESTART:
+            Default multi-filter Runner restart policy for exited filters, 'never', 'on-error' or 'always'. Default
+            'never'.
+
+        RUNNER_MAX_RESTARTS:
+            Maximum number of times the Runner will restart any one filter, negative for unlimited. Default 5.
+
+        RUNNER_RESTART_BACKOFF:
+            Seconds to wait before the first restart of a filter, doubles with each further restart of that filter.
+            Default 1.
+
+        RUNNER_RESTART_BACKOFF_MAX:
+            Maximum seconds to wait before a restart. Default 60.
+
+        RUNNER_RESTART_RESET:
+            Seconds a restarted filter must keep running (and healthy) for its restart count to be reset, so that
+            RUNNER_MAX_RESTARTS and the backoff apply to crashes in close succession and not over the lifetime of the
+            Runner. 0 to never reset. Default 300.
+
+        RUNNER_HEALTH_TIMEOUT:
+            If the loop of a filter running under the Runner has not come around in this many seconds, i.e. it is stuck
+            in process() or setup, then it is considered unhealthy and is stopped (and then killed if it doesn't stop)
+            so that it may be restarted according to the restart policy as if it had errored. Waiting for frames from
+            sources or for outputs to accept them is not unhealthy, so idle filters (e.g. downstream of a stalled
+            source or a VideoIn which is reconnecting) are left alone. 0 to turn off. Default 0.
+
+        RUNNER_PLACEMENT:
+            Default multi-filter Runner CPU placement, 'none' or 'numa'. In 'numa' mode filters which don't specify
+            their own `numa_node` or `cpu_affinity` are spread over the NUMA nodes in contiguous runs in the order given
+            (which for a chain is pipeline order) so that adjacent stages share a node. Default 'none'.
+
         AUTO_DOWNLOAD:
             Automatically download "jfrog://..." resources in configs and replace names with cached "file://..." URIs.
             Default True.
@@ -244,6 +370,20 @@ class Filter:
             If 'true'ish then encode output images to network as jpg, 'false'ish only send decoded, 'null' send as is as
             was passed from process().
 
+        OUTPUTS_JPG_THREADS:
+            Number of threads for parallel jpg encoding of output images, also started as soon as process() returns.
+            0 encodes serially at send time. Default 4.
+
+        OUTPUTS_CROPS:
+            If 'true'ish then send crops on the same message as their parent as references into the parent image.
+
+        OUTPUTS_DEDUP:
+            If 'true'ish then send images identical to the previous one on the same topic as a "same as previous" marker.
+
+        OUTPUTS_DEDUP_REFRESH:
+            With dedup, send the full image anyway after this many consecutive "same" markers, and always to a new or
+            reconnected receiver, so receivers resync. 0 for never. Default 100.
+
         OUTPUTS_METRICS:
             If true then send metrics as '_metrics' on all zeromq outputs. If false then don't send. If string then is
             address of dedicated sender for metrics (will not be sent on normal senders).
@@ -270,6 +410,43 @@ class Filter:
         CPU_METRICS_INTERVAL:
             Default number of seconds between poll of CPU and memory metrics.
 
+    From bufpool.py:
+        FRAME_POOL_SIZE:
+            Maximum number of bytes of image buffers the frame buffer pool will track for reuse, 0 disables pooling.
+            The pool is per process so this is per filter, except for filters in Runner 'thread' mode which share one.
+            Default 256_000_000.
+
+        FRAME_POOL_FRAMES:
+            The frame buffer pool tracks at most this many times the bytes of the largest buffer it has handed out (up to
+            FRAME_POOL_SIZE), so that idle retention scales with the image size in use. 0 for only FRAME_POOL_SIZE.
+            Default 16.
+
+    From startup.py:
+        OPENFILTER_PROFILE_STARTUP:
+            If 'true'ish then time all module imports and have each filter log the slowest ones along with the time to
+            its first frame received and sent.
+
+        OPENFILTER_PROFILE_STARTUP_TOP:
+            Number of slowest imports to log. Default 20.
+
+    From profiler.py:
+        FILTER_TIMINGS:
+            If 'true'ish then keep timing histograms of receive wait, process() and send wait per loop and report their
+            50th and 99th percentiles in milliseconds in metrics as 'recv_p50', 'process_p99', etc... Default true.
+
+        FILTER_TIMINGS_WINDOW:
+            Seconds per timing histogram window, percentiles cover between one and two windows. Default 10.
+
+        PROFILE_SIGNAL:
+            Signal which starts the sampling profiler in a running filter (see Filter.profile()), 'none' to not hook
+            any. Only hooked when the filter runs in the main thread of its process. Default 'SIGUSR2'.
+
+        PROFILE_DURATION:
+            Default seconds to run the sampling profiler for. Default 10.
+
+        PROFILE_INTERVAL:
+            Seconds between sampling profiler stack samples. Default 0.005.
+
     From dlcache.py:
         JFROG_API_KEY:
             The JFrog API key, will be deprecated by evil JFrog people at end of September 2024, use JFROG_TOKEN
@@ -338,6 +515,12 @@ class Filter:
 
     FILTER_TYPE = 'User'
 
+    RECONFIGURABLE: tuple[str, ...] = ()  # config fields which may be changed at runtime, see reconfigure()
+
+    heartbeat = None  # shared 'd' Value set by the Runner to watch loop liveness for health, see beat()
+    timings   = None  # Timings histograms of recv / process / send if kept, set up in init()
+    profiler  = None  # sampling profiler Thread while running, see profile()
+
     @property
     def metrics(self) -> dict[str, JSONType]:
         return self.mq.metrics
@@ -400,6 +583,192 @@ class Filter:
 
         raise exc or Filter.Exit
 
+    def request_reconfigure(self, changes: dict[str, Any]):
+        """Request a change of `changes` config fields at runtime, can be called from any thread. Will be applied from the
+        main loop before the next message is received, see reconfigure(). Also called for out-of-band messages of the
+        form {'reconfigure': {field: value, ...}, 'id': optional filter id} from upstream or downstream."""
+
+        if not isinstance(changes, dict):
+            logger.error(f'reconfigure rejected, expected a dict of config fields, not {changes!r}')
+        else:
+            self.reconfigs.append(changes)
+
+    def apply_reconfigure(self, changes: dict[str, Any]) -> bool:
+        """Validate and apply `changes` to the running filter. A failed or rejected reconfigure is logged and leaves the
+        filter running with its old config."""
+
+        if bad := [k for k in changes if k not in self.RECONFIGURABLE]:
+            logger.error(f'reconfigure rejected, not reconfigurable: {", ".join(map(repr, bad))}')
+
+            return False
+
+        try:
+            config = self.normalize_config(FilterConfig({**self.config, **simpledeepcopy(changes)}))
+
+            self.reconfigure(config)
+
+        except Exception as exc:
+            logger.error(f'reconfigure failed: {exc}')
+
+            return False
+
+        self.config = config
+
+        logger.info(f'reconfigured: {changes}')
+
+        return True
+
+    @staticmethod
+    def send_reconfigure(addr: str, changes: dict[str, Any], id: str | None = None, timeout: float = 5) -> bool:
+        """Send a reconfigure request out-of-band to the running filter which outputs on `addr`, e.g.
+        "tcp://localhost:5550". If `id` is given then only a filter with that id will apply it. Connects as an ephemeral
+        receiver and waits for the filter to show up, returns False if it did not do so within `timeout` seconds."""
+
+        return Filter.send_oob_msg(addr, {'reconfigure': changes, **({} if id is None else {'id': id})}, timeout)
+
+    @staticmethod
+    def send_profile(addr: str, duration: float | None = None, id: str | None = None, timeout: float = 5) -> bool:
+        """Start the sampling profiler for `duration` seconds (None for the filter's default) in the running filter
+        which outputs on `addr`, see profile(). Otherwise same as send_reconfigure()."""
+
+        return Filter.send_oob_msg(addr, {'profile': duration, **({} if id is None else {'id': id})}, timeout)
+
+    @staticmethod
+    def send_oob_msg(addr: str, msg: dict[str, Any], timeout: float = 5) -> bool:
+        """Send an out-of-band message dict to the running filter which outputs on `addr`, False if it didn't show up
+        within `timeout` seconds."""
+
+        receiver = ZMQReceiver(addr.rstrip('?') + '?')
+        until_t  = time() + timeout
+
+        try:
+            while not any(sender.conn for sender in receiver.senders.values()):
+                if time() >= until_t:
+                    return False
+
+                receiver.recv(timeout=POLL_TIMEOUT_MS)
+
+            receiver.send_oob([msg])
+
+        finally:
+            receiver.destroy()
+
+        return True
+
+    def profile(self, duration: float | None = None) -> bool:
+        """Run the sampling profiler in the background for `duration` seconds (None means PROFILE_DURATION) and write
+        the collapsed stacks of all threads of this process to '{log_path}/{id}/profile/'. Safe to call from any thread
+        or a signal handler, also triggered by PROFILE_SIGNAL or out-of-band by send_profile(). Returns False if not
+        started because already running or logging to files is off."""
+
+        if not profiler_lock.acquire(False):  # not blocking, a signal handler may have interrupted the holder
+            logger.warning('profiler already starting')
+
+            return False
+
+        try:
+            if (profiler := self.profiler) is not None and profiler.is_alive():
+                logger.warning('profiler already running')
+
+                return False
+
+            if (log_path := self.logger.log_path) is False:
+                logger.error('can not profile without a log_path')
+
+                return False
+
+            if duration is not None and (isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration <= 0):
+                logger.error(f'invalid profile duration {duration!r}')
+
+                return False
+
+            profiler      = SamplingProfiler(os.path.join(log_path, sanitize_filename(self.config.id), 'profile'))
+            self.profiler = threading.Thread(target=profiler.run, args=(duration,), name='profiler', daemon=True)
+
+            self.profiler.start()
+
+            return True
+
+        finally:
+            profiler_lock.release()
+
+    @staticmethod
+    def threads_env(threads: int | None) -> dict[str, str]:
+        """Environment variables which cap library thread pools to `threads` when set before the library is loaded."""
+
+        return {} if threads is None else {var: str(threads) for var in THREADS_ENV_VARS}
+
+    def apply_cpu_config(self, config: FilterConfig):
+        """Apply `cpu_affinity`, `numa_node` and `threads` to this process (or this thread if not the main thread)."""
+
+        cpus = None
+
+        if (numa_node := config.numa_node) is not None:
+            if (cpus := numa_nodes().get(numa_node)) is None:
+                logger.warning(f'NUMA node {numa_node} not found, not pinning to it')
+            else:
+                cpus = set(cpus)
+
+        if (cpu_affinity := config.cpu_affinity) is not None:
+            cpus = set(cpu_affinity) if cpus is None else cpus & set(cpu_affinity)
+
+        if cpus is not None:
+            if not cpus:
+                raise ValueError(f'cpu_affinity {cpu_affinity} has no CPUs on NUMA node {numa_node}')
+
+            if not hasattr(os, 'sched_setaffinity'):
+                logger.warning('cpu_affinity not supported on this platform')
+            else:
+                os.sched_setaffinity(0, cpus)  # 0 is the calling thread on Linux, which is the process if main thread
+
+                logger.info(f'cpu affinity: {", ".join(map(str, sorted(cpus)))}')
+
+        if (threads := config.threads) is not None:
+            if threading.current_thread() is not threading.main_thread():  # environment and OpenCV are process-global, don't change them for other filters
+                logger.warning(f'threads={threads} only applies to a filter running in its own process, ignoring')
+
+            else:
+                os.environ.update(self.threads_env(threads))
+
+                if (cv2 := sys.modules.get('cv2')) is not None:  # we don't import it just for this
+                    cv2.setNumThreads(threads)
+
+    def log_startup(self):
+        """Log time since start of this filter's process (or thread if running in a Runner thread, where startup of the
+        process would not be ours) and RSS of the process. RSS only if psutil is already loaded for metrics or if
+        profiling startup, in which case also log import times and arm logging of time to first frame in and out."""
+
+        if PROFILE_STARTUP:
+            import psutil
+
+        start_t = start_time()
+        rss     = '' if (psutil := sys.modules.get('psutil')) is None else \
+            f', {"rss" if threading.current_thread() is threading.main_thread() else "process rss"} ' \
+            f'{sizestr(psutil.Process().memory_info().rss)}'
+
+        logger.info(f'started in {time() - start_t:.3f}s{rss}')
+
+        if PROFILE_STARTUP:
+            log_import_times()
+
+            def first(name: str, what: str, got: Callable[[Any, tuple], bool]):  # wrap mq method once to log first frame
+                func = getattr(mq, name)
+
+                def wrapper(*args, **kwargs):
+                    if got(res := func(*args, **kwargs), args):
+                        del mq.__dict__[name]  # back to normal unwrapped method
+
+                        logger.info(f'first frame {what} {time() - start_t:.3f}s after start')
+
+                    return res
+
+                setattr(mq, name, wrapper)
+
+            if (mq := self.mq).receiver is not None:
+                first('recv', 'received', lambda res, args: bool(res[0] if isinstance(res, tuple) else res))
+
+            first('send', 'sent', lambda res, args: res and bool(args and args[0]))
+
     @staticmethod
     def download_cached_files(config: FilterConfig):
         """Downloads or updates files specified in the config as "jfrog://...", or other download sources, and replaces
@@ -497,10 +866,191 @@ class Filter:
 
     # - FOR VERY SPECIAL SUBCLASS --------------------------------------------------------------------------------------
 
+    def pipe_running(self) -> bool:
+        return not (self.stop_evt.is_set() or self.pipe_stop_evt.is_set())
+
+    def pipe_put(self, queue: Queue, item: Any) -> bool:
+        """Put to a pipeline queue, False if stopped while waiting."""
+
+        while True:
+            try:
+                queue.put(item, timeout=POLL_TIMEOUT_SEC)
+
+                return True
+
+            except Full:
+                if not self.pipe_running():
+                    return False
+
+    def pipe_get(self, queue: Queue, beat: bool = False) -> Any:
+        """Get from a pipeline queue, None if stopped while waiting. If `beat` then waiting counts as alive for health."""
+
+        while True:
+            try:
+                return queue.get(timeout=POLL_TIMEOUT_SEC)
+
+            except Empty:
+                if not self.pipe_running():
+                    return None
+
+                if beat:
+                    self.beat()
+
+    def pipe_recv(self):
+        """Pipelined receive thread, puts (frames, send state) or an Exception to be raised in the main loop."""
+
+        recv_queue = self.pipe_queues[0]
+        timings    = self.timings
+
+        while self.pipe_running():
+            try:
+                sources_timeout = self.sources_timeout
+                t               = perf_counter()
+
+                while (res := self.mq.recv(min(POLL_TIMEOUT_MS, sources_timeout), pipelined=True)) is None:
+                    if not self.pipe_running():
+                        return
+
+                    if (sources_timeout := sources_timeout - POLL_TIMEOUT_MS) <= 0:
+                        res = ({}, None)
+
+                        break
+
+                if timings is not None:
+                    timings.add('recv', perf_counter() - t)
+
+            except Exception as exc:
+                res = exc
+
+            if not self.pipe_put(recv_queue, res):
+                return
+
+    def pipe_send(self):
+        """Pipelined send thread, exceptions are passed to the main loop to be raised there."""
+
+        send_queue = self.pipe_queues[1]
+        timings    = self.timings
+
+        while (item := self.pipe_get(send_queue)) is not None:
+            frames, state   = item
+            outputs_timeout = self.outputs_timeout
+
+            if isinstance(frames, Future):  # from worker, waiting in queue order is what keeps output in message order
+                try:
+                    frames = frames.result()
+                except BaseException as exc:  # includes Filter.Exit from process()
+                    self.pipe_excs.append(exc)
+
+                    continue
+
+            try:
+                t = perf_counter()
+
+                while not self.mq.send(frames, min(POLL_TIMEOUT_MS, outputs_timeout), state):
+                    if not self.pipe_running():
+                        return
+
+                    self.beat()  # waiting for outputs
+
+                    if (outputs_timeout := outputs_timeout - POLL_TIMEOUT_MS) <= 0:
+                        break
+
+                if timings is not None:
+                    timings.add('send', perf_counter() - t)
+
+            except Exception as exc:
+                self.pipe_excs.append(exc)
+
+    @staticmethod
+    def worker_init(cls: type['Filter'], config: FilterConfig):
+        """Create and set up this worker process' own instance of the filter."""
+
+        Filter.worker_filter = filter = cls(FilterConfig({**config, 'log_path': False}))
+
+        filter.setup(filter.config)
+
+        Finalize(filter, filter.shutdown, exitpriority=10)
+
+    @staticmethod
+    def worker_process(frames: dict[str, Frame]) -> dict[str, Frame] | None:
+        if callable(frames := Filter.worker_filter.process_frames(frames)):
+            raise ValueError('process() can not return a Callable when running in worker processes')
+
+        return frames
+
+    def start_pipeline(self):
+        self.pipe_queues  = (Queue(self.pipe_depth), Queue(self.pipe_depth + self.workers))
+        self.pipe_excs    = []
+        self.pipe_workers = None if self.workers <= 1 else \
+            ThreadPoolExecutor(self.workers, thread_name_prefix='worker') if self.config.workers_mode != 'process' else \
+            ProcessPoolExecutor(self.workers, mp.get_context('spawn'), Filter.worker_init, (self.__class__, self.config))
+        self.pipe_threads = [threading.Thread(target=self.pipe_recv, name='pipe_recv', daemon=True),
+            threading.Thread(target=self.pipe_send, name='pipe_send', daemon=True)]
+
+        for thread in self.pipe_threads:
+            thread.start()
+
+    def stop_pipeline(self):
+        """Stop pipeline threads if running, any frames in flight are dropped."""
+
+        if self.pipe_threads:
+            self.pipe_stop_evt.set()
+
+            for thread in self.pipe_threads:
+                thread.join()
+
+            if self.pipe_workers is not None:
+                self.pipe_workers.shutdown(cancel_futures=True)
+
+            self.pipe_threads = None
+
+    def loop_once_pipelined(self) -> None:
+        """Process stage of pipelined loop, receive and send are done in their own threads."""
+
+        if self.pipe_threads is None:
+            self.start_pipeline()
+
+        if excs := self.pipe_excs:
+            raise excs.pop(0)
+
+        if (item := self.pipe_get(self.pipe_queues[0], True)) is None:  # waiting for sources
+            self.exit()
+
+        if isinstance(item, Exception):
+            raise item
+
+        frames, state = item
+
+        if (workers := self.pipe_workers) is None:
+            frames = self.process_frames(frames)
+        elif isinstance(workers, ThreadPoolExecutor):
+            frames = workers.submit(self.process_frames, frames)
+
+        else:  # process() is timed in the worker process where we don't see it, time from submit to result instead
+            t      = perf_counter()
+            frames = workers.submit(Filter.worker_process, frames)
+
+            if (timings := self.timings) is not None:
+                frames.add_done_callback(lambda f: f.cancelled() or timings.add('process', perf_counter() - t))
+
+        if not self.pipe_put(self.pipe_queues[1], (frames, state)):
+            self.exit()
+
+        if (exit_after_t := self.exit_after_t) is not None and time() >= exit_after_t:
+            self.exit('exit_after')
+
     def process_frames(self, frames: dict[str, Frame]) -> dict[str, Frame] | Callable[[], dict[str, Frame] | None] | None:
         """Call process() and deal with it if returns a Callable."""
 
-        if (frames := self.process(frames)) is None:
+        if (timings := self.timings) is None:
+            frames = self.process(frames)
+        else:
+            t      = perf_counter()
+            frames = self.process(frames)
+
+            timings.add('process', perf_counter() - t)
+
+        if frames is None:
             return None
 
         if callable(frames):
@@ -508,30 +1058,67 @@ class Filter:
         else:
             return {'main': frames} if isinstance(frames, Frame) else frames
 
+    def beat(self) -> None:
+        """Update heartbeat for Runner health checks. Called every loop iteration and while waiting on sources or
+        outputs but never from inside process(), so it is a hung process() which goes stale and not an idle filter."""
+
+        if (heartbeat := self.heartbeat) is not None:
+            heartbeat.value = time()
+
+    def loop_housekeeping(self) -> None:
+        """Per loop iteration work outside of recv / process / send, apply requested reconfigures and update heartbeat.
+        Called by loop_once() and by run_fused() for each fused filter."""
+
+        while self.reconfigs:
+            self.apply_reconfigure(self.reconfigs.popleft())
+
+        self.beat()
+
     def loop_once(self) -> None:
         """Loop twice."""
 
+        self.loop_housekeeping()
+
+        if self.pipe_depth:
+            return self.loop_once_pipelined()
+
         sources_timeout = self.sources_timeout
         outputs_timeout = self.outputs_timeout
+        timings         = self.timings
+        t               = perf_counter()
 
         while (frames := self.mq.recv(min(POLL_TIMEOUT_MS, sources_timeout))) is None:
             if self.stop_evt.is_set():
                 self.exit()
 
+            self.beat()
+
             if (sources_timeout := sources_timeout - POLL_TIMEOUT_MS) <= 0:
                 frames = {}
 
                 break
 
+        if timings is not None:
+            timings.add('recv', perf_counter() - t)
+
         frames = self.process_frames(frames)
 
+        self.mq.prefetch_jpgs(frames)
+
+        t = perf_counter()
+
         while not self.mq.send(frames, min(POLL_TIMEOUT_MS, outputs_timeout)):
             if self.stop_evt.is_set():
                 self.exit()
 
+            self.beat()
+
             if (outputs_timeout := outputs_timeout - POLL_TIMEOUT_MS) <= 0:
                 break
 
+        if timings is not None:
+            timings.add('send', perf_counter() - t)
+
         if (exit_after_t := self.exit_after_t) is not None and time() >= exit_after_t:
             self.exit('exit_after')
 
@@ -596,13 +1183,25 @@ class Filter:
             outs_balance  = bool(config.outputs_balance),
             outs_required = config.outputs_required,
             outs_jpg      = config.outputs_jpg,
+            outs_crops    = config.outputs_crops,
+            outs_dedup    = config.outputs_dedup,
             outs_metrics  = config.outputs_metrics,
             metrics_cb    = self.logger.write_metrics if self.logger.enabled else None,
             on_exit_msg   = on_exit_msg,
+            on_reconfig   = self.request_reconfigure,
+            on_profile    = self.profile,
             mq_log        = config.mq_log,
             mq_msgid_sync = config.mq_msgid_sync,
         )
 
+        self.workers       = config.workers or 1
+        self.pipe_depth    = 0 if not (pipeline := config.pipeline) else 1 if pipeline is True else pipeline
+        self.pipe_depth    = max(self.pipe_depth, self.workers > 1)
+        self.pipe_threads  = None
+        self.pipe_stop_evt = threading.Event()
+        self.reconfigs     = deque()  # [{field: value, ...}, ...] requested from other threads, applied by loop_once()
+        self.timings       = self.mq.timings
+
     def fini(self):
         """Shut down inter-filter communication and any other system level stuff."""
 
@@ -636,6 +1235,30 @@ class Filter:
             elif not isinstance(extra_metrics, dict):
                 raise ValueError(f'invalid extra_metrics {extra_metrics!r}, must be list or dict of key/value pairs')
 
+        if config.outputs_dedup and config.outputs_balance:
+            raise ValueError('outputs_dedup can not be used with outputs_balance')
+
+        if (pipeline := config.pipeline) is not None and not isinstance(pipeline, bool) and \
+                (not isinstance(pipeline, int) or pipeline < 0):
+            raise ValueError(f'invalid pipeline {pipeline!r}, must be a bool or a non-negative int')
+        if (workers := config.workers) is not None and (isinstance(workers, bool) or not isinstance(workers, int) or workers < 1):
+            raise ValueError(f'invalid workers {workers!r}, must be a positive int')
+        if (workers_mode := config.workers_mode) not in (None, 'thread', 'process'):
+            raise ValueError(f"invalid workers_mode {workers_mode!r}, must be 'thread' or 'process'")
+
+        if (cpu_affinity := config.cpu_affinity) is not None:
+            try:
+                config.cpu_affinity = parse_cpu_list(cpu_affinity)
+            except Exception:
+                raise ValueError(f"invalid cpu_affinity {cpu_affinity!r}, must be a list of ints or a str like '0-3,8'")
+
+        if (numa_node := config.numa_node) is not None and (isinstance(numa_node, bool) or
+                not isinstance(numa_node, int) or numa_node < 0):
+            raise ValueError(f'invalid numa_node {numa_node!r}, must be a non-negative int')
+        if (threads := config.threads) is not None and (isinstance(threads, bool) or not isinstance(threads, int) or
+                threads < 1):
+            raise ValueError(f'invalid threads {threads!r}, must be a positive int')
+
         if (mq_log := config.mq_log) is not None:
             if (new_mq_log := MQ.LOG_MAP.get(mq_log)) is None:
                 raise ValueError(f'invalid mq_log {mq_log!r}, must be one of {list(MQ.LOG_MAP)}')
@@ -651,6 +1274,13 @@ class Filter:
     def shutdown(self) -> None:
         """Clean up resources used."""
 
+    def reconfigure(self, config: FilterConfig) -> None:
+        """Change the running filter to the new `config` without restarting, called from the main loop between process()
+        calls. Only called if all the fields being changed are listed in the class RECONFIGURABLE tuple, which is how a
+        filter opts in per field. `config` is the full new config already passed through normalize_config(), while
+        self.config is still the old one until this returns. Raise to reject the change. With `workers_mode` 'process'
+        only the main instance is reconfigured, not the worker copies."""
+
     def process(self, frames: dict[str, Frame]) -> dict[str, Frame] | Frame | Callable[[], dict[str, Frame] | Frame | None] | None:
         """Main processing thingy, this is the only method which MUST be implemented by a user Filter.
 
@@ -701,6 +1331,7 @@ class Filter:
         obey_exit: str | None = None,
         stop_evt:  threading.Event | synchronize.Event | None = None,
         sig_stop:  bool = True,
+        heartbeat: Any | None = None,
     ):
         """Instantiate and this filter standalone until it exits or raises an exception.
 
@@ -718,6 +1349,9 @@ class Filter:
 
             sig_stop: Whether to hook signals SIGINT and SIGTERM to do clean exit, can not hook in non-main thread.
                 This is a terminal stopper, if it is triggered it WILL eventually kill the process.
+
+            heartbeat: Shared multiprocessing 'd' Value (or anything with a `.value`) which will be kept updated with the
+                last time the loop of this filter was seen alive, used by the Runner for health checks, see beat().
         """
 
         if sig_stop:
@@ -739,6 +1373,13 @@ class Filter:
 
             filter = cls(config, stop_evt, obey_exit)  # will call .start_logging()
 
+            filter.heartbeat = heartbeat
+
+            filter.apply_cpu_config(filter.config)
+
+            if PROFILE_SIGNAL is not None and threading.current_thread() is threading.main_thread():
+                signal.signal(PROFILE_SIGNAL, lambda signum, frame: filter.profile())
+
             try:
                 loop_exc  = Filter.YesLoopException if (LOOP_EXC if loop_exc is None else loop_exc) else Exception
                 prop_exit = PROP_EXIT_FLAGS[PROP_EXIT if prop_exit is None else prop_exit]
@@ -748,6 +1389,10 @@ class Filter:
                 try:
                     try:
                         filter.setup(filter.config)
+                        filter.log_startup()
+
+                        if heartbeat is not None:
+                            heartbeat.value = time()  # health checks start now, not counting setup time
 
                         try:
                             while not stop_evt.is_set():
@@ -757,6 +1402,7 @@ class Filter:
                                     logger.error(exc)
 
                         finally:
+                            filter.stop_pipeline()
                             filter.shutdown()
 
                     finally:
@@ -787,18 +1433,23 @@ class Filter:
 
     @staticmethod
     def run_multi(
-        filters:   list[tuple['Filter', dict[str, Any]]],
+        filters:        list[tuple['Filter', dict[str, Any]]],
         *,
-        loop_exc:  bool | None = None,
-        prop_exit: str | None = None,
-        obey_exit: str | None = None,
-        stop_exit: str | None = None,
-        stop_evt:  threading.Event | synchronize.Event | None = None,
-        sig_stop:  bool = True,
-        exit_time: float | None = None,
-        step_wait: float = 0.05,
-        daemon:    bool | None = None,
-        step_call: Callable[[], None] | None = None,
+        loop_exc:       bool | None = None,
+        prop_exit:      str | None = None,
+        obey_exit:      str | None = None,
+        stop_exit:      str | None = None,
+        stop_evt:       threading.Event | synchronize.Event | None = None,
+        sig_stop:       bool = True,
+        exit_time:      float | None = None,
+        step_wait:      float = 0.05,
+        daemon:         bool | None = None,
+        mode:           str | None = None,
+        restart:        str | list[str | None] | None = None,
+        max_restarts:   int | None = None,
+        health_timeout: float | None = None,
+        placement:      str | None = None,
+        step_call:      Callable[[], None] | None = None,
     ) -> list[int]:
         """Run multiple filters in their own processes. They will be run until one or all of them exit cleanly or one of
         them errors out (depending on options). See Runner class for args.
@@ -814,27 +1465,285 @@ class Filter:
         step_call = step_call or (lambda: None)
         runner    = Filter.Runner(filters, loop_exc=loop_exc, prop_exit=prop_exit, obey_exit=obey_exit,
             stop_exit=stop_exit, stop_evt=stop_evt, sig_stop=sig_stop, exit_time=exit_time, step_wait=step_wait,
-            daemon=daemon)
+            daemon=daemon, mode=mode, restart=restart, max_restarts=max_restarts, health_timeout=health_timeout,
+            placement=placement)
 
         while not (retcodes := runner.step()):
             step_call()
 
         return retcodes
 
+    @staticmethod
+    def fused_addr(addr: str) -> tuple[str, ...] | None:
+        """Key identifying an mq address for matching sources to outputs in fused mode, None if not an mq address.
+        'tcp://localhost:5552;main?' -> ('tcp', '5552'), 'tcp://*:5552' -> ('tcp', '5552'), 'ipc://x' -> ('ipc', 'x')."""
+
+        if not isinstance(addr, str) or not is_mq_addr(addr):
+            return None
+
+        addr = addr[: min(addr.find('?') & 0xffffffff, addr.find(';') & 0xffffffff, addr.find('!') & 0xffffffff)]
+
+        if addr.startswith('ipc://'):
+            return ('ipc', addr[6:])
+
+        host, port = (addr[6:].rsplit(':', 1) + ['5550'])[:2]
+
+        return ('tcp', port) if host in ('*', '0', '0.0.0.0', 'localhost', '127.0.0.1') else ('tcp', host, port)
+
+    @staticmethod
+    def fused_frame(frame: Frame) -> Frame:
+        """Frame as passed to the next filter in fused mode, no copy of image, a readonly view if image is writable
+        (same as if it had come over the network) and own copy of data."""
+
+        data = simpledeepcopy(frame.data)
+
+        if frame.has_raw and (image := frame.image).flags.writeable:
+            view                 = image.view()
+            view.flags.writeable = False
+
+            return Frame(view, data, frame.format)
+
+        return Frame(frame, data)
+
+    @staticmethod
+    def run_fused(
+        filters:   list[tuple['Filter', dict[str, Any]]],
+        *,
+        loop_exc:  bool | None = None,
+        prop_exit: str | None = None,
+        obey_exit: str | None = None,
+        stop_evt:  threading.Event | synchronize.Event | None = None,
+        sig_stop:  bool = True,
+        heartbeat: Any | None = None,
+    ):
+        """Run multiple filters fused in the current process and thread. Filters connected to each other by their
+        `sources` and `outputs` (which must form a DAG) pass Frames by reference from one process() to the next with no
+        encode, serialization or copy, in topological order, one message through the whole graph per step. Sources and
+        outputs which do not connect fused filters to each other remain normal network connections. Args are same as
+        for run().
+
+        Notes:
+            * Frames arrive downstream readonly as they would from the network, but share image memory with the
+            upstream Frame, so an upstream filter should not write to an image after it has returned it.
+
+            * If an upstream filter returns None then its downstream filters are skipped for that step unless they
+            have other inputs that did produce something.
+
+            * The hidden '_metrics' topic is not passed between fused filters.
+
+            * Since all filters share one thread, `cpu_affinity`, `numa_node` and `threads` must be the same for all
+            fused filters which set them. PROFILE_SIGNAL profiles the whole process into the first filter's log path.
+
+            * Topic wildcards between fused filters are the same as over the network, only a full ';*' is allowed.
+        """
+
+        if sig_stop:
+            stop_evt = SignalStopper(logger, stop_evt).stop_evt
+        elif stop_evt is None:
+            stop_evt = threading.Event()
+
+        loop_exc  = Filter.YesLoopException if (LOOP_EXC if loop_exc is None else loop_exc) else Exception
+        prop_exit = PROP_EXIT_FLAGS[PROP_EXIT if prop_exit is None else prop_exit]
+        insts     = []   # [Filter, ...]
+        inputs    = []   # [[(upstream index, topics or None), ...], ...]
+        inited    = []   # [Filter, ...] that have had init() called
+        setup     = []   # [Filter, ...] that have had setup() called
+        is_exc    = False
+
+        try:
+            for cls, config in filters:
+                if (config := dict(config)).get('__env_run'):
+                    set_env_vars(config.pop('__env_run'))
+
+                insts.append(cls(config, stop_evt, obey_exit))
+
+            outs_by_addr = {}  # {addr key: index of filter which outputs to it, ...}
+
+            for idx, filter in enumerate(insts):
+                for output in filter.config.outputs or []:
+                    if (key := Filter.fused_addr(output)) is not None:
+                        outs_by_addr[key] = idx
+
+            int_outs = set()  # {(filter index, output), ...} outputs that are only used internally
+
+            for idx, filter in enumerate(insts):
+                inputs.append(ins := [])
+
+                for source in filter.config.sources or []:
+                    if (key := Filter.fused_addr(source)) is not None and (up := outs_by_addr.get(key)) is not None:
+                        if (topics := Filter.parse_topics(source)[1]) is not None and topics != [('*', '*')] and \
+                                any('*' in src or '*' in dst for src, dst in topics):
+                            raise ValueError(f'invalid use of * wildcard in topic map {source!r}')
+
+                        ins.append((up, topics))
+                        int_outs.add(key)
+
+            order = []  # topological order
+            done  = set()
+
+            while len(order) < len(insts):
+                if not (ready := [i for i in range(len(insts)) if i not in done and all(u in done for u, _ in inputs[i])]):
+                    raise ValueError('fused filters must not have circular connections')
+
+                order.extend(ready)
+                done.update(ready)
+
+            for idx, filter in enumerate(insts):
+                config = filter.config
+
+                filter.init(FilterConfig(config,
+                    sources = [s for s in config.sources or [] if (k := Filter.fused_addr(s)) is None or k not in outs_by_addr] or None,
+                    outputs = [o for o in config.outputs or [] if (k := Filter.fused_addr(o)) is None or k not in int_outs] or None,
+                ))
+                inited.append(filter)
+
+            cpu_configs = {(tuple(sorted(c.cpu_affinity or ())) or None, c.numa_node, c.threads)
+                for c in (f.config for f in insts) if (c.cpu_affinity, c.numa_node, c.threads) != (None, None, None)}
+
+            if len(cpu_configs) > 1:
+                raise ValueError('fused filters must not have different cpu_affinity, numa_node or threads')
+
+            for filter in insts:
+                filter.heartbeat = heartbeat
+
+            if cpu_configs:
+                cpu_affinity, numa_node, threads = cpu_configs.pop()
+
+                insts[0].apply_cpu_config(FilterConfig(cpu_affinity=cpu_affinity and list(cpu_affinity),
+                    numa_node=numa_node, threads=threads))
+
+            if insts and PROFILE_SIGNAL is not None and threading.current_thread() is threading.main_thread():
+                signal.signal(PROFILE_SIGNAL, lambda signum, frame: insts[0].profile())
+
+            for filter in insts:
+                filter.setup(filter.config)
+                filter.log_startup()
+                setup.append(filter)
+
+            if heartbeat is not None:
+                heartbeat.value = time()  # health checks start now, not counting setup time
+
+            has_ext = [inst.mq.receiver is not None for inst in insts]
+
+            while not stop_evt.is_set():
+                outs = [None] * len(insts)
+
+                for idx in order:
+                    filter = insts[idx]
+                    frames = {}
+
+                    try:
+                        filter.loop_housekeeping()
+
+                        for up, topics in inputs[idx]:
+                            if (up_frames := outs[up]) is None:
+                                continue
+
+                            for src, dst in [(t, t) for t in up_frames if not t.startswith('_')] if topics is None else \
+                                    [(t, t) for t in up_frames] if topics == [('*', '*')] else topics:
+                                if (frame := up_frames.get(src)) is not None:
+                                    if dst in frames:
+                                        raise RuntimeError(f'duplicate topic {dst!r} into fused filter {filter.config.id!r}')
+
+                                    frames[dst] = Filter.fused_frame(frame)
+
+                        if inputs[idx] and not frames and not has_ext[idx] and all(outs[u] is None for u, _ in inputs[idx]):
+                            continue  # nothing from upstream
+
+                        if frames:
+                            filter.mq.metrics_.incoming(frames)
+
+                        if has_ext[idx]:  # also wait for network sources
+                            sources_timeout = filter.sources_timeout
+
+                            while (ext_frames := filter.mq.recv(min(POLL_TIMEOUT_MS, sources_timeout))) is None:
+                                if stop_evt.is_set():
+                                    filter.exit()
+
+                                filter.beat()
+
+                                if (sources_timeout := sources_timeout - POLL_TIMEOUT_MS) <= 0:
+                                    ext_frames = {}
+
+                                    break
+
+                            frames.update(ext_frames)
+
+                        if callable(out := filter.process_frames(frames)):
+                            out = out()
+
+                        outs[idx]       = out
+                        outputs_timeout = filter.outputs_timeout
+
+                        while not filter.mq.send(out, min(POLL_TIMEOUT_MS, outputs_timeout)):
+                            if stop_evt.is_set():
+                                filter.exit()
+
+                            filter.beat()
+
+                            if (outputs_timeout := outputs_timeout - POLL_TIMEOUT_MS) <= 0:
+                                break
+
+                        if (exit_after_t := filter.exit_after_t) is not None and time() >= exit_after_t:
+                            filter.exit('exit_after')
+
+                    except loop_exc as exc:
+                        logger.error(exc)
+
+        except Filter.Exit:
+            pass
+
+        except Filter.PropagateError:  # exit message from outside
+            is_exc = True
+
+        except Exception as exc:
+            is_exc = True
+
+            logger.error(exc)
+
+            raise
+
+        finally:
+            stop_evt.set()
+
+            for filter in reversed(setup):
+                try:
+                    filter.shutdown()
+                except Exception as exc:
+                    logger.error(exc)
+
+            for filter in reversed(inited):
+                try:
+                    if prop_exit & (2 if is_exc else 1):
+                        filter.mq.send_exit_msg('error' if is_exc else 'clean')
+
+                    filter.fini()
+
+                except Exception as exc:
+                    logger.error(exc)
+
+            for filter in insts:
+                filter.stop_logging()
+
     class Runner:
         def __init__(self,
-            filters:   list[tuple['Filter', dict[str, Any]]],
+            filters:        list[tuple['Filter', dict[str, Any]]],
             *,
-            loop_exc:  bool | None = None,
-            prop_exit: str | None = None,
-            obey_exit: str | None = None,
-            stop_exit: str | None = None,
-            stop_evt:  threading.Event | synchronize.Event | None = None,
-            sig_stop:  bool = True,
-            exit_time: float | None = None,
-            step_wait: float = 0.05,
-            daemon:    bool | None = None,
-            start:     bool = True,
+            loop_exc:       bool | None = None,
+            prop_exit:      str | None = None,
+            obey_exit:      str | None = None,
+            stop_exit:      str | None = None,
+            stop_evt:       threading.Event | synchronize.Event | None = None,
+            sig_stop:       bool = True,
+            exit_time:      float | None = None,
+            step_wait:      float = 0.05,
+            daemon:         bool | None = None,
+            mode:           str | None = None,
+            restart:        str | list[str | None] | None = None,
+            max_restarts:   int | None = None,
+            health_timeout: float | None = None,
+            placement:      str | None = None,
+            start:          bool = True,
         ) -> list[int]:
             """Run multiple filters in their own processes. They will be run until one or all of them exit cleanly
             (depending on options) or one of them errors out. The simple loop is:
@@ -886,6 +1795,26 @@ class Filter:
 
                 daemon: Value to set for child processes.
 
+                mode: One of RUNNER_MODES, 'process', 'forkserver' or 'thread', None means default from env var. In
+                    'thread' mode all filters run as threads in this process which starts fast and shares imported
+                    modules, but they also share the GIL, environment variables and can not be forcibly terminated.
+
+                restart: Restart policy, one of 'never', 'on-error' or 'always', or a list of these with one for each
+                    filter. None means default from env var. Exits which lead to a restart are not propagated to the
+                    other filters and do not count towards `stop_exit` unless the filter has run out of restarts.
+
+                max_restarts: Maximum number of restarts for each filter, negative for unlimited, None means default from
+                    env var. Restarts back off exponentially starting at RUNNER_RESTART_BACKOFF seconds. The count
+                    (and backoff) is reset once a restarted filter has run for RUNNER_RESTART_RESET seconds.
+
+                health_timeout: Seconds a filter's loop may be stuck (in process() and not waiting on sources or
+                    outputs) after which it is considered unhealthy. If its restart policy includes errors then it is
+                    stopped (or killed if it won't stop) and restarted, otherwise just warned about. 0 for no health
+                    checks, None means default from env var.
+
+                placement: CPU placement, 'none' or 'numa' to keep adjacent filters on the same NUMA node, see
+                    RUNNER_PLACEMENT. None means default from env var.
+
                 start: Whether to automatically start the processes running.
 
             Returns:
@@ -895,6 +1824,17 @@ class Filter:
             if not filters:
                 raise ValueError('must specify at least one Filter to run')
 
+            if (placement := RUNNER_PLACEMENT if placement is None else placement) not in RUNNER_PLACEMENTS:
+                raise ValueError(f'invalid placement {placement!r}, can only be one of: {", ".join(RUNNER_PLACEMENTS)}')
+
+            if placement == 'numa' and len(nodes := list(numa_nodes())) > 1:
+                filters = [(filter, config if config.get('numa_node') is not None or config.get('cpu_affinity') is not None
+                    else {**config, 'numa_node': nodes[i * len(nodes) // len(filters)]})
+                    for i, (filter, config) in enumerate(filters)]
+
+                logger.info('NUMA placement: ' + ', '.join(f'{filter.__name__}={config.get("numa_node", "-")}'
+                    for filter, config in filters))
+
             self.filters    = filters
             self.stop_exit  = PROP_EXIT_FLAGS[STOP_EXIT if stop_exit is None else stop_exit]
             self.stop_evt   = SignalStopper(logger, stop_evt).stop_evt \
@@ -902,28 +1842,96 @@ class Filter:
             self.exit_time  = exit_time
             self.step_wait  = step_wait
             self.retcodes   = None
-            self.proc_stops = [mp.Event() for _ in range(len(filters))]
-            self.procs      = [mp.Process(target=filter.run, args=(dict_without(config, '__env_run'),), daemon=daemon,
-                kwargs=dict(loop_exc=loop_exc, prop_exit=prop_exit, obey_exit=obey_exit, stop_evt=proc_stop_evt))
-                for proc_stop_evt, (filter, config) in zip(self.proc_stops, filters)]
-            self.stop_      = lambda s: (logger.info(s), self.stop_evt.set())
+            self.mode       = mode = RUNNER_MODE if mode is None else mode
+
+            if mode == 'thread':
+                Event, Process, RawValue, xtra = threading.Event, Filter.Runner.Thread, mp.RawValue, dict(sig_stop=False)
+
+            elif mode == 'forkserver':
+                (ctx := mp.get_context('forkserver')).set_forkserver_preload(
+                    FORKSERVER_PRELOAD + sorted(set(filter.__module__ for filter, _ in filters)))
+
+                Event, Process, RawValue, xtra = ctx.Event, ctx.Process, ctx.RawValue, {}
+
+            elif mode == 'process':
+                Event, Process, RawValue, xtra = mp.Event, mp.Process, mp.RawValue, {}
+            else:
+                raise ValueError(f'invalid mode {mode!r}, can only be one of: {", ".join(RUNNER_MODES)}')
+
+            if len(restarts := restart if isinstance(restart, (list, tuple)) else [restart] * len(filters)) != len(filters):
+                raise ValueError('restart list must have one policy for each filter')
+            if bad := [r for r in restarts if r is not None and r not in RESTART_FLAGS]:
+                raise ValueError(f'invalid restart {bad[0]!r}, can only be one of: {", ".join(RESTART_FLAGS)}')
+
+            prop_flags = PROP_EXIT_FLAGS[PROP_EXIT if prop_exit is None else prop_exit]
+            prop_names = {v: k for k, v in PROP_EXIT_FLAGS.items()}
+
+            self.restarts       = [RESTART_FLAGS[RUNNER_RESTART if r is None else r] for r in restarts]
+            self.max_restarts   = RUNNER_MAX_RESTARTS if max_restarts is None else max_restarts
+            self.health_timeout = RUNNER_HEALTH_TIMEOUT if health_timeout is None else health_timeout
+            self.nrestarts      = [0] * len(filters)
+            self.restart_ts     = [None] * len(filters)  # when to restart an exited filter, if restart is pending
+            self.restarted_ts   = [None] * len(filters)  # when a filter was last restarted, until its count is reset
+            self.unhealthy_ts   = [None] * len(filters)  # when a filter was found unhealthy, if it is
+            self.heartbeats     = [RawValue('d', 0.) if self.health_timeout else None for _ in range(len(filters))]
+            self.Event          = Event
+            self.proc_stops     = [Event() for _ in range(len(filters))]
+            self.new_proc       = lambda i: Process(target=filters[i][0].run,
+                args=(dict_without(filters[i][1], '__env_run'),), daemon=daemon, kwargs=dict(loop_exc=loop_exc,
+                prop_exit=prop_names[prop_flags & ~self.restarts[i]], obey_exit=obey_exit,
+                stop_evt=self.proc_stops[i], heartbeat=self.heartbeats[i], **xtra))
+            self.procs          = [self.new_proc(i) for i in range(len(filters))]
+            self.stop_          = lambda s: (logger.info(s), self.stop_evt.set())
 
             if start:
                 self.start()
 
+        class Thread(threading.Thread):
+            """Enough of the mp.Process interface to host a filter in a thread in Runner 'thread' mode."""
+
+            exitcode = None
+
+            def start(self):
+                self.start_t = time()
+
+                super().start()
+
+            def run(self):
+                try:
+                    super().run()
+                except BaseException:  # already logged by Filter.run()
+                    self.exitcode = 1
+                else:
+                    self.exitcode = 0
+
+            def terminate(self):
+                pass  # can't kill a thread, it has already been asked to stop via its stop_evt
+
         def start(self):
-            for proc, (filter, config) in zip(self.procs, self.filters):
-                if env := config.get('__env_run'):  # we try to set run env here because if run method is spawn then this will affect even params which are gotten on module import like AUTO_DOWNLOAD
-                    if mp.get_start_method() != 'spawn':
-                        logger.warning(f"setting run environment variables for {filter.__name__} if not running in "
-                            "'spawn' mode may not take effect")
+            for i in range(len(self.procs)):
+                self.start_proc(i)
+
+        def start_proc(self, i: int):
+            proc, (filter, config) = self.procs[i], self.filters[i]
+
+            if env := config.get('__env_run'):  # we try to set run env here because if run method is spawn then this will affect even params which are gotten on module import like AUTO_DOWNLOAD
+                if self.mode == 'thread':
+                    logger.warning(f"setting run environment variables for {filter.__name__} in 'thread' mode "
+                        "affects all filters and may not take effect")
+                elif self.mode == 'process' and mp.get_start_method() != 'spawn':
+                    logger.warning(f"setting run environment variables for {filter.__name__} if not running in "
+                        "'spawn' mode may not take effect")
+
+            if self.mode != 'thread' and (threads := config.get('threads')) is not None:  # before libraries load
+                env = {**Filter.threads_env(int(threads)), **(env or {})}
 
-                    env = set_env_vars(env)
+            if env:
+                env = set_env_vars(env)
 
-                proc.start()
+            proc.start()
 
-                if env:
-                    set_env_vars(env)
+            if env:
+                set_env_vars(env)
 
         def step(self, step_wait: float | None = None, *, stop: bool = True) -> bool | list[int]:
             """This is more of a 'check if exited' function since the filters are running in other processes."""
@@ -931,12 +1939,32 @@ class Filter:
             if not self.stop_evt.wait(self.step_wait if step_wait is None else step_wait):
                 any_running = False
                 exit_flags  = 0
+                t           = time()
+
+                for i, proc in enumerate(self.procs):
+                    if (exitcode := proc.exitcode) is None:
+                        if not self.proc_stops[i].is_set() or self.unhealthy_ts[i] is not None:
+                            any_running = True
+
+                            if self.health_timeout:
+                                self.check_health(i, t)
+
+                            if (restarted_t := self.restarted_ts[i]) is not None and RUNNER_RESTART_RESET and \
+                                    t - restarted_t >= RUNNER_RESTART_RESET and self.unhealthy_ts[i] is None:
+                                self.restarted_ts[i] = None
+                                self.nrestarts[i]    = 0  # stayed up, so the next crash starts with fresh restarts
+
+                        continue
+
+                    flags = 2 if exitcode or self.unhealthy_ts[i] is not None else 1
 
-                for proc_stop_evt, proc in zip(self.proc_stops, self.procs):
-                    if not proc_stop_evt.is_set():
+                    if self.restarts[i] & flags and (self.max_restarts < 0 or self.nrestarts[i] < self.max_restarts):
                         any_running = True
-                    elif proc.exitcode is not None:
-                        exit_flags |= 2 if proc.exitcode else 1
+
+                        self.restart_proc(i, t, exitcode)
+
+                    else:
+                        exit_flags |= flags
 
                 if flags := exit_flags & self.stop_exit:
                     self.stop_('child errored' if flags & 2 else 'child exited')
@@ -947,6 +1975,71 @@ class Filter:
 
             return self.stop() if stop else True
 
+        def name(self, i: int) -> str:
+            return (filter_config := self.filters[i])[1].get('id') or filter_config[0].__name__
+
+        def restart_proc(self, i: int, t: float, exitcode: int):
+            """Schedule restart of exited filter `i` with exponential backoff or do the restart if it is time."""
+
+            if (restart_t := self.restart_ts[i]) is None:
+                self.restart_ts[i] = t + (delay := min(RUNNER_RESTART_BACKOFF_MAX,
+                    RUNNER_RESTART_BACKOFF * 2 ** self.nrestarts[i]))
+
+                logger.warning(f'{self.name(i)} ' + ('was unhealthy' if self.unhealthy_ts[i] is not None else
+                    f'exited with code {exitcode}') + f', restarting in {delay:.1f}s (restart {self.nrestarts[i] + 1}' +
+                    ('' if self.max_restarts < 0 else f' of {self.max_restarts}') + ')')
+
+            elif t >= restart_t:
+                self.restart_ts[i] = self.unhealthy_ts[i] = None
+                self.restarted_ts[i] = t
+                self.nrestarts[i] += 1
+                self.proc_stops[i] = self.Event()
+
+                if (heartbeat := self.heartbeats[i]) is not None:
+                    heartbeat.value = 0.
+
+                self.procs[i] = self.new_proc(i)
+
+                self.start_proc(i)
+
+        def check_health(self, i: int, t: float):
+            """Filter `i` is unhealthy if its loop has not come around in `health_timeout`, if it is restartable on
+            error then stop it (or terminate if it doesn't stop in another `health_timeout`), otherwise just warn."""
+
+            if not (beat_t := self.heartbeats[i].value):  # not looping yet, still setting up
+                return
+
+            if (unhealthy_t := self.unhealthy_ts[i]) is None:
+                if t - beat_t > (health_timeout := self.health_timeout):
+                    self.unhealthy_ts[i] = t
+
+                    if not self.restarts[i] & 2:
+                        logger.warning(f'{self.name(i)} unhealthy, loop stuck for {t - beat_t:.1f}s')
+                    else:
+                        logger.warning(f'{self.name(i)} unhealthy, loop stuck for {t - beat_t:.1f}s, stopping')
+
+                        self.proc_stops[i].set()
+
+            elif not self.proc_stops[i].is_set():  # unhealthy but not restartable, just keep an eye on it
+                if beat_t > unhealthy_t:
+                    self.unhealthy_ts[i] = None
+
+                    logger.info(f'{self.name(i)} healthy again')
+
+            elif t - unhealthy_t > self.health_timeout:
+                self.unhealthy_ts[i] = t
+
+                logger.warning(f'{self.name(i)} unhealthy and not stopping, terminating')
+
+                self.procs[i].terminate()
+
+        def health(self) -> list[float | None]:
+            """Seconds since the loop of each filter was last seen alive, None if not known because health checks are
+            off or the filter is still setting up."""
+
+            return [None if heartbeat is None or not (beat_t := heartbeat.value) else time() - beat_t
+                for heartbeat in self.heartbeats]
+
         def wait(self, timeout: float | None = None, step_wait: float | None = None, *, stop: bool = True) -> bool | list[int]:
             if timeout is None:
                 while not (res := self.step(step_wait, stop=stop)):
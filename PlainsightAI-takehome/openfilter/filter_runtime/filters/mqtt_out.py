@@ -143,8 +143,9 @@ class MQTTOut(Filter):
             Reconnect exponential backoff max value in milliseconds, 0 for no backoff.
     """
 
-    FILTER_TYPE   = 'Output'
-    VALID_OPTIONS = ('qos', 'retain')
+    FILTER_TYPE    = 'Output'
+    VALID_OPTIONS  = ('qos', 'retain')
+    RECONFIGURABLE = ('interval',)
 
 
     @staticmethod
@@ -382,7 +383,10 @@ class MQTTOut(Filter):
         self.username    = config.username
         self.password    = config.password
         self.client      = self.get_client()
-        
+
+    def reconfigure(self, config):
+        self.interval = config.interval or None
+
     def shutdown(self):
         if self.client is not None:
             self.client.loop_stop()
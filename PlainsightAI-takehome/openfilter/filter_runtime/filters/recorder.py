@@ -64,6 +64,8 @@ class Recorder(Filter):
 
     FILTER_TYPE = 'Output'
 
+    RECONFIGURABLE = ('rules', 'empty', 'flush')
+
     @classmethod
     def normalize_config(cls, config):
         outputs = split_commas_maybe(config.get('outputs'))  # we do not assume how Filter will normalize sources/outputs in the future
@@ -123,6 +125,11 @@ class Recorder(Filter):
         self.empty     = 1 if config.empty is None else int(config.empty)
         self.flush     = True if config.flush is None else bool(config.flush)
 
+    def reconfigure(self, config):
+        self.rules = config._rules
+        self.empty = 1 if config.empty is None else int(config.empty)
+        self.flush = True if config.flush is None else bool(config.flush)
+
     def shutdown(self):
         if self.file:
             self.file.close()
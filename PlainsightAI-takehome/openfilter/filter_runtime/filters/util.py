@@ -2,11 +2,13 @@ import logging
 import re
 from concurrent.futures import ThreadPoolExecutor
 from pprint import pformat
+from threading import get_ident
 from time import sleep, time
 
 import cv2
 
 from openfilter.filter_runtime.filter import FilterConfig, Filter, Frame
+from openfilter.filter_runtime.frame_ops import FrameOps
 from openfilter.filter_runtime.metrics import Metrics
 from openfilter.filter_runtime.mq import MQ
 from openfilter.filter_runtime.utils import split_commas_maybe, once, adict
@@ -91,6 +93,8 @@ class Util(Filter):
 
     FILTER_TYPE = 'System'
 
+    RECONFIGURABLE = ('log', 'sleep', 'maxfps')
+
     @classmethod
     def normalize_config(cls, config):
         config = UtilConfig(super().normalize_config(config))
@@ -177,8 +181,14 @@ class Util(Filter):
         self.t_maxfps     = time()
         self.t_per_maxfps = None if (maxfps := config.maxfps) is None else 1 / maxfps
         self.xforms       = config.xforms
+        self.xform_ops    = {}  # {(thread id, topic, xform ids): [FrameOps | box XForm, ...], ...}, FrameOps are not thread-safe and process() may run in several `workers` threads
         self.executor     = ThreadPoolExecutor()
 
+    def reconfigure(self, config):
+        self.log          = config.log or False
+        self.sleep        = config.sleep or None
+        self.t_per_maxfps = None if (maxfps := config.maxfps) is None else 1 / maxfps
+
     def process(self, frames):
         t = time()
 
@@ -218,86 +228,61 @@ class Util(Filter):
 
         return frames
 
-    def execute_xforms(self, topic_xform):
-        frame = topic_xform.frame
-
-        for xform in topic_xform.xforms:
-            action = xform.action
-
-            if action == 'flipx':
-                frame = Frame(cv2.flip(frame.image, 1), frame)
-            elif action == 'flipy':
-                frame = Frame(cv2.flip(frame.image, 0), frame)
-            elif action == 'flipboth':
-                frame = Frame(cv2.flip(frame.image, -1), frame)
-            elif action == 'rotcw':
-                frame = Frame(cv2.rotate(frame.image, cv2.ROTATE_90_CLOCKWISE), frame)
-            elif action == 'rotccw':
-                frame = Frame(cv2.rotate(frame.image, cv2.ROTATE_90_COUNTERCLOCKWISE), frame)
-            elif action == 'swaprgb':
-                frame = frame if frame.is_gray else Frame(cv2.cvtColor(frame.image, cv2.COLOR_BGR2RGB), frame)
-            elif action == 'fmtrgb':
-                frame = frame.rgb
-            elif action == 'fmtbgr':
-                frame = frame.bgr
-            elif action == 'fmtgray':
-                frame = frame.gray
+    XFORM_OPS = {
+        'flipx':    ('flip', 1),
+        'flipy':    ('flip', 0),
+        'flipboth': ('flip', -1),
+        'rotcw':    ('rotate', cv2.ROTATE_90_CLOCKWISE),
+        'rotccw':   ('rotate', cv2.ROTATE_90_COUNTERCLOCKWISE),
+        'swaprgb':  ('swaprgb',),
+        'fmtrgb':   ('format', 'RGB'),
+        'fmtbgr':   ('format', 'BGR'),
+        'fmtgray':  ('format', 'GRAY'),
+    }
+
+    def compile_xforms(self, xforms):
+        """Compile runs of consecutive image xforms into single fused FrameOps, 'box' breaks a run since it draws."""
+
+        chain = []
+        ops   = []
+
+        for xform in xforms:
+            if (action := xform.action) == 'box':
+                if ops:
+                    chain.append(FrameOps(ops))
+
+                    ops = []
+
+                chain.append(xform)
+
             elif action in ('resize', 'maxsize', 'minsize'):
-                frame = self.execute_xform_size(xform, frame)
-            elif action == 'box':
-                frame = self.execute_xform_box(xform, frame)
+                ops.append((action, xform.width, xform.height, xform.get('interp', 'N'),
+                    action != 'resize' and xform.get('aspect', True)))  # aspect is meaningless for plain resize
+
+            elif (op := self.XFORM_OPS.get(action)) is not None:
+                ops.append(op)
             else:
                 raise ValueError(f'unknown xform {action!r}')
 
-        topic_xform.frame = frame
+        if ops:
+            chain.append(FrameOps(ops))
 
-        return topic_xform
+        return chain
 
-    def execute_xform_size(self, xform, frame):
-        width  = xform.width
-        height = xform.height
-        interp = (
-            cv2.INTER_NEAREST
-            if (interp := xform.get('interp', 'N')) == 'N' else
-            cv2.INTER_CUBIC
-            if interp == 'C' else
-            cv2.INTER_NEAREST
-        )
-
-        if xform.action == 'resize':
-            w = width
-            h = height
-
-        elif xform.action == 'maxsize':
-            if (hgt := (h := frame.height) > height) + (wgt := (w := frame.width) > width) and xform.get('aspect', True):
-                if not hgt:
-                    h = int(h * width / w)
-                elif not wgt:
-                    w = int(w * height / h)
-                else:
-                    h = int(h * (s := min(width / w, height / h)))
-                    w = int(w * s)
-
-            w = min(w, width)
-            h = min(h, height)
-
-        else:  # action == 'minsize':
-            if (hgt := (h := frame.height) < height) + (wgt := (w := frame.width) < width) and xform.get('aspect', True):
-                if not hgt:
-                    h = int(h * width / w)
-                elif not wgt:
-                    w = int(w * height / h)
-                else:
-                    h = int(h * (s := max(width / w, height / h)))
-                    w = int(w * s)
+    def execute_xforms(self, topic_xform):
+        frame  = topic_xform.frame
+        xforms = topic_xform.xforms
+        key    = (get_ident(), topic_xform.topic, tuple(id(xform) for xform in xforms))
 
-            w = max(w, width)
-            h = max(h, height)
+        if (chain := self.xform_ops.get(key)) is None:
+            self.xform_ops[key] = chain = self.compile_xforms(xforms)
 
-        if w != frame.width or h != frame.height:
-            frame = Frame(cv2.resize(frame.image, (w, h), interpolation=interp), frame)
+        for step in chain:
+            frame = step.apply(frame) if isinstance(step, FrameOps) else self.execute_xform_box(step, frame)
 
-        return frame
+        topic_xform.frame = frame
+
+        return topic_xform
 
     def execute_xform_box(self, xform, frame):
         image = frame.rw.image
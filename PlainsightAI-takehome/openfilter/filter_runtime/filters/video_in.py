@@ -1,8 +1,13 @@
+import json
 import logging
+import multiprocessing as mp
 import os
 import re
-from threading import Condition, Event, Thread
-from time import time_ns, sleep
+import subprocess
+from heapq import heappop, heappush
+from queue import Empty
+from threading import Condition, Event, Semaphore, Thread
+from time import time, time_ns, sleep
 from typing import Any
 from urllib.parse import urlparse
 
@@ -15,9 +20,13 @@ try:
 except ImportError:
     HAS_BOTO3 = False
 
+from openfilter.filter_runtime.bufpool import buffer_pool
+from openfilter.filter_runtime.frame import Frame, Packet
+from openfilter.filter_runtime.frame_ops import FrameOps, fit_size
+from openfilter.filter_runtime.latency import LatencyController
 from openfilter.filter_runtime.utils import json_getval, dict_without, split_commas_maybe, hide_uri_users_and_pwds, Deque
 
-__all__ = ['is_video', 'is_video_file', 'is_video_webcam', 'is_video_stream', 'VideoReader', 'MultiVideoReader']
+__all__ = ['is_video', 'is_video_file', 'is_video_webcam', 'is_video_stream', 'VideoReader', 'MultiVideoReader', 'VideoPool']
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +36,20 @@ VIDEO_IN_LOOP     = _ if isinstance(_ := json_getval((os.getenv('VIDEO_IN_LOOP')
 VIDEO_IN_MAXFPS   = None if (_ := json_getval((os.getenv('VIDEO_IN_MAXFPS') or 'null').lower())) is None else float(_)
 VIDEO_IN_MAXSIZE  = os.getenv('VIDEO_IN_MAXSIZE') or None
 VIDEO_IN_RESIZE   = os.getenv('VIDEO_IN_RESIZE') or None
+VIDEO_IN_DECODER  = (os.getenv('VIDEO_IN_DECODER') or 'vidgear').lower()
+VIDEO_IN_SEEK_MIN = int(os.getenv('VIDEO_IN_SEEK_MIN') or 60)
+VIDEO_IN_PREFETCH = int(os.getenv('VIDEO_IN_PREFETCH') or 1)
+
+VIDEO_IN_RECONNECT     = bool(json_getval((os.getenv('VIDEO_IN_RECONNECT') or 'true').lower()))
+VIDEO_IN_BACKOFF_MIN   = float(os.getenv('VIDEO_IN_BACKOFF_MIN') or 0.5)
+VIDEO_IN_BACKOFF_MAX   = float(os.getenv('VIDEO_IN_BACKOFF_MAX') or 30)
+VIDEO_IN_STALE_TIMEOUT = float(os.getenv('VIDEO_IN_STALE_TIMEOUT') or 10)
+VIDEO_IN_KEEPALIVE     = float(os.getenv('VIDEO_IN_KEEPALIVE') or 1)
+
+VIDEO_IN_DECODERS = ('vidgear', 'opencv', 'ffmpeg')
+FFMPEG_SCALERS    = {None: 'neighbor', 'N': 'neighbor', 'L': 'bilinear', 'C': 'bicubic'}
+SEGMENT_MIN       = 32  # frames, consecutive GOPs are merged into parallel decode segments at least this long
+SEGMENT_QUEUE     = 32  # frames, most decoded ahead per parallel decode worker regardless of how long its GOPs are
 
 re_video          = re.compile(r'^(rtsp|rtmp|http|https|file|webcam|s3)://')
 re_video_stream   = re.compile(r'^(rtsp|rtmp|http|https)://')
@@ -47,6 +70,76 @@ def parse_size(s: str):
     return m.groups()
 
 
+def parse_emit(emit: str) -> str | float:  # -> 'all', 'any' or seconds to wait for the rest once any has a frame
+    if emit in ('all', 'any'):
+        return emit
+
+    if isinstance(emit, str) and emit.startswith('timeout:'):
+        try:
+            if (ms := float(emit[8:])) >= 0:
+                return ms / 1000
+        except ValueError:
+            pass
+
+    raise ValueError(f"invalid emit {emit!r}, must be 'all', 'any' or 'timeout:ms'")
+
+
+def jpg_header(buf: bytes | bytearray, pos: int = 0) -> tuple[int, int, int, int] | None:
+    """Walk the marker segments of a jpg starting at `pos` up to its scan data without decoding anything. Returns
+    (height, width, channels, offset of scan data) or None if `buf` ends before that."""
+
+    if buf[pos : pos + 2] != b'\xff\xd8':
+        raise ValueError('not a jpg')
+
+    pos   += 2
+    height = None
+
+    while pos + 4 <= len(buf):
+        if buf[pos] != 0xff:
+            raise ValueError('invalid jpg')
+
+        if (marker := buf[pos + 1]) == 0xff:  # fill byte
+            pos += 1
+
+            continue
+
+        seglen = int.from_bytes(buf[pos + 2 : pos + 4], 'big')
+
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):  # SOFn
+            if pos + 10 > len(buf):
+                return None
+
+            height   = int.from_bytes(buf[pos + 5 : pos + 7], 'big')
+            width    = int.from_bytes(buf[pos + 7 : pos + 9], 'big')
+            channels = buf[pos + 9]
+
+        elif marker == 0xda:  # SOS
+            if height is None:
+                raise ValueError('invalid jpg, no frame header')
+
+            return height, width, channels, pos + 2 + seglen
+
+        pos += 2 + seglen
+
+    return None
+
+
+def ffmpeg_version() -> tuple[int, int] | None:
+    """(major, minor) of the installed ffmpeg, checked once. None if it can't be run or doesn't give a release number
+    (git builds), which is treated as current."""
+
+    if not hasattr(ffmpeg_version, 'version'):
+        try:
+            out = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            out = ''
+
+        ffmpeg_version.version = None if (m := re.match(r'ffmpeg version n?(\d+)(?:\.(\d+))?', out)) is None else \
+            (int(m[1]), int(m[2] or 0))
+
+    return ffmpeg_version.version
+
+
 def parse_s3_uri(s3_uri: str):
     """Parse S3 URI into bucket and key components.
     
@@ -114,19 +207,424 @@ def s3_to_presigned_url(s3_uri: str, expiration: int = 3600, region: str = None)
         raise ValueError(f'Failed to generate presigned URL for {s3_uri}: {e}')
 
 
+class CV2Stream:
+    """Direct cv2.VideoCapture (FFmpeg backend for anything but webcams) with the decoder thread count set at open,
+    which VideoGear does not allow. Read synchronously from the VideoReader thread, same interface as VideoGear. If `raw`
+    then nothing is decoded and read() returns compressed Packets straight from the demuxer (H.264 / H.265 converted to
+    Annex B with parameter sets in-band by OpenCV)."""
+
+    def __init__(self, source: str | int, threads: int | None = None, raw: bool = False, timeout: int | None = None):
+        params = [] if threads is None else [cv2.CAP_PROP_N_THREADS, threads]
+        api    = cv2.CAP_ANY if isinstance(source, int) else cv2.CAP_FFMPEG
+        tmouts = [] if timeout is None or api != cv2.CAP_FFMPEG else \
+            [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout, cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout]  # milliseconds
+
+        if not (cap := cv2.VideoCapture(source, api, params + tmouts)).isOpened() and api != cv2.CAP_ANY:
+            cap = cv2.VideoCapture(source, cv2.CAP_ANY, params)
+
+        if not cap.isOpened():
+            raise RuntimeError(f'could not open video {source!r}')
+
+        self.cap       = cap
+        self.framerate = fps if (fps := cap.get(cv2.CAP_PROP_FPS)) > 0 else None
+        self.raw       = raw
+
+        if raw:
+            if not cap.set(cv2.CAP_PROP_FORMAT, -1):
+                raise RuntimeError(f'video {source!r} does not support compressed packet passthrough')
+
+            # extradata with start codes (e.g. MPEG-4 VOL header) goes out with keyframes, avcC / hvcC records don't
+            # because their parameter sets are already in-band after the conversion to Annex B
+
+            ret, extra  = cap.retrieve(flag=int(cap.get(cv2.CAP_PROP_CODEC_EXTRADATA_INDEX)))
+            extra       = extra.tobytes() if ret and extra is not None else b''
+            self.extra  = extra if extra[:3] == b'\0\0\1' or extra[:4] == b'\0\0\0\1' else None
+            self.codec  = int(cap.get(cv2.CAP_PROP_FOURCC)).to_bytes(4, 'little').decode('latin-1').rstrip('\0 ')
+            self.width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self.cap.release()
+
+    def read(self):  # -> np.ndarray | Packet | None
+        ret, image = self.cap.read()
+
+        if not ret:
+            return None
+        if not self.raw:
+            return image
+
+        key = bool(self.cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME))
+
+        return Packet(image.tobytes(), self.codec, key, self.width, self.height, self.framerate, self.extra if key else None)
+
+    def grab(self):  # -> True | None, demuxes and decodes but leaves the conversion to BGR and copy out to retrieve()
+        return True if self.cap.grab() else None
+
+    def retrieve(self):  # -> np.ndarray | None
+        ret, image = self.cap.retrieve()
+
+        return image if ret else None
+
+    def skip(self, n: int):
+        """Skip `n` frames, by seeking if at least VIDEO_IN_SEEK_MIN (lands on a keyframe and decodes forward, so only pays
+        off for gaps longer than a GOP), otherwise by grabbing without retrieving."""
+
+        if n >= VIDEO_IN_SEEK_MIN:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.cap.get(cv2.CAP_PROP_POS_FRAMES) + n)
+
+        else:
+            for _ in range(n):
+                if not self.cap.grab():
+                    break
+
+
+class FFmpegStream:
+    """Decode in an ffmpeg subprocess to raw frames on a pipe, gives access to decoder options OpenCV does not expose
+    like skipping non-keyframes and reduced resolution decode. Scaling and conversion to the final format are done by
+    ffmpeg in the same pass as decode and frames are read straight into pooled buffers, so there is no further copy or
+    conversion. Needs the ffmpeg and ffprobe executables, 4.x or later, options which were renamed in 5.x are picked by
+    version."""
+
+    def __init__(self,
+        source:      str,
+        threads:     int | None = None,
+        skip_nonkey: bool = False,
+        lowres:      int | None = None,
+        step:        int = 1,
+        size:        tuple[str, str, str, str | None] | None = None,  # parse_size() of maxsize or resize
+        size_mode:   str = 'maxsize',
+        rgb:         bool = False,
+        timeout:     float | None = None,  # seconds without data from a network source before giving up
+    ):
+        info          = self.probe(source, timeout)
+        width, height = int(info['width']), int(info['height'])
+        gray          = (info.get('pix_fmt') or '').startswith('gray')
+        filters       = [] if step <= 1 else [f"select='not(mod(n,{step}))'"]  # skipped frames decoded but not converted or piped
+
+        if lowres:  # decoder rounds up
+            width, height = -(-width >> lowres), -(-height >> lowres)
+
+        if size is not None:
+            w, aspect, h, interp = size
+
+            if (size := fit_size(width, height, int(w), int(h), size_mode, aspect != '+')) != (width, height):
+                width, height = size
+
+                filters.append(f'scale={width}:{height}:flags={FFMPEG_SCALERS[interp and interp.upper()[:1]]}')
+
+        num, _, den    = (info.get('avg_frame_rate') or info.get('r_frame_rate') or '0/0').partition('/')
+        self.framerate = int(num) / int(den) if num.isdigit() and den.isdigit() and int(num) and int(den) else None
+        self.shape     = (height, width) if gray else (height, width, 3)
+        self.proc      = None
+        self.cmd       = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin',
+            *(() if threads is None else ('-threads', str(threads))),
+            *(('-skip_frame', 'nokey') if skip_nonkey else ()),
+            *(('-lowres', str(lowres)) if lowres else ()),
+            *self.input_options(source, timeout),
+            '-i', source, '-map', '0:v:0',
+            *(('-vf', ','.join(filters)) if filters else ()),
+            *(() if step <= 1 else ('-fps_mode' if (v := ffmpeg_version()) is None or v >= (5, 1) else '-vsync', 'passthrough')),  # '-fps_mode' from 5.1
+            '-f', 'rawvideo', '-pix_fmt', 'gray' if gray else 'rgb24' if rgb else 'bgr24', '-',
+        ]
+
+    @staticmethod
+    def input_options(source: str, timeout: float | None = None) -> list[str]:
+        """Transport and timeout options for network sources, same for ffmpeg and ffprobe. The rtsp socket timeout is
+        '-stimeout' before ffmpeg 5.0, where '-timeout' is a listen timeout and would make ffmpeg wait for a connection."""
+
+        opts = ['-rtsp_transport', 'tcp'] if (rtsp := source.startswith('rtsp://')) else []
+
+        if timeout is not None and is_video_stream(source):
+            opts += [('-timeout' if (v := ffmpeg_version()) is None or v >= (5, 0) else '-stimeout') if rtsp else
+                '-rw_timeout', str(int(timeout * 1_000_000))]
+
+        return opts
+
+    @staticmethod
+    def probe(source: str, timeout: float | None = None) -> dict:
+        try:
+            res = subprocess.run(['ffprobe', '-v', 'error', *FFmpegStream.input_options(source, timeout), '-select_streams',
+                'v:0', '-show_entries', 'stream=width,height,pix_fmt,avg_frame_rate,r_frame_rate', '-of', 'json', source],
+                capture_output=True, text=True, timeout=timeout)  # ffprobe may not give up by itself on a dead stream
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f'could not probe video {hide_uri_users_and_pwds(source)!r}: timed out') from None
+
+        if res.returncode or not (streams := json.loads(res.stdout or '{}').get('streams')):
+            raise RuntimeError(f'could not probe video {hide_uri_users_and_pwds(source)!r}: {res.stderr.strip()}')
+
+        return streams[0]
+
+    def start(self):
+        if self.proc is None:
+            self.proc = subprocess.Popen(self.cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+
+    def stop(self):
+        if (proc := self.proc) is not None:
+            self.proc = None
+
+            proc.terminate()
+
+            try:
+                proc.wait(5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+            proc.stdout.close()
+
+    def read(self):  # -> np.ndarray | None
+        if (proc := self.proc) is None:
+            return None
+
+        image = buffer_pool.empty(self.shape)
+        view  = memoryview(image).cast('B')
+        pos   = 0
+
+        while pos < len(view):
+            if not (n := proc.stdout.readinto(view[pos:])):
+                return None
+
+            pos += n
+
+        return image
+
+
+class MJPEGStream:
+    """HTTP multipart MJPEG (the 'video.mjpg' / 'mjpg/video.cgi' kind of IP camera URL) split into individual jpgs
+    without decoding anything. Parts are found by their jpg markers rather than multipart headers because plenty of
+    cameras get Content-Length or the boundary wrong. Same interface as VideoGear, read() returns jpg bytes."""
+
+    def __init__(self, source: str, timeout: float = 10):
+        self.source    = source
+        self.timeout   = timeout
+        self.framerate = None
+        self.resp      = None
+        self.chunks    = None
+        self.buf       = bytearray()
+
+    def start(self):
+        if self.resp is None:
+            import requests
+
+            self.resp = resp = requests.get(self.source, stream=True, timeout=self.timeout)
+
+            resp.raise_for_status()
+
+            if not (ctype := resp.headers.get('Content-Type', '')).startswith('multipart/'):
+                resp.close()
+
+                raise RuntimeError(f'not an MJPEG stream {hide_uri_users_and_pwds(self.source)!r}, Content-Type {ctype!r}')
+
+            raw         = resp.raw  # iter_content(None) would only return at end of a non-chunked response, i.e. never
+            self.chunks = iter(lambda: raw.read1(65536), b'') if hasattr(raw, 'read1') else resp.iter_content(4096)
+
+    def stop(self):
+        if (resp := self.resp) is not None:
+            self.resp = None
+
+            resp.close()
+
+    def read(self):  # -> bytes | None
+        if self.resp is None:
+            return None
+
+        buf = self.buf
+
+        while True:
+            if (start := buf.find(b'\xff\xd8')) == -1:  # only multipart headers so far, don't accumulate them
+                del buf[:-1]
+
+            else:
+                try:
+                    header = jpg_header(buf, start)
+                except ValueError:  # stray SOI bytes, not a jpg
+                    del buf[: start + 2]
+
+                    continue
+
+                if header is not None and (end := buf.find(b'\xff\xd9', header[3])) != -1:  # EOI only after scan data
+                    break
+
+            try:
+                if not (chunk := next(self.chunks, None)):
+                    return None
+            except Exception:  # connection dropped or closed by stop()
+                return None
+
+            buf += chunk
+
+        jpg = bytes(buf[start : end + 2])
+
+        del buf[: end + 2]
+
+        return jpg
+
+
+def decode_segments(source: str, segments: list[tuple[int, int]], ops: list[tuple], rgb: bool, threads: int | None,
+        queue: 'mp.Queue'):
+    """ParallelStream worker process. Decode each (first frame, frame count) segment, which starts on a keyframe, and put
+    (frame index, image) for each frame on `queue` followed by (None, None) at the end of the segment."""
+
+    cap       = cv2.VideoCapture(source, cv2.CAP_FFMPEG, [] if threads is None else [cv2.CAP_PROP_N_THREADS, threads])
+
+    if not cap.isOpened():  # exit code tells ParallelStream.read() that this worker died
+        raise RuntimeError(f'could not open video {hide_uri_users_and_pwds(source)!r}')
+
+    ops_gray  = FrameOps(ops)
+    ops_color = FrameOps(ops + [('format', 'RGB')]) if rgb else ops_gray
+
+    for start, count in segments:
+        if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != start:  # only contiguous with a single worker
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+        for idx in range(start, start + count):
+            if not (ret := cap.read())[0]:
+                break
+
+            image, _ = ops_gray(image, 'GRAY') if len((image := ret[1]).shape) != 3 else ops_color(image, 'BGR')
+
+            queue.put((idx, image))
+
+        queue.put((None, None))
+
+    cap.release()
+
+
+class ParallelStream:
+    """Decode a video file in `workers` processes at once. The file is demuxed once without decoding to find its
+    keyframes and split into keyframe-aligned segments of whole GOPs (at least SEGMENT_MIN frames) which are dealt out
+    round robin to the workers, so each one can seek straight to its next segment. If `ordered` then each worker has its
+    own queue and segments are read back in order from the worker which has them, otherwise all workers share one queue
+    and frames come out in whatever order they are decoded. Queues hold at most SEGMENT_QUEUE frames per worker so memory
+    use is bounded even for a file with a single keyframe, a worker just waits while its queue is full (when ordered,
+    the one being read always drains so this can't deadlock). Workers apply `size` and RGB conversion themselves. Same interface as CV2Stream
+    except there is no grab() / retrieve(), and the original index in the file of the frame last read is in `index`."""
+
+    def __init__(self,
+        source:    str,
+        workers:   int,
+        ordered:   bool = True,
+        threads:   int | None = None,
+        size:      tuple[str, str, str, str | None] | None = None,  # parse_size() of maxsize or resize
+        size_mode: str = 'maxsize',
+        rgb:       bool = False,
+    ):
+        if not (cap := cv2.VideoCapture(source, cv2.CAP_FFMPEG)).isOpened():
+            raise RuntimeError(f'could not open video {hide_uri_users_and_pwds(source)!r}')
+
+        self.framerate = fps if (fps := cap.get(cv2.CAP_PROP_FPS)) > 0 else None
+        keys           = []
+        count          = 0
+
+        if not cap.set(cv2.CAP_PROP_FORMAT, -1):  # demux only
+            raise RuntimeError(f'video {hide_uri_users_and_pwds(source)!r} does not support keyframe scan')
+
+        while cap.grab():
+            if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keys.append(count)
+
+            count += 1
+
+        cap.release()
+
+        if not count:
+            raise RuntimeError(f'video {hide_uri_users_and_pwds(source)!r} has no frames')
+
+        if not keys or keys[0]:  # frames before the first keyframe are decoded from the start, as best they can be
+            keys.insert(0, 0)
+
+        segments = []
+
+        for start, end in zip(keys, keys[1:] + [count]):
+            if segments and segments[-1][1] < SEGMENT_MIN:
+                segments[-1] = (segments[-1][0], end - segments[-1][0])
+            else:
+                segments.append((start, end - start))
+
+        ops           = [] if size is None else [(size_mode, int(size[0]), int(size[2]), size[3], size[1] != '+')]
+        ctx           = mp.get_context('spawn')
+        workers       = min(workers, len(segments))
+        maxlen        = SEGMENT_QUEUE + 1  # + end of segment marker
+        self.ordered  = ordered
+        self.queues   = [ctx.Queue(maxlen) for _ in range(workers)] if ordered else [ctx.Queue(maxlen * workers)]
+        self.procs    = [ctx.Process(target=decode_segments, args=(source, segments[i::workers], ops, rgb, threads,
+            self.queues[i if ordered else 0]), daemon=True) for i in range(workers)]
+        self.segments = len(segments)
+        self.segment  = 0  # segments read so far
+        self.index    = None
+
+        logger.debug(f'video split into {len(segments)} segments of {count} frames for {workers} decode processes: '
+            f'{hide_uri_users_and_pwds(source)}')
+
+    def start(self):
+        for proc in self.procs:
+            if proc.pid is None:
+                proc.start()
+
+    def stop(self):
+        for proc in self.procs:
+            if proc.pid is not None and proc.is_alive():
+                proc.terminate()
+
+        for queue in self.queues:
+            queue.cancel_join_thread()
+
+    def read(self):  # -> np.ndarray | None
+        while (segment := self.segment) < self.segments:
+            queue = self.queues[segment % len(self.queues) if self.ordered else 0]
+
+            try:
+                idx, image = queue.get(timeout=1)
+
+            except Empty:
+                if any(proc.exitcode not in (None, 0) for proc in self.procs):  # None here also means not started
+                    logger.error('video decode process died')
+
+                    return None
+
+                continue
+
+            if idx is None:
+                self.segment = segment + 1
+
+                continue
+
+            self.index = idx
+
+            return image
+
+        return None
+
+
 class VideoReader:
     def __init__(self,
-        source:  str,
-        cond:    Condition | None = None,
+        source:        str,
+        cond:          Condition | None = None,
         *,
-        bgr:     bool | None = None,
-        sync:    bool | None = None,
-        loop:    bool | int = False,
-        maxfps:  float | None = None,
-        maxsize: str | None = None,
-        resize:  str | None = None,
-        region:  str | None = None,
-        expiration: int | None = None,
+        bgr:           bool | None = None,
+        sync:          bool | None = None,
+        loop:          bool | int = False,
+        maxfps:        float | None = None,
+        maxsize:       str | None = None,
+        resize:        str | None = None,
+        region:        str | None = None,
+        expiration:    int | None = None,
+        decoder:       str | None = None,
+        threads:       int | None = None,
+        skip_nonkey:   bool = False,
+        lowres:        int | None = None,
+        step:          int | None = None,
+        passthrough:   bool = False,
+        mjpeg:         bool = False,
+        reconnect:     bool | None = None,
+        stale_timeout: float | None = None,
+        prefetch:      int | None = None,
+        parallel:      int | None = None,
+        ordered:       bool | None = None,
     ):
         """Read a single video file, network stream or webcam until the end.
 
@@ -151,14 +649,93 @@ class VideoReader:
                 interpolation, default is 'near'est neighbor.
 
             resize: Straight resize always, can not be specified together with `maxsize`, it is one or the other.
-        """
 
-        from vidgear.gears import VideoGear
+            decoder: 'vidgear' (VideoGear, threaded reads), 'opencv' (direct cv2.VideoCapture) or 'ffmpeg' (ffmpeg
+                subprocess, which also applies `maxsize` / `resize` and RGB conversion in its decode pass). Has env var
+                default.
+
+            threads: Number of decoder threads, needs 'opencv' or 'ffmpeg' decoder. None leaves it to the decoder.
+
+            skip_nonkey: Only decode keyframes, needs 'ffmpeg' decoder. For low rate monitoring of streams.
+
+            lowres: Decode at 1/2, 1/4 or 1/8 resolution (1, 2 or 3) in the decoder itself for codecs which support it
+                (mostly older ones like MJPEG, MPEG-2/4, not H.264 / H.265), needs 'ffmpeg' decoder.
+
+            step: Only has meaning for files. Return only every `step`th frame, the ones in between are skipped as cheaply
+                as the decoder allows (seek or grab without retrieve for 'opencv', not converted for 'ffmpeg').
+
+            passthrough: Do not decode at all, read() returns compressed Packets instead of images. Uses the 'opencv'
+                decoder and can not be combined with anything that would need to drop or modify individual frames
+                (`maxsize`, `resize`, `maxfps`, `step`). Packets are not dropped to stay realtime like images are,
+                instead if the reader gets a whole GOP ahead of the consumer then it drops back to the next keyframe.
+
+            mjpeg: The source is MJPEG (HTTP multipart, RTSP MJPEG or an MJPEG file), read() returns jpg-only Frames
+                (Frame.from_jpg()) with the jpgs as they came from the source, nothing is decoded unless something
+                downstream needs the pixels. HTTP is read directly, others with the 'opencv' decoder in raw mode. Can
+                not be combined with `maxsize` or `resize`.
+
+            reconnect: Only has meaning for videos which are not files. If True then when the stream is lost or stops
+                delivering frames it is reopened with exponential backoff between VIDEO_IN_BACKOFF_MIN and
+                VIDEO_IN_BACKOFF_MAX seconds until it comes back or the reader is stopped, instead of ending the video.
+                Reconnects are counted in `reconnects` and time spent down in `downtime`. In `passthrough` mode packets
+                resume at the first keyframe of the new connection. Has env var default.
+
+            stale_timeout: Seconds to wait for a network stream to open or deliver a frame before considering it lost.
+                Applies to the 'opencv' and 'ffmpeg' decoders and HTTP MJPEG, 'vidgear' has OpenCV's fixed timeout.
+                Has env var default.
+
+            prefetch: Only has meaning for `sync` files. Number of frames to decode ahead of the consumer, so that
+                decoding of the next frames overlaps with processing of the current one instead of waiting for it to be
+                read. No frames are skipped, the reader just blocks when this many are waiting. Has env var default.
+
+            parallel: Only for `sync` files, decode in this many worker processes at once, each taking keyframe-aligned
+                segments of the file (see ParallelStream). Uses the 'opencv' decoder and can not be combined with
+                `loop`, `step`, `passthrough` or `mjpeg`. The index in the file of the frame last read is in `index`.
+
+            ordered: With `parallel`, if True (or None) then frames come out in file order, otherwise in the order they are
+                decoded, which keeps all workers busy even if one segment is slow.
+        """
 
         if not isinstance((loop := VIDEO_IN_LOOP if loop is None else loop), (bool, int)) or loop < 0:
             raise ValueError(f"invalid loop '{loop}', must be a bool or nonnegative integer")
-
-        self.VideoGear     = VideoGear
+        if (passthrough or mjpeg or parallel) and decoder not in (None, 'opencv'):
+            raise ValueError("'passthrough', 'mjpeg' and 'parallel' need decoder 'opencv'")
+        if parallel is not None and (isinstance(parallel, bool) or not isinstance(parallel, int) or parallel < 1):
+            raise ValueError(f'invalid parallel {parallel!r}, must be a positive int')
+        if passthrough and mjpeg:
+            raise ValueError("can not have both 'passthrough' and 'mjpeg'")
+        if mjpeg and is_video_webcam(source):
+            raise ValueError("'mjpeg' does not support webcams")
+        if (decoder := 'opencv' if passthrough or mjpeg or parallel else VIDEO_IN_DECODER if decoder is None else decoder) not in VIDEO_IN_DECODERS:
+            raise ValueError(f'invalid decoder {decoder!r}, must be one of: {", ".join(VIDEO_IN_DECODERS)}')
+        if threads is not None and (isinstance(threads, bool) or not isinstance(threads, int) or threads < 1):
+            raise ValueError(f'invalid threads {threads!r}, must be a positive int')
+        if lowres is not None and (isinstance(lowres, bool) or lowres not in (0, 1, 2, 3)):
+            raise ValueError(f'invalid lowres {lowres!r}, must be 0, 1, 2 or 3')
+        if step is not None and (isinstance(step, bool) or not isinstance(step, int) or step < 1):
+            raise ValueError(f'invalid step {step!r}, must be a positive int')
+        if threads is not None and decoder == 'vidgear':
+            raise ValueError("'threads' needs decoder 'opencv' or 'ffmpeg'")
+        if (skip_nonkey or lowres) and decoder != 'ffmpeg':
+            raise ValueError("'skip_nonkey' and 'lowres' need decoder 'ffmpeg'")
+        if decoder == 'ffmpeg' and is_video_webcam(source):
+            raise ValueError("decoder 'ffmpeg' does not support webcams")
+        if isinstance(prefetch := VIDEO_IN_PREFETCH if prefetch is None else prefetch, bool) or \
+                not isinstance(prefetch, int) or prefetch < 1:
+            raise ValueError(f'invalid prefetch {prefetch!r}, must be a positive int')
+        if (stale_timeout := VIDEO_IN_STALE_TIMEOUT if stale_timeout is None else stale_timeout) is not None and \
+                (isinstance(stale_timeout, bool) or not isinstance(stale_timeout, (int, float)) or stale_timeout <= 0):
+            raise ValueError(f'invalid stale_timeout {stale_timeout!r}, must be a positive number')
+
+        self.decoder       = decoder
+        self.passthrough   = bool(passthrough)
+        self.mjpeg         = bool(mjpeg)
+        self.parallel      = parallel
+        self.ordered       = ordered is None or bool(ordered)
+        self.index         = None  # index in file of frame last read, only with `parallel`
+        self.grab          = decoder == 'opencv' and not (passthrough or mjpeg or parallel)  # grab / retrieve split so that frames dropped for maxfps are not retrieved
+        self.step          = step or 1
+        self.step_next     = False  # skip `step` - 1 frames before next read
         self.source        = hide_uri_users_and_pwds(source)
         self.cond          = cond
         self.loop          = 0 if loop is True else 1 if loop is False else loop
@@ -166,14 +743,24 @@ class VideoReader:
         self.maxsize       = None if (s := VIDEO_IN_MAXSIZE if maxsize is None else maxsize) is None else parse_size(s)
         self.resize        = None if (s := VIDEO_IN_RESIZE if resize is None else resize) is None else parse_size(s)
         self.state         = 0     # 0 = before start, 1 = playing, 2 = stopped / done
-        self.sync_evt      = None  # this is set only for file fideo with 'sync' option True
+        self.sync_sem      = None  # this is set only for file fideo with 'sync' option True, one count per frame which may be decoded ahead
+        self.prefetch      = 1
         self.ns_per_fps    = None  # this is set only for file video with 'sync' option False
         self.ns_per_maxfps = None if maxfps is None else 1_000_000_000 // maxfps
         self.is_file       = is_file = is_video_file(source) or is_video_s3(source)
         self.as_bgr        = bool(VIDEO_IN_BGR if bgr is None else bgr)  # only validated after first frame is read (set to False if frames are grayscale)
+        self.reconnect     = bool(VIDEO_IN_RECONNECT if reconnect is None else reconnect) and not is_file
+        self.reconnects    = 0
+        self.down_t        = None  # time() the stream was lost if currently reconnecting
+        self.down_time     = 0.    # total seconds spent reconnecting, not including current outage
+        self.wait_key      = False  # passthrough after reconnect, drop packets until a keyframe
 
         if self.maxsize and self.resize:
             raise ValueError(f"can not specify both 'maxsize' and 'resize' together in {self.source!r}")
+        if passthrough and (self.maxsize or self.resize or maxfps is not None or self.step > 1):
+            raise ValueError(f"'passthrough' can not be combined with 'maxsize', 'resize', 'maxfps' or 'step' in {self.source!r}")
+        if mjpeg and (self.maxsize or self.resize):
+            raise ValueError(f"'mjpeg' can not be combined with 'maxsize' or 'resize' in {self.source!r}")
 
         if is_file:
             if is_video_file(source):
@@ -190,25 +777,44 @@ class VideoReader:
             self.is_file = True
 
             if sync := VIDEO_IN_SYNC if sync is None else sync:
-                self.sync_evt = Event()
+                self.sync_sem = Semaphore(prefetch)
+                self.prefetch = prefetch
 
-                self.sync_evt.set()
+            elif prefetch > 1:
+                logger.warning(f"'prefetch' only applies to 'sync' videos in {self.source!r}")
 
         else:
             if sync:
                 logger.warning(f"'sync' does not apply to videos which are not files in {self.source!r}")
+            if prefetch > 1:
+                logger.warning(f"'prefetch' does not apply to videos which are not files in {self.source!r}")
+            if self.step > 1:
+                logger.warning(f"'step' does not apply to videos which are not files in {self.source!r}")
+
+                self.step = 1
 
             if is_video_webcam(source):
                 source = int(source[9:])
             elif not is_video_stream(source):
                 raise ValueError(f'invalid source {self.source!r}')
 
+        if parallel and (self.sync_sem is None or self.loop != 1 or self.step > 1 or passthrough or mjpeg):
+            raise ValueError(f"'parallel' needs a 'sync' file without 'loop', 'step', 'passthrough' or 'mjpeg' in {self.source!r}")
+
         self.ssource  = source  # for VideoGear with 'file://' stripped and 'webcam://num' converted to num
+        self.timeout  = None if is_file or not is_video_stream(source) else stale_timeout
+        self.dec_opts = {'threads': threads, **({'raw': True} if passthrough or mjpeg else {}), **({'skip_nonkey': skip_nonkey, 'lowres': lowres, 'step': self.step,
+            'size': self.maxsize or self.resize, 'size_mode': 'maxsize' if self.maxsize else 'resize',
+            'rgb': not self.as_bgr} if decoder == 'ffmpeg' else {}),
+            **({} if self.timeout is None else {'timeout': int(self.timeout * 1000) if decoder == 'opencv' else self.timeout})}
         self.stop_evt = Event()
-        self.deque    = Deque(maxlen=1)
+        self.deque    = Deque(maxlen=None if passthrough or self.sync_sem else 1)  # packets can't be dropped singly, see thread_reader(), sync bounded by sync_sem
         self.thread   = Thread(target=self.thread_reader, daemon=True)  # vidgear will not skip images in a stream to stay realtime so we have to do it ourselves
-        self.stream   = vid = VideoGear(source=source)
-        fps           = vid.stream.framerate
+        self.stream   = vid = self.open_stream()
+        fps           = vid.stream.framerate if decoder == 'vidgear' else vid.framerate
+
+        if fps and self.step > 1:
+            fps = fps / self.step
 
         if is_file and not sync:
             self.ns_per_fps = 1_000_000_000 // (fps or 15)  # vidgear reads files as fast as possible, this is to keep it realtime, default to 15 if video doesn't provide fixed framerate
@@ -242,6 +848,74 @@ class VideoReader:
 
         return item
 
+    def open_stream(self):  # -> VideoGear | CV2Stream | FFmpegStream | MJPEGStream | ParallelStream, not started
+        if self.parallel:
+            return ParallelStream(self.ssource, self.parallel, self.ordered, self.dec_opts['threads'],
+                self.maxsize or self.resize, 'maxsize' if self.maxsize else 'resize', not self.as_bgr)
+
+        if self.mjpeg and self.ssource.startswith(('http://', 'https://')):
+            return MJPEGStream(self.ssource, **({} if self.timeout is None else {'timeout': self.timeout}))
+
+        if (decoder := self.decoder) == 'vidgear':
+            from vidgear.gears import VideoGear
+
+            return VideoGear(source=self.ssource)
+
+        return CV2Stream(self.ssource, **self.dec_opts) if decoder == 'opencv' else \
+            FFmpegStream(self.ssource, **self.dec_opts)
+
+    def reconnect_stream(self) -> bool:  # from reader thread, True when reconnected, False if stopped while trying
+        self.down_t = down_t = time()
+        fails       = 0
+
+        logger.warning(f'video lost, reconnecting: {self.source}')
+
+        try:
+            self.stream.stop()
+        except Exception:
+            pass
+
+        while not self.stop_evt.wait(delay := min(VIDEO_IN_BACKOFF_MAX, VIDEO_IN_BACKOFF_MIN * 2 ** fails)):
+            try:
+                stream = self.open_stream()
+
+                stream.start()
+
+            except Exception as exc:
+                fails += 1
+
+                logger.warning(f'video reconnect failed ({exc}), retrying in {min(VIDEO_IN_BACKOFF_MAX, delay * 2):.1f}s: {self.source}')
+
+                continue
+
+            if self.stop_evt.is_set():  # stop() may have stopped the old stream in the meantime
+                stream.stop()
+
+                break
+
+            self.stream      = stream
+            self.wait_key    = self.passthrough
+            self.reconnects += 1
+            self.down_time  += time() - down_t
+            self.down_t      = None
+
+            logger.info(f'video reconnected after {time() - down_t:.1f}s: {self.source}')
+
+            return True
+
+        return False
+
+    def skip(self, n: int):  # skip `n` frames as cheaply as the decoder allows
+        if (decoder := self.decoder) == 'opencv':
+            self.stream.skip(n)
+
+        elif decoder == 'vidgear':
+            for _ in range(n):
+                if self.stream.read() is None:
+                    break
+
+        # 'ffmpeg' drops them in its 'select' filter
+
     def start(self):  # idempotent and safe to call whenever
         if self.state != 0:
             return
@@ -266,9 +940,8 @@ class VideoReader:
             t = time_ns()
 
             if self.is_file:
-                if (sync_evt := self.sync_evt) is not None:
-                    sync_evt.wait()
-                    sync_evt.clear()
+                if (sync_sem := self.sync_sem) is not None:
+                    sync_sem.acquire()
 
                     if (ns_per_maxfps := self.ns_per_maxfps) is not None:  # sleep until we reach maxfps
                         if (tleft := (ns_per_maxfps - ((t := time_ns()) - (tmaxfps := self.tmaxfps)))) > 0:
@@ -295,9 +968,20 @@ class VideoReader:
 
             return True
 
+        grab = self.grab
+        read = lambda: self.stream.grab() if grab else self.stream.read()  # grab() returns True instead of image
+
         while True:
-            if (image := self.stream.read()) is None:
+            if self.step_next:
+                self.skip(self.step - 1)
+
+            self.step_next = self.step > 1
+
+            if (image := read()) is None:
                 if not self.is_file:
+                    if self.reconnect and self.reconnect_stream():
+                        continue
+
                     return None
 
                 # We do the wait()s below in order to maintain the last frame for the same amount of time as others
@@ -318,7 +1002,7 @@ class VideoReader:
                     logger.info(f'video loop: {self.source}{f"  (last loop)" if loop == 2 else f"  ({self.loop} left)" if loop else ""}')
 
                     self.stream.stop()
-                    self.stream = self.VideoGear(source=self.ssource)
+                    self.stream = self.open_stream()
                     self.stream.start()
 
                 except Exception:
@@ -326,74 +1010,59 @@ class VideoReader:
 
                     return None
 
-                if (image := self.stream.read()) is None:  # no wait() here because if first frame is None then nothing means anything anymore and we might as well just end it
+                if (image := read()) is None:  # no wait() here because if first frame is None then nothing means anything anymore and we might as well just end it
                     return None
 
             if wait():
                 break
 
-        return image
+        return self.stream.retrieve() if grab else image
 
     def thread_reader(self):  # vidgear will not skip images in a stream to stay realtime so we have to do it ourselves
         cond = self.cond
+        ops  = []
 
-        if size := (maxsize := self.maxsize) or self.resize:
+        if (size := (maxsize := self.maxsize) or self.resize) and not (self.decoder == 'ffmpeg' or self.parallel):  # already done
             width, aspect, height, interp = size
 
-            width  = int(width)
-            height = int(height)
-            aspect = aspect != '+'
-            interp = (
-                cv2.INTER_NEAREST
-                if interp is None or (interp := interp.upper()[:1]) == 'N' else
-                cv2.INTER_CUBIC
-                if interp == 'C' else
-                cv2.INTER_NEAREST
-            )
+            ops.append(('maxsize' if maxsize else 'resize', int(width), int(height), interp, aspect != '+'))
+
+        ops_gray  = FrameOps(ops)  # resize and color conversion fused into one pass with reused intermediate buffers
+        ops_color = ops_gray if self.as_bgr or self.decoder == 'ffmpeg' or self.parallel else FrameOps(ops + [('format', 'RGB')])
 
         while True:
             image  = None if self.stop_evt.is_set() else self.read_one()
             tframe = time_ns()
 
             if image is not None:
-                shape = image.shape
-
-                if size:
-                    h, w, *_ = shape
-
-                    if maxsize:
-                        if (hgt := (oh := h) > height) + (wgt := (ow := w) > width):
-                            if aspect:
-                                if not hgt:
-                                    h = int(h * width / w)
-                                elif not wgt:
-                                    w = int(w * height / h)
-                                else:
-                                    h = int(h * (s := min(width / w, height / h)))
-                                    w = int(w * s)
-
-                            if (newsize := (min(width, w), min(height, h))) != (ow, oh):
-                                image = cv2.resize(image, newsize, interpolation=interp)
-
-                    else:  # resize
-                        if (hne := h != height) + (wne := w != width):
-                            if not aspect:
-                                newsize = (width, height)
-                            elif not hne:
-                                newsize = (width, int(h * width / w))
-                            elif not wne:
-                                newsize = (int(w * height / h), height)
-                            else:
-                                newsize = (int(w * (s := min(width / w, height / h))), int(h * s))
-
-                            image = cv2.resize(image, newsize, interpolation=interp)
-
-                if len(shape) != 3:
+                if self.mjpeg:
+                    try:
+                        jpg    = image.data if isinstance(image, Packet) else image
+                        height = (header := jpg_header(jpg))[0]
+                        image  = Frame.from_jpg(jpg, None, height, header[1], 'GRAY' if header[2] == 1 else 'BGR')
+
+                    except Exception:
+                        logger.error(f'video is not MJPEG or got a truncated jpg, stopping: {self.source}')
+
+                        image = None
+
+                elif self.passthrough:
+                    if image.key:
+                        self.wait_key = False
+
+                        if self.deque:  # consumer fell behind by a GOP, drop back to this keyframe
+                            self.deque.clear()
+
+                    elif self.wait_key:  # resuming after reconnect, can't start mid GOP
+                        continue
+
+                elif len(image.shape) != 3:
                     self.as_bgr = False  # because not validated on init
-                elif not self.as_bgr:
-                    image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+                    image, _    = ops_gray(image, 'GRAY')
+                else:
+                    image, _    = ops_color(image, 'BGR')
 
-            self.deque.append((image, tframe))
+            self.deque.append((image, tframe) if image is None or not self.parallel else (image, tframe, self.stream.index))
 
             if cond is not None:
                 with cond:
@@ -402,7 +1071,8 @@ class VideoReader:
             if image is None:
                 break
 
-        self.state = 2
+        if self.sync_sem is None:  # otherwise frames may still be queued ahead of the None, which ends it in read()
+            self.state = 2
 
     @property
     def playing(self) -> bool:
@@ -416,21 +1086,44 @@ class VideoReader:
     def frame_available(self) -> bool:
         return bool(self.deque)
 
+    @property
+    def reconnecting(self) -> bool:
+        return self.down_t is not None
+
+    @property
+    def downtime(self) -> float:  # total seconds spent reconnecting, including current outage
+        return self.down_time + (0. if (down_t := self.down_t) is None else time() - down_t)
+
+    def throttle(self, maxfps: float | None):  # dynamic limit on top of static `maxfps`, None removes it, takes effect on next frame
+        if self.passthrough:  # dropping single packets would corrupt the stream
+            return
+
+        if (static := self.maxfps) is not None:
+            maxfps = static if maxfps is None else min(maxfps, static)
+
+        self.ns_per_maxfps = None if maxfps is None else int(1_000_000_000 // maxfps)
+
     def read(self, with_tframe=False):  # -> np.ndarray | tuple[np.ndarray, int] | None
         if self.state == 0:
             raise RuntimeError('can not read from video before it is started')
         elif self.state == 2:
             return None
 
-        if (image_n_tframe := self.deque.popleft()) is None:
+        if (image_n_tframe := self.deque.popleft())[0] is None:
             self.state = 2
 
             self.stream.stop()
 
             return None
 
-        if (sync_evt := self.sync_evt) is not None:
-            sync_evt.set()
+        if self.parallel:
+            image_n_tframe, self.index = image_n_tframe[:2], image_n_tframe[2]
+
+        if (sync_sem := self.sync_sem) is not None:
+            sync_sem.release()
+
+            if self.prefetch > 1:  # stamp when it is handed out, not when it was decoded ahead, so latency is not skewed
+                image_n_tframe = (image_n_tframe[0], time_ns())
 
         return image_n_tframe if with_tframe else image_n_tframe[0]
 
@@ -457,10 +1150,14 @@ class VideoReader:
 
 
 class MultiVideoReader:
-    """Read multiple videos simultaneously returning time-synchronized frames until one of them is exhausted."""
+    """Read multiple videos simultaneously. With `emit` 'all' returns time-synchronized frames of all videos as a list
+    until one of them is exhausted. Otherwise returns {video index: frame} of only the videos which have a new frame, as
+    soon as any has one ('any') or once all have one or `timeout:ms` has passed since the first one did, until all of
+    them are exhausted, so a slow or stalled video doesn't hold up the others."""
 
-    def __init__(self, sources: list[str], sources_kwargs: list[dict[str, Any]] | None = None):
+    def __init__(self, sources: list[str], sources_kwargs: list[dict[str, Any]] | None = None, emit: str = 'all'):
         kwargss     = [{}] * len(sources) if sources_kwargs is None else sources_kwargs
+        self.emit   = parse_emit(emit)
         self.cond   = cond = Condition()
         self.videos = [VideoReader(source, cond, **kwargs) for source, kwargs in zip(sources, kwargss)]
         self.state  = 0  # 0 = before start, 1 = playing, 2 = stopped / done
@@ -504,18 +1201,51 @@ class MultiVideoReader:
     def frame_available(self) -> bool:
         return all(vid.frame_available for vid in self.videos)
 
-    def read(self, with_tframe=False):  # -> list[np.ndarray | tuple[np.ndarray, int]] | None
+    def read(self, with_tframe=False, timeout: float | None = None):  # -> list | dict[int, np.ndarray | tuple[np.ndarray, int]] | None, {} on timeout
         if self.state == 0:
             raise RuntimeError('can not read from videos before they are started')
         elif self.state == 2:
             return None
 
-        cond   = self.cond
-        videos = self.videos
+        cond    = self.cond
+        videos  = self.videos
+        timeout = None if timeout is None else time() + timeout  # now a deadline
+
+        if (emit := self.emit) != 'all':
+            while True:
+                with cond:
+                    deadline = None
+
+                    while True:
+                        live  = [idx for idx, video in enumerate(videos) if not video.stopped]
+                        avail = [idx for idx in live if videos[idx].frame_available]
+
+                        if not live or avail and (emit == 'any' or len(avail) == len(live) or
+                                deadline is not None and time() >= deadline):
+                            break
+
+                        if avail and deadline is None:
+                            deadline = time() + emit
+
+                        if not avail and timeout is not None and time() >= timeout:
+                            return {}
+
+                        cond.wait(None if (wait_t := deadline if avail else timeout) is None else max(0, wait_t - time()))
+
+                if not live:
+                    self.stop()
+
+                    return None
+
+                if images := {idx: image for idx in avail if (image := videos[idx].read(with_tframe)) is not None}:
+                    return images  # otherwise only ends of videos were available, wait again for the others
 
         while not all(video.frame_available for video in videos):
+            if timeout is not None and time() >= timeout:
+                return {}
+
             with cond:
-                cond.wait()
+                cond.wait(None if timeout is None else max(0, timeout - time()))
 
         images = [video.read(with_tframe) for video in videos]
 
@@ -527,9 +1257,299 @@ class MultiVideoReader:
         return images
 
 
+class PooledVideo:
+    """One source of a VideoPool. A small state machine stepped by whichever pool worker picks it up: 'connecting' ->
+    'streaming' -> (error) 'backoff' -> 'streaming' ..., or 'looping' instead of 'backoff' when a file ends. Has the
+    attributes of VideoReader which VideoIn uses."""
+
+    def __init__(self,
+        source:  str,
+        pool:    'VideoPool',
+        *,
+        bgr:     bool | None = None,
+        maxfps:  float | None = None,
+        maxsize: str | None = None,
+        resize:  str | None = None,
+        threads: int | None = None,
+    ):
+        if not is_video(source) or is_video_s3(source):
+            raise ValueError(f'invalid pooled source {hide_uri_users_and_pwds(source)!r}')
+        if threads is not None and (isinstance(threads, bool) or not isinstance(threads, int) or threads < 1):
+            raise ValueError(f'invalid threads {threads!r}, must be a positive int')
+
+        self.source        = hide_uri_users_and_pwds(source)
+        self.ssource       = int(source[9:]) if is_video_webcam(source) else source[7:] if is_video_file(source) else source
+        self.is_file       = is_video_file(source)
+        self.pool          = pool
+        self.threads       = threads
+        self.as_bgr        = bool(VIDEO_IN_BGR if bgr is None else bgr)
+        self.maxfps        = maxfps = VIDEO_IN_MAXFPS if maxfps is None else maxfps
+        self.ns_per_maxfps = None if maxfps is None else int(1_000_000_000 // maxfps)
+        self.passthrough   = self.mjpeg = False
+        self.parallel      = None
+        self.fps           = None
+        self.state         = 'connecting'
+        self.fails         = 0     # consecutive failed connects, for backoff
+        self.reconnects    = 0
+        self.down_t        = None  # time() of going into backoff if currently down
+        self.down_time     = 0.    # total seconds spent down, not including current outage
+        self.stream        = None
+        self.frame         = None  # latest (image, tframe) not yet read from the pool
+        self.busy          = False  # being stepped by a worker, protected by pool.sched
+        ops                = []
+        maxsize            = VIDEO_IN_MAXSIZE if maxsize is None else maxsize
+        resize             = VIDEO_IN_RESIZE if resize is None else resize
+
+        if maxsize and resize:
+            raise ValueError(f"can not specify both 'maxsize' and 'resize' together in {self.source!r}")
+
+        if size := maxsize or resize:
+            width, aspect, height, interp = parse_size(size)
+
+            ops.append(('maxsize' if maxsize else 'resize', int(width), int(height), interp, aspect != '+'))
+
+        self.ops_gray  = FrameOps(ops)
+        self.ops_color = self.ops_gray if self.as_bgr else FrameOps(ops + [('format', 'RGB')])
+
+    @property
+    def reconnecting(self) -> bool:
+        return self.down_t is not None
+
+    @property
+    def downtime(self) -> float:  # same as VideoReader.downtime
+        return self.down_time + (0. if (down_t := self.down_t) is None else time() - down_t)
+
+    def throttle(self, maxfps: float | None):  # same as VideoReader.throttle()
+        if (static := self.maxfps) is not None:
+            maxfps = static if maxfps is None else min(maxfps, static)
+
+        self.ns_per_maxfps = None if maxfps is None else int(1_000_000_000 // maxfps)
+
+    def close(self):
+        if (stream := self.stream) is not None:
+            self.stream = None
+
+            stream.stop()
+
+    def backoff(self, t: int, reason: str) -> int:
+        self.close()
+
+        if self.is_file and reason == 'ended':  # files just restart like a camera that reconnects immediately
+            logger.debug(f'video loop: {self.source}')
+
+            self.state = 'looping'
+
+            return t
+
+        delay       = min(VIDEO_IN_BACKOFF_MAX, VIDEO_IN_BACKOFF_MIN * 2 ** self.fails)
+        self.fails += 1
+        self.state  = 'backoff'
+
+        if self.down_t is None:
+            self.down_t = time()
+
+        logger.warning(f'video {reason}, reconnecting in {delay:.1f}s: {self.source}')
+
+        return t + int(delay * 1_000_000_000)
+
+    def step(self) -> int:
+        """Connect or read one frame, returns time_ns() when this source should be stepped next."""
+
+        t = time_ns()
+
+        if (stream := self.stream) is None:
+            try:
+                self.stream = stream = CV2Stream(self.ssource, self.threads, timeout=int(VIDEO_IN_STALE_TIMEOUT * 1000))
+            except Exception as exc:
+                return self.backoff(t, f'open failed ({exc})')
+
+            if (down_t := self.down_t) is not None:
+                self.reconnects += 1
+                self.down_time  += time() - down_t
+                self.down_t      = None
+
+            log          = logger.debug if self.is_file and self.state == 'looping' else logger.info
+            self.fps     = fps = stream.framerate
+            self.period  = int(1_000_000_000 // (fps or 30))
+            self.anchor  = None  # wall time of stream time 0
+            self.pos     = -1
+            self.tmaxfps = t
+            self.state   = 'streaming'
+
+            log(f'video open: {self.source}' + ('' if fps is None else f'  ({fps:.1f} fps)'))
+
+            return time_ns()
+
+        if not stream.grab():
+            return self.backoff(t, 'ended')
+
+        tread  = time_ns()
+        period = self.period
+
+        if (pos := int(stream.cap.get(cv2.CAP_PROP_POS_MSEC) * 1_000_000)) <= self.pos:  # no usable timestamps
+            pos = self.pos + period
+
+        self.pos = pos
+
+        # The next read is scheduled for when the next frame should be there going by stream time. If the read blocked
+        # then the frame arrived just now so stream time is re-anchored to it. If it didn't block but we are past when
+        # the next frame is due then frames are buffered up because we fell behind and we read again right away.
+
+        if (anchor := self.anchor) is None or tread - t >= period // 2:
+            self.anchor = anchor = tread - pos
+
+        due = anchor + pos + period + period // 8
+
+        if (ns_per_maxfps := self.ns_per_maxfps) is not None:  # drop without retrieving until we reach maxfps
+            if (tdiff := tread - (tmaxfps := self.tmaxfps)) < ns_per_maxfps:
+                return due
+
+            self.tmaxfps = tmaxfps + (tdiff // ns_per_maxfps) * ns_per_maxfps
+
+        if (image := stream.retrieve()) is None:
+            return self.backoff(t, 'retrieve failed')
+
+        if len(image.shape) != 3:
+            self.as_bgr = False
+            image, _    = self.ops_gray(image, 'GRAY')
+        else:
+            image, _    = self.ops_color(image, 'BGR')
+
+        self.fails = 0
+
+        with (cond := self.pool.cond):
+            self.frame = (image, time_ns())
+
+            cond.notify_all()
+
+        return due
+
+
+class VideoPool:
+    """Read many sources, typically cameras, with a small fixed pool of worker threads instead of the two threads per
+    source of MultiVideoReader. Sources sit on a heap ordered by when their next frame is due and a free worker takes
+    the most overdue one, steps it once (connect, read one frame or back off) and puts it back. A source which fell
+    behind is read back to back until it catches up and a dead or slow source only holds up the one worker waiting on
+    it, for at most VIDEO_IN_STALE_TIMEOUT seconds. Sources never end, they reconnect with exponential backoff (files
+    restart). read() returns as soon as any source has a new frame, with only the sources which do."""
+
+    def __init__(self, sources: list[str], sources_kwargs: list[dict[str, Any]] | None = None, workers: int = 4):
+        kwargss      = [{}] * len(sources) if sources_kwargs is None else sources_kwargs
+        self.cond    = Condition()  # new frames
+        self.sched   = Condition()  # heap
+        self.videos  = [PooledVideo(source, self, **kwargs) for source, kwargs in zip(sources, kwargss)]
+        self.heap    = [(0, idx) for idx in range(len(sources))]  # [(due time_ns, video index), ...]
+        self.workers = [Thread(target=self.worker, daemon=True) for _ in range(min(workers, len(sources)))]
+        self.state   = 0  # 0 = before start, 1 = playing, 2 = stopped
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if (item := self.read()) is None:
+            raise StopIteration
+
+        return item
+
+    def start(self):  # idempotent and safe to call whenever
+        if self.state != 0:
+            return
+
+        self.state = 1
+
+        for worker in self.workers:
+            worker.start()
+
+    def stop(self):  # idempotent and safe to call whenever, streams being read are closed by their worker
+        if self.state != 1:
+            return
+
+        with self.sched:
+            self.state = 2
+
+            for video in self.videos:
+                if not video.busy:
+                    video.close()
+
+            self.sched.notify_all()
+
+        with self.cond:
+            self.cond.notify_all()
+
+    def worker(self):
+        sched = self.sched
+        heap  = self.heap
+
+        while True:
+            with sched:
+                while self.state == 1 and not (heap and (tleft := heap[0][0] - time_ns()) <= 0):
+                    sched.wait(tleft / 1_000_000_000 if heap else None)
+
+                if self.state != 1:
+                    return
+
+                _, idx     = heappop(heap)
+                video      = self.videos[idx]
+                video.busy = True
+
+            try:
+                due = video.step()
+            except Exception as exc:
+                due = video.backoff(time_ns(), f'error ({exc})')
+
+            with sched:
+                video.busy = False
+
+                if self.state != 1:
+                    video.close()
+
+                    return
+
+                heappush(heap, (due, idx))
+                sched.notify()
+
+    @property
+    def playing(self) -> bool:
+        return self.state == 1
+
+    @property
+    def stopped(self) -> bool:
+        return self.state == 2
+
+    @property
+    def frame_available(self) -> bool:
+        return any(video.frame is not None for video in self.videos)
+
+    def read(self, with_tframe=False, timeout: float | None = None):  # -> dict[int, np.ndarray | tuple[np.ndarray, int]] | None, {video index: ...}, {} on timeout
+        if self.state == 0:
+            raise RuntimeError('can not read from videos before they are started')
+
+        videos   = self.videos
+        deadline = None if timeout is None else time() + timeout
+
+        with self.cond:
+            while self.state == 1 and not any(video.frame is not None for video in videos):
+                if deadline is not None and (tleft := deadline - time()) <= 0:
+                    return {}
+
+                self.cond.wait(None if deadline is None else tleft)
+
+            if self.state != 1:
+                return None
+
+            images = {}
+
+            for idx, video in enumerate(videos):
+                if (image_n_tframe := video.frame) is not None:
+                    images[idx] = image_n_tframe if with_tframe else image_n_tframe[0]
+                    video.frame = None
+
+        return images
+
+
 # --- CUT HERE ---------------------------------------------------------------------------------------------------------
 
-from openfilter.filter_runtime.filter import is_cached_file, Frame, FilterConfig, Filter
+from openfilter.filter_runtime.filter import is_cached_file, is_mq_addr, Frame, FilterConfig, Filter
 from openfilter.filter_runtime.utils import adict, split_commas_maybe
 
 __all__ = __all__ + ['VideoInConfig', 'VideoIn']
@@ -540,14 +1560,26 @@ is_video_or_cached_file = lambda s: is_video(s) or is_cached_file(s)
 class VideoInConfig(FilterConfig):
     class Source(adict):
         class Options(adict):
-            bgr:        bool | None
-            sync:       bool | None
-            loop:       bool | int | None
-            maxfps:     float | None
-            maxsize:    str | None
-            resize:     str | None
-            region:     str | None
-            expiration: int | None
+            bgr:           bool | None
+            sync:          bool | None
+            loop:          bool | int | None
+            maxfps:        float | None
+            maxsize:       str | None
+            resize:        str | None
+            region:        str | None
+            expiration:    int | None
+            decoder:       str | None
+            threads:       int | None
+            skip_nonkey:   bool | None
+            lowres:        int | None
+            step:          int | None
+            passthrough:   bool | None
+            mjpeg:         bool | None
+            reconnect:     bool | None
+            stale_timeout: float | None
+            prefetch:      int | None
+            parallel:      int | None
+            ordered:       bool | None
 
         source:  str
         topic:   str | None
@@ -562,6 +1594,20 @@ class VideoInConfig(FilterConfig):
     maxfps:  float | None
     maxsize: str | None
     resize:  str | None
+    decoder: str | None
+    threads: int | None
+
+    reconnect:     bool | None
+    stale_timeout: float | None
+    prefetch:      int | None
+    parallel:      int | None
+    ordered:       bool | None
+
+    emit:    str | None
+    workers: int | None
+
+    target_latency_ms: float | None
+    latency_metrics:   str | None
 
 
 class VideoIn(Filter):
@@ -616,6 +1662,56 @@ class VideoIn(Filter):
                     Set presigned URL expiration time in seconds for S3 sources. Default is 3600 (1 hour).
                     Only applies to s3:// sources.
 
+                '!decoder=opencv', '!decoder=ffmpeg':
+                    Set `decoder` option for this source.
+
+                '!threads=4':
+                    Set `threads` option for this source.
+
+                '!skip_nonkey':
+                    Only decode keyframes, for low rate monitoring of streams without the cost of decoding every frame.
+                    Needs '!decoder=ffmpeg'. For files best used with `sync`, otherwise keyframes are paced at the
+                    video frame rate.
+
+                '!lowres=2':
+                    Decode at 1/2, 1/4 or 1/8 resolution (1, 2 or 3) in the decoder itself, only for codecs which
+                    support it (e.g. MJPEG, MPEG-2 / MPEG-4 part 2, not H.264 / H.265). Needs '!decoder=ffmpeg'.
+
+                '!step=5':
+                    Only for file:// sources, subsample to every 5th frame. Frames in between are skipped as cheaply as
+                    the decoder allows: with '!decoder=opencv' by seeking if the step is at least VIDEO_IN_SEEK_MIN
+                    frames, otherwise by grabbing without retrieving, with '!decoder=ffmpeg' they are not converted or
+                    piped. The reported fps is divided by the step.
+
+                '!passthrough':
+                    Do not decode, emit the compressed video packets (e.g. H.264 / H.265 NAL units in Annex B format) as
+                    image-less Frames with a `packet` (see Frame.from_packet()) for a VideoOut '!passthrough' output to
+                    mux without transcoding, e.g. for recording a camera at near zero CPU. Uses '!decoder=opencv' and can
+                    not be combined with `maxsize`, `resize`, `maxfps` or `step`. Packets are never dropped singly, if
+                    the pipeline falls a whole GOP behind then it skips ahead to the next keyframe.
+
+                '!mjpeg':
+                    The source is MJPEG, either an HTTP multipart stream (e.g. 'http://cam/video.mjpg') or RTSP MJPEG or
+                    an MJPEG file. The jpgs from the camera are emitted as they are as jpg-only Frames (see
+                    Frame.from_jpg()) which are not decoded unless a downstream filter actually needs the pixels, and go
+                    out over the network without reencoding. `bgr` does not apply and this can not be combined with
+                    `maxsize` or `resize`.
+
+                '!reconnect', '!no-reconnect':
+                    Set `reconnect` option for this source.
+
+                '!stale_timeout=5':
+                    Set `stale_timeout` option for this source.
+
+                '!prefetch=8':
+                    Set `prefetch` option for this source.
+
+                '!parallel=4':
+                    Set `parallel` option for this source.
+
+                '!ordered', '!no-ordered':
+                    Set `ordered` option for this source.
+
         bgr:
             True means images in BGR format, False means RGB. Doesn't really affect anythong other than procesing speed
             since images should always be converted to the needed format. Don't touch this unless you have an explicit
@@ -640,7 +1736,8 @@ class VideoIn(Filter):
         maxfps:
             Restrict video to this FPS. Works for all types of video and if playing a file:// video in `sync` mode then
             will present the individual frames at this frame rate but will not skip any frames. Set here to apply to
-            all sources or can be set individually per source. Global env var default VIDEO_MAXFPS.
+            all sources or can be set individually per source. Global env var default VIDEO_MAXFPS. With decoder
+            'opencv' skipped frames are only grabbed, not retrieved (converted to BGR and copied out).
 
         maxsize:
             Maximum image size to allow, above this will be resized down. Valid codes are 'WxH' which will
@@ -654,6 +1751,84 @@ class VideoIn(Filter):
             together with `maxsize`, it is one or the other. Set here to apply to all sources or can be set individually
             per source. Global env var default VIDEO_IN_RESIZE.
 
+        decoder:
+            'vidgear' decodes with VideoGear in its own read thread, 'opencv' with cv2.VideoCapture directly, which
+            allows setting `threads`, and 'ffmpeg' in an ffmpeg subprocess (ffmpeg and ffprobe 4.x or later must
+            be installed, no webcams), which additionally allows `skip_nonkey` and `lowres` and decodes straight to the final
+            `maxsize` / `resize` size and `bgr` format into pooled buffers, e.g. 4K to 720p ingest in a single pass. Set here to apply to all sources or can
+            be set individually per source. Global env var default VIDEO_IN_DECODER.
+
+        threads:
+            Number of decoder threads, e.g. to spread decoding of a 4K H.265 video over several cores. Needs decoder
+            'opencv' or 'ffmpeg'. Set here to apply to all sources or can be set individually per source.
+
+        reconnect:
+            Only has meaning for sources which are not files. If True (default) then a stream which is lost or stops
+            delivering frames is reopened with exponential backoff (VIDEO_IN_BACKOFF_MIN doubling up to
+            VIDEO_IN_BACKOFF_MAX seconds) instead of ending the video and exiting the filter. The filter and its outputs
+            stay up while it reconnects so downstream filters stay connected and just see a gap in frames, the filter
+            loop keeps running every VIDEO_IN_KEEPALIVE seconds for metrics and exit requests. While any source can
+            reconnect the '_metrics' of the filter have 'reconnect_count' (successful reconnects), 'reconnecting'
+            (sources currently down) and 'reconnect_time' (total seconds down). With `passthrough` packets resume at the
+            first keyframe. If False then a lost stream ends the video as before. Set here to apply to all sources or
+            can be set individually per source. Global env var default VIDEO_IN_RECONNECT.
+
+        stale_timeout:
+            Seconds to wait for a network stream to open or deliver its next frame before it is considered lost (and
+            reconnected). Applies with decoders 'opencv' and 'ffmpeg' and for HTTP '!mjpeg', 'vidgear' uses the fixed
+            OpenCV timeout. Set here to apply to all sources or can be set individually per source. Global env var
+            default VIDEO_IN_STALE_TIMEOUT.
+
+        prefetch:
+            Only has meaning for `sync` file:// sources. Number of frames decoded ahead into a bounded queue while
+            downstream is still busy with earlier ones, e.g. 8, so that offline processing of a file runs at the speed of
+            the slower of decode and the pipeline instead of the sum of both. No frames are skipped, decoding just
+            pauses while the queue is full. Default 1 decodes only the next frame. Set here to apply to all sources or
+            can be set individually per source. Global env var default VIDEO_IN_PREFETCH.
+
+        parallel:
+            Only has meaning for `sync` file:// sources. Decode the file in this many worker processes at once, e.g. the
+            number of cores, for offline processing of long files which would otherwise decode on a single core. The
+            file is split into keyframe-aligned segments of whole GOPs which the workers decode independently, each
+            worker decodes at most SEGMENT_QUEUE (32) frames ahead so memory use stays bounded. Uses the 'opencv' decoder and can not be combined with `loop`,
+            `step`, `passthrough` or `mjpeg`. Pair with `outputs_balance` to spread the frames over several downstream
+            filter instances so the rest of the pipeline keeps up. Set here to apply to all sources or can be set
+            individually per source.
+
+        ordered:
+            With `parallel`, if True (default) then frames are emitted in file order. If False then frames are emitted
+            as soon as any worker decodes them, which avoids waiting on the slowest segment, and the original index of
+            the frame in the file is in 'meta.src_frame' (which is also there when ordered). Set here to apply to all
+            sources or can be set individually per source.
+
+        emit:
+            When to emit a message with multiple sources. 'all' (default) waits for a frame from every source and emits
+            them all together, so the slowest source sets the pace for all and the filter exits when any source ends.
+            'any' emits as soon as any source has a new frame, with only the topics which have one, each with its own
+            'meta.ts', so sources with mixed frame rates or a stalled camera don't hold each other up. 'timeout:ms',
+            e.g. 'timeout:50', waits for all sources like 'all' but at most this many milliseconds after the first one
+            had a frame, then emits the topics which have one. With 'any' and 'timeout:ms' the filter only exits once
+            all sources have ended.
+
+        workers:
+            If set then read all sources with a shared pool of this many worker threads instead of two threads per
+            source, for ingesting many cameras (e.g. 64 RTSP cameras with 4 - 8 workers). Each camera reconnects on its
+            own with exponential backoff, file sources restart from the beginning when they end. Frames are emitted
+            per camera as they arrive without waiting for the others, so each message has only the topics which got a
+            new frame, each with its own 'meta.ts'. Only the `bgr`, `maxfps`, `maxsize`, `resize` and `threads`
+            options apply and `emit` is always 'any'. See VideoPool.
+
+        target_latency_ms:
+            If set then all sources are dynamically throttled (frames skipped, or for `sync` files presented more
+            slowly) to keep the end-to-end latency reported by the downstream filter at `latency_metrics` under this many
+            milliseconds. The throttle is lifted again once latency drops back well under the target. Works on top of
+            any static `maxfps`. See openfilter.filter_runtime.latency.
+
+        latency_metrics:
+            Address of the downstream filter whose '_metrics' are watched for `target_latency_ms`, normally the last
+            filter in the pipeline. Either its normal output like 'tcp://localhost:5554' or, for a sink without zeromq
+            outputs, its dedicated `outputs_metrics` address. Listened to passively, never holds up the pipeline.
+
     Environment variables:
         VIDEO_IN_BGR
         VIDEO_IN_SYNC
@@ -661,6 +1836,16 @@ class VideoIn(Filter):
         VIDEO_IN_MAXFPS
         VIDEO_IN_MAXSIZE
         VIDEO_IN_RESIZE
+        VIDEO_IN_DECODER
+        VIDEO_IN_SEEK_MIN
+        VIDEO_IN_PREFETCH
+        VIDEO_IN_RECONNECT
+        VIDEO_IN_BACKOFF_MIN
+        VIDEO_IN_BACKOFF_MAX
+        VIDEO_IN_STALE_TIMEOUT
+        VIDEO_IN_KEEPALIVE
+        LATENCY_MIN_FPS
+        LATENCY_HOLD
 
     S3 Configuration:
         For s3:// sources, AWS credentials are required. Set these environment variables:
@@ -707,14 +1892,35 @@ class VideoIn(Filter):
                 source.topic = 'main'
             if not isinstance(options := source.options, VideoInConfig.Source.Options):
                 source.options = options = VideoInConfig.Source.Options() if options is None else VideoInConfig.Source.Options(options)
-            if any((option := o) not in ('bgr', 'sync', 'loop', 'maxfps', 'maxsize', 'resize', 'region', 'expiration') for o in options):
+            if any((option := o) not in ('bgr', 'sync', 'loop', 'maxfps', 'maxsize', 'resize', 'region', 'expiration',
+                    'decoder', 'threads', 'skip_nonkey', 'lowres', 'step', 'passthrough', 'mjpeg', 'reconnect',
+                    'stale_timeout', 'prefetch', 'parallel', 'ordered') for o in options):
                 raise ValueError(f'unknown option {option!r} in {source!r}')
 
+        if (emit := config.emit) is not None:
+            parse_emit(emit)
+
+        if (workers := config.workers) is not None:
+            if isinstance(workers, bool) or not isinstance(workers, int) or workers < 1:
+                raise ValueError(f'invalid workers {workers!r}, must be a positive int')
+            if any((option := o) not in ('bgr', 'maxfps', 'maxsize', 'resize', 'threads') for s in sources for o in s.options):
+                raise ValueError(f'option {option!r} does not apply with workers')
+            if any(is_video_s3(source.source) for source in sources):
+                raise ValueError('s3:// sources do not apply with workers')
+            if emit not in (None, 'any'):
+                raise ValueError(f"emit is always 'any' with workers, not {emit!r}")
+
         if len(set(source.topic for source in sources)) != len(sources):
             raise ValueError(f'duplicate video topics in {sources!r}')
         if not all(is_video_or_cached_file(source.source) for source in sources):
             raise ValueError('this filter only accepts video sources')
 
+        if (target_latency_ms := config.target_latency_ms) is not None:
+            if isinstance(target_latency_ms, bool) or not isinstance(target_latency_ms, (int, float)) or target_latency_ms <= 0:
+                raise ValueError(f'invalid target_latency_ms {target_latency_ms!r}, must be a positive number')
+            if not isinstance(latency_metrics := config.latency_metrics, str) or not is_mq_addr(latency_metrics.rstrip('?')):
+                raise ValueError(f'target_latency_ms requires latency_metrics to be a tcp:// or ipc:// address, not {latency_metrics!r}')
+
         return config
 
     def init(self, config):
@@ -730,28 +1936,74 @@ class VideoIn(Filter):
             topics.append(source.topic or 'main')
             optionss.append(source.options or {})
 
-        default_options  = {'bgr': config.bgr, 'sync': config.sync, 'loop': config.loop, 'maxfps': config.maxfps,
-            'maxsize': config.maxsize, 'resize': config.resize}
-        self.mvreader    = MultiVideoReader(vsources, [{**default_options, **options} for options in optionss])
+        if workers := config.workers:
+            default_options = {'bgr': config.bgr, 'maxfps': config.maxfps, 'maxsize': config.maxsize,
+                'resize': config.resize, 'threads': config.threads}
+            self.mvreader   = VideoPool(vsources, [{**default_options, **options} for options in optionss], workers)
+
+        else:
+            default_options = {'bgr': config.bgr, 'sync': config.sync, 'loop': config.loop, 'maxfps': config.maxfps,
+                'maxsize': config.maxsize, 'resize': config.resize, 'decoder': config.decoder, 'threads': config.threads,
+                'reconnect': config.reconnect, 'stale_timeout': config.stale_timeout, 'prefetch': config.prefetch,
+                'parallel': config.parallel, 'ordered': config.ordered}
+            self.mvreader   = MultiVideoReader(vsources, [{**default_options, **options} for options in optionss],
+                config.emit or 'all')
+
         self.tops_n_vids = tuple(zip(topics, self.mvreader.videos))
+        self.keepalive   = VIDEO_IN_KEEPALIVE if workers or any(vid.reconnect for vid in self.mvreader.videos) else None
         self.id          = -1  # frame id
+        self.throttle    = None
+        self.latency     = None if (target_latency_ms := config.target_latency_ms) is None else \
+            LatencyController(target_latency_ms, config.latency_metrics,
+            max((vid.fps for vid in self.mvreader.videos if vid.fps), default=None))
 
         self.mvreader.start()
 
+        if self.latency is not None:
+            self.latency.start()
+
     def shutdown(self):
+        if self.latency is not None:
+            self.latency.stop()
+
         self.mvreader.stop()
 
     def process(self, frames):
+        if (latency := self.latency) is not None and (maxfps := latency.maxfps) != self.throttle:
+            self.throttle = maxfps
+
+            for vid in self.mvreader.videos:
+                vid.throttle(maxfps)
+
         def get():
-            if (image_n_tframes := self.mvreader.read(True)) is None:
+            if (image_n_tframes := self.mvreader.read(True, self.keepalive)) is None:
                 self.exit('video ended')
 
+            if not image_n_tframes:  # nothing new while reconnecting, send nothing but let the filter loop come around
+                return None
+
+            if isinstance(image_n_tframes, list):  # all videos, otherwise {video index: ...} of those with new frames
+                image_n_tframes = dict(enumerate(image_n_tframes))
+
             self.id = id = self.id + 1
+            frames  = {}
+
+            for idx, (img, tfrm) in image_n_tframes.items():
+                topic, vid    = self.tops_n_vids[idx]
+                data          = {'meta': {'id': id, 'ts': tfrm / 1_000_000_000, 'src': vid.source, 'src_fps': vid.fps}}
+
+                if vid.parallel:
+                    data['meta']['src_frame'] = vid.index
+                frames[topic] = Frame.from_packet(img, data) if vid.passthrough else Frame(img, data) if vid.mjpeg else \
+                    Frame(img, data, 'GRAY' if len(img.shape) == 2 else 'BGR' if vid.as_bgr else 'RGB')
+
+            if self.keepalive is not None:  # merged into this filter's metrics, see MQ.send()
+                videos             = self.mvreader.videos
+                frames['_metrics'] = Frame({'reconnect_count': sum(vid.reconnects for vid in videos),
+                    'reconnecting': sum(vid.reconnecting for vid in videos),
+                    'reconnect_time': round(sum(vid.downtime for vid in videos), 3)})
 
-            return {topic: Frame(img,
-                {'meta': {'id': id, 'ts': tfrm / 1_000_000_000, 'src': vid.source, 'src_fps': vid.fps}},
-                'GRAY' if len(img.shape) == 2 else 'BGR' if vid.as_bgr else 'RGB'
-            ) for (topic, vid), (img, tfrm) in zip(self.tops_n_vids, image_n_tframes)}
+            return frames
 
         return get
 
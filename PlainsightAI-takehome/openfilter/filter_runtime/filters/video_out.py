@@ -6,6 +6,7 @@ from time import time_ns, strftime
 from typing import Any, Literal
 
 import cv2
+import numpy as np
 
 from openfilter.filter_runtime.utils import json_getval, dict_without, split_commas_maybe, hide_uri_users_and_pwds, once
 
@@ -31,12 +32,13 @@ is_video_stream   = lambda name: bool(re_video_stream.match(name))
 
 class VideoWriter:
     def __init__(self,
-        output:  str,
+        output:      str,
         *,
-        bgr:     bool | None = None,
-        fps:     int | float | Literal[True] | None = True,
-        segtime: int | float | None = None,
-        params:  dict | None = None
+        bgr:         bool | None = None,
+        fps:         int | float | Literal[True] | None = True,
+        segtime:     int | float | None = None,
+        params:      dict | None = None,
+        passthrough: bool = False,
     ):
         """Write a single aegmented video file or rtsp stream.
 
@@ -63,36 +65,53 @@ class VideoWriter:
                 "pix_fmt": Sets the pixel format. Example: "pix_fmt": "yuv420p"
                 "g":       Sets the group of pictures (GOP) size. Example: "g": 50
                 "vf":      Sets the video filter. Example: "vf": "scale=1280:720"
-        """
-
-        from vidgear.gears import WriteGear
-
-        try:
-            from vidgear.gears import writegear
-
-            writegear_logging_level = writegear.logger.getEffectiveLevel()
-            self.stfu               = lambda: writegear.logger.setLevel(logging.ERROR)
-            self.unstfu             = lambda: writegear.logger.setLevel(writegear_logging_level)
 
-        except Exception:
-            self.stfu = self.unstfu = lambda: None
+            passthrough: Write compressed Packets with write() instead of images, muxed as they are without decoding or
+                reencoding (cv2.VideoWriter raw mode). Only for file output, `params` and `bgr` don't apply. Each file
+                starts on a keyframe, so segments are cut at the first keyframe after `segtime`. If `fps` is True (or
+                None without env var default) then the fps of the Packets is used.
+        """
 
         if segtime and is_video_stream(output):
             raise ValueError(f'an RTSP output can not have segments: {output!r}')
+        if passthrough and is_video_stream(output):
+            raise ValueError(f'an RTSP output can not be passthrough: {output!r}')
+
+        if passthrough:
+            WriteGear = None
+            self.stfu = self.unstfu = lambda: None
 
-        self.WriteGear = WriteGear
-        self.output    = output
-        self.params    = {**{f'-{p}': v for p, v in (VIDEO_OUT_PARAMS or {}).items()}, **(params or {})}
-        self.is_bgr    = bool(VIDEO_OUT_BGR if bgr is None else bgr)
-        self.is_stream = is_stream = is_video_stream(output)
-        self.segtime   = None if is_stream else (VIDEO_OUT_SEGTIME if segtime is None else segtime)
-        self.out_split = output.rsplit('.', 1)
-        self.segidx    = 0
-        self.segend    = float('inf')  # if segtime is None then this makes sure the current output file never ends
-        self.segfrm    = 0
-        self.writer    = None
-
-        if ((fps := VIDEO_OUT_FPS or 15) if fps is None else fps) is True:  # None -> VIDEO_OUT_FPS, True -> 15/adaptive
+        else:
+            from vidgear.gears import WriteGear
+
+            try:
+                from vidgear.gears import writegear
+
+                writegear_logging_level = writegear.logger.getEffectiveLevel()
+                self.stfu               = lambda: writegear.logger.setLevel(logging.ERROR)
+                self.unstfu             = lambda: writegear.logger.setLevel(writegear_logging_level)
+
+            except Exception:
+                self.stfu = self.unstfu = lambda: None
+
+        self.WriteGear   = WriteGear
+        self.passthrough = passthrough
+        self.output      = output
+        self.params      = {**{f'-{p}': v for p, v in (VIDEO_OUT_PARAMS or {}).items()}, **(params or {})}
+        self.is_bgr      = bool(VIDEO_OUT_BGR if bgr is None else bgr)
+        self.is_stream   = is_stream = is_video_stream(output)
+        self.segtime     = None if is_stream else (VIDEO_OUT_SEGTIME if segtime is None else segtime)
+        self.out_split   = output.rsplit('.', 1)
+        self.segidx      = 0
+        self.segend      = float('inf')  # if segtime is None then this makes sure the current output file never ends
+        self.segfrm      = 0
+        self.writer      = None
+
+        if passthrough:  # writer created on first keyframe, True fps means from packets
+            self.fps   = None if (fps := VIDEO_OUT_FPS if fps is None else fps) is True else fps
+            self.write = self.write_packet
+
+        elif ((fps := VIDEO_OUT_FPS or 15) if fps is None else fps) is True:  # None -> VIDEO_OUT_FPS, True -> 15/adaptive
             self.fps     = 15
             self.t_frame = None
             self.write   = self.write_adapt_begin
@@ -107,10 +126,25 @@ class VideoWriter:
 
     def stop(self):  # idempotent and safe to call whenever
         if self.writer is not None:
-            self.writer.close()
+            if self.passthrough:
+                self.writer.release()
+            else:
+                self.writer.close()
 
             self.writer = None
 
+    def next_output(self, fps: float) -> str:  # name of next file (segment) to create, 'file://' stripped
+        if (segtime := self.segtime) is None:
+            output = self.output
+
+        else:
+            self.segidx = (segidx := self.segidx) + 1
+            output      = f'{(o := self.out_split)[0]}_{segidx:06}' + ('' if len(o) == 1 else f'.{o[1]}')
+            self.segend = segtime * 60 * fps
+            self.segfrm = 0
+
+        return strftime(output)[7:]
+
     def new_writer(self):
         self.stop()
 
@@ -127,28 +161,34 @@ class VideoWriter:
             logger.info(f'video serve: {hide_uri_users_and_pwds(output)}  ({self.fps:.1f} fps)')
 
         else:
-            if (segtime := self.segtime) is None:
-                output = self.output
-
-            else:
-                self.segidx = (segidx := self.segidx) + 1
-                output      = f'{(o := self.out_split)[0]}_{segidx:06}' + ('' if len(o) == 1 else f'.{o[1]}')
-                self.segend = segtime * 60 * self.fps
-                self.segfrm = 0
-
-            output = strftime(output)
+            output = self.next_output(self.fps)
             params = {
                 '-vcodec':          'libx264',
                 '-input_framerate': self.fps,
                 **self.params,
             }
 
-            logger.info(f'video create: {output[7:]}  ({self.fps:.1f} fps)')
+            logger.info(f'video create: {output}  ({self.fps:.1f} fps)')
 
         self.stfu()
-        self.writer = self.WriteGear(output=output if is_stream else output[7:], **params)
+        self.writer = self.WriteGear(output=output, **params)
         self.unstfu()
 
+    def new_packet_writer(self, packet):  # packet: Packet, the keyframe which will start the new file
+        self.stop()
+
+        fps    = self.fps or packet.fps or 15
+        output = self.next_output(fps)
+        writer = cv2.VideoWriter(output, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*packet.codec.ljust(4)[:4]), fps,
+            (packet.width, packet.height), [cv2.VIDEOWRITER_PROP_RAW_VIDEO, 1])
+
+        if not writer.isOpened():
+            raise RuntimeError(f'could not create {output!r} for {packet.codec!r} passthrough')
+
+        logger.info(f'video create: {output}  ({fps:.1f} fps, {packet.codec} passthrough)')
+
+        self.writer = writer
+
     def write(self, image):  # image: np.ndarray
         if (writer := self.writer) is None:
             raise RuntimeError('can not write to a closed video')
@@ -163,6 +203,17 @@ class VideoWriter:
         if segfrm >= self.segend:
             self.new_writer()
 
+    def write_packet(self, packet):  # packet: Packet
+        if packet.key and (self.writer is None or self.segfrm >= self.segend):
+            self.new_packet_writer(packet)
+        elif self.writer is None:  # not started yet or closed, can only (re)start on a keyframe
+            return
+
+        (writer := self.writer).set(cv2.VIDEOWRITER_PROP_KEY_FLAG, int(packet.key))
+        writer.write(np.frombuffer(packet.extra + packet.data if packet.extra else packet.data, np.uint8)[None])
+
+        self.segfrm += 1
+
     def write_adapt_begin(self, image):
         self.t_write     = time_ns()
         self.first_image = image
@@ -245,9 +296,10 @@ __all__ = __all__ + ['VideoOutConfig', 'VideoOut']
 class VideoOutConfig(FilterConfig):
     class Output(adict):
         class Options(adict):
-            fps:     float | Literal[True] | None
-            segtime: float | None
-            params:  dict[str, Any] | None
+            fps:         float | Literal[True] | None
+            segtime:     float | None
+            params:      dict[str, Any] | None
+            passthrough: bool | None
 
         output:  str
         topic:   str | None
@@ -299,6 +351,13 @@ class VideoOut(Filter):
                 '!params={"crf": 23, "g": 30}', etc...:
                     Set `params` option for this output.
 
+                '!passthrough':
+                    Mux compressed video packets from a VideoIn '!passthrough' source as they are, without decoding or
+                    reencoding. Only for file:// outputs, the container is chosen by the file extension and must support
+                    the codec (e.g. .mp4 or .mkv for H.264 / H.265). Each file starts on a keyframe so with `segtime`
+                    segments are cut at the first keyframe after the segment time. If `fps` is adaptive then the source
+                    fps is used.
+
         bgr:
             True means images in BGR format, False means RGB. This is here for emergency purposes only and is NOT the
             inverse of VIDEO_IN_BGR so don't touch this unless you have an explicit need and understanding of why you
@@ -378,7 +437,7 @@ class VideoOut(Filter):
                 options.segtime = parse_segtime(segtime)
 
             for option, value in list(options.items()):
-                if option not in ('bgr', 'fps', 'segtime', 'params'):
+                if option not in ('bgr', 'fps', 'segtime', 'params', 'passthrough'):
                     options.setdefault('params', {})[option] = value
 
                     del options[option]
@@ -431,7 +490,7 @@ class VideoOut(Filter):
                 writer.stop()
 
     def process_src_fps(self, frames):
-        if any(not (f := frames.get(topic := t)) or not f.has_image for t, _, _ in self.tops_n_outs_n_opts):  # don't process until we get all frames
+        if any(not (f := frames.get(topic := t)) or not (f.has_image or f.packet) for t, _, _ in self.tops_n_outs_n_opts):  # don't process until we get all frames
             once(logger.warning, f'video output hold because expected video topic {topic!r} not found or empty among: {", ".join(frames.keys())}', t=60*15)
 
             return
@@ -451,7 +510,7 @@ class VideoOut(Filter):
         return self.process_check_rtsp_fps(frames)
 
     def process_check_rtsp_fps(self, frames):
-        if any(not (f := frames.get(topic := t)) or not f.has_image for t, _, _ in self.tops_n_outs_n_opts):  # don't process until we get all frames
+        if any(not (f := frames.get(topic := t)) or not (f.has_image or f.packet) for t, _, _ in self.tops_n_outs_n_opts):  # don't process until we get all frames
             once(logger.warning, f'video output hold because expected video topic {topic!r} not found or empty among: {", ".join(frames.keys())}', t=60*15)
 
             return
@@ -468,7 +527,13 @@ class VideoOut(Filter):
 
     def process(self, frames):
         for topic, writer in self.tops_n_vids:
-            if (frame := frames.get(topic)) is None or (image := frame.bgr.image) is None:
+            if writer.passthrough:
+                if (frame := frames.get(topic)) is None or (packet := frame.packet) is None:
+                    once(logger.warning, f'expected video packets on passthrough topic {topic!r} not found among: {", ".join(frames.keys())}', t=60*15)
+                else:
+                    writer.write(packet)
+
+            elif (frame := frames.get(topic)) is None or (image := frame.bgr.image) is None:
                 once(logger.warning, f'expected video topic {topic!r} not found or empty among: {", ".join(frames.keys())}', t=60*15)
             else:
                 writer.write(image)
@@ -1,21 +1,43 @@
 """Frame object which contains an `image` (optionally jpg compressed) and a dictionary `data` object. Attempts to
 minimize format conversions and redundant jpg encoding. So that for example if a jpg encoded image comes from the
-network, and it is only read, that the jpg data is available on the way out without having to reencode.
+network, and it is only read, that the jpg data is available on the way out without having to reencode. A writable copy
+of such an image also remembers the original jpg along with a fingerprint of the image so that if it is not actually
+modified then the original jpg can still go out without reencode. A Frame can also carry a compressed video `packet`
+instead of an image, for passing encoded video through a pipeline without decoding or reencoding it.
 
 WARNING! Grayscale hasn't gotten all the love it probably deserves.
 """
 
-from typing import Any, Literal, Union
+import hashlib
+from typing import Any, Literal, NamedTuple, Union
 
-import cv2
 import numpy as np
 from numpy import ndarray
 
-__all__ = ['ShapeAndFormat', 'Frame']
+from .bufpool import buffer_pool
+from .utils import LazyModule
+
+cv2 = LazyModule('cv2')  # only imported once an image actually needs encoding, decoding or color conversion
+
+__all__ = ['ShapeAndFormat', 'Packet', 'Frame']
 
 ShapeAndFormat = tuple[tuple[int, int, int] | tuple[int, int], str]
 
 
+class Packet(NamedTuple):
+    """One compressed video packet (access unit) as it comes out of the demuxer, e.g. H.264 / H.265 NAL units in Annex
+    B format. `extra` is out-of-band codec configuration (e.g. MPEG-4 VOL header) which a decoder or muxer needs before
+    the first packet, only present on keyframes and only for codecs which do not already repeat it in-band."""
+
+    data:   bytes | bytearray
+    codec:  str  # fourcc as reported by the demuxer, e.g. 'avc1', 'hev1', 'FMP4'
+    key:    bool
+    width:  int
+    height: int
+    fps:    float | None = None
+    extra:  bytes | None = None
+
+
 class Frame:
     """Frame with attached data dictionary. Automatic handling and caching and passthrough of jpg encoded image. Also
     convenience functions for RGB/BGR/GRAY and RW/RO.
@@ -27,10 +49,15 @@ class Frame:
         Frame(image: dict)                                                   - data-only frame, leave the others None as they have no effect
 
         Frame.from_jpg(jpg: buffer,  data: dict | None, height: int, width: int, format: str)  - format must be one of FORMATS
+        Frame.from_packet(packet: Packet, data: dict | None)                                  - compressed video packet, no image
+
+        frame.crop(x: int, y: int, w: int, h: int, data: dict | None)  - view into frame image, remembers parent and offset
 
     Notes:
         * Use 'frame.rw_rgb' in place of "frame.rw.rgb' or 'frame.rgb.rw', it will always give the most efficient
         conversion from whatever you start with. Obiously same for '.ro' and '.bgr'.
+        * A crop shares memory with its parent, writing to a crop of a writable Frame writes to the parent image. Any
+        conversion or copy of a crop gives a normal standalone Frame.
     """
 
     image:     np.ndarray | None  # be aware can be readonly, in order to guarantee writable .image use 'frame.rw.image'
@@ -44,6 +71,7 @@ class Frame:
     channels:  int | None
 
     jpg:       bytearray | bytes | None
+    packet:    Packet | None
     has_jpg:   bool | None
     has_raw:   bool | None
     has_image: bool
@@ -65,12 +93,19 @@ class Frame:
     ro_rgb:    'Frame'
     ro_bgr:    'Frame'
 
+    parent:    Union['Frame', None]
+    offset:    tuple[int, int] | None
+
     fullstr:   str
 
     __image:   np.ndarray | Literal[False] | None
     __data:    dict[str, Any]
     __jpg:     bytes | bytearray | Literal[False] | None
     __shapef:  ShapeAndFormat | None
+    __jpg_src: tuple[bytes | bytearray, bytes]  # only present on rw copies of jpg images, (jpg, fingerprint)
+    __parent:  'Frame'  # only present on crops
+    __offset:  tuple[int, int]
+    __packet:  Packet  # only present on packet frames
 
 
     FORMATS          = ('RGB', 'BGR', 'GRAY')
@@ -92,6 +127,16 @@ class Frame:
             self.__shapef = shapef if (shapef := image.__shapef) is None or \
                 (format := Frame.validate_format_or_Frame(format)) is None else (shapef[0], format)
 
+            if (jpg_src := getattr(image, '_Frame__jpg_src', None)) is not None:
+                self.__jpg_src = jpg_src
+
+            if (parent := getattr(image, '_Frame__parent', None)) is not None:  # same image so still a crop of parent
+                self.__parent = parent
+                self.__offset = image.__offset
+
+            if (packet := getattr(image, '_Frame__packet', None)) is not None:
+                self.__packet = packet
+
         else:  # isinstance(image, (ndarray, NoneType))
             self.__image = image
 
@@ -123,22 +168,26 @@ class Frame:
         return not (
             not isinstance(other, Frame) or
             other.__data != self.__data or
+            other.packet != self.packet or
             (is_None := other.__image is None) ^ (self.__image is None) or
             (not is_None and not np.array_equal(other.image, self.image))
         )
 
     def __reduce__(self):
         return (Frame.unreduce, (image := self.__image, self.__data, self.__jpg, self.__shapef,
-            image.flags.writeable if isinstance(image, ndarray) else None))
+            image.flags.writeable if isinstance(image, ndarray) else None, self.packet))
 
     @staticmethod
-    def unreduce(image, data, jpg, shapef, writeable):
+    def unreduce(image, data, jpg, shapef, writeable, packet=None):
         frame          = Frame()
         frame.__image  = image
         frame.__data   = data
         frame.__jpg    = jpg
         frame.__shapef = shapef
 
+        if packet is not None:
+            frame.__packet = packet
+
         if isinstance(image, ndarray) and writeable != image.flags.writeable:  # this is why we did our own serialization, the readable state is important during testing
             try:
                 image.flags.writeable = writeable
@@ -170,7 +219,8 @@ class Frame:
 
     def __repr__(self):
         if (image := self.__image) is None:
-            return 'Frame(None)'
+            return 'Frame(None)' if (packet := self.packet) is None else \
+                f'Frame({packet.codec}:{packet.width}x{packet.height}{"+key" if packet.key else ""})'
 
         xtra = (
             '-jpg' if image is False else
@@ -181,6 +231,40 @@ class Frame:
 
         return f'Frame({self.width}x{self.height}x{self.format}{xtra})'
 
+    @staticmethod
+    def cvt_color(image: ndarray, code: int) -> ndarray:
+        """cv2.cvtColor() into a pooled buffer."""
+
+        shape = image.shape[:2] if code in (cv2.COLOR_RGB2GRAY, cv2.COLOR_BGR2GRAY) else image.shape
+
+        return cv2.cvtColor(image, code, dst=buffer_pool.empty(shape, image.dtype))
+
+    @staticmethod
+    def copy_image(image: ndarray) -> ndarray:
+        """image.copy() into a pooled buffer."""
+
+        np.copyto(buf := buffer_pool.empty(image.shape, image.dtype), image)
+
+        return buf
+
+    @staticmethod
+    def fingerprint(image: ndarray) -> bytes:
+        """Content fingerprint (128 bit blake2b) of an image, much faster than jpg encoding it and strong enough that
+        two different images never realistically match, since a match means reusing a stale jpg or skipping a frame."""
+
+        return hashlib.blake2b(image.data if image.flags.c_contiguous else np.ascontiguousarray(image).data,
+            digest_size=16).digest()
+
+    def __rw_copy(self, format: str) -> 'Frame':
+        """NEW Frame with NEW writable copy of image which remembers our jpg (if have) for passthrough if unmodified."""
+
+        new = Frame(image := Frame.copy_image(self.image), self, format)
+
+        if jpg := self.__jpg:
+            new.__jpg_src = (jpg, Frame.fingerprint(image))
+
+        return new
+
     @staticmethod
     def decode(blob: bytes | bytearray, format: str | None):
         if (image := cv2.imdecode(np.frombuffer(blob, np.uint8), cv2.IMREAD_COLOR if format != 'GRAY' else 0)) is None:
@@ -227,16 +311,53 @@ class Frame:
 
     from_jpg = from_blob
 
+    @staticmethod
+    def from_packet(packet: Packet, data: dict | None = None) -> 'Frame':
+        """Make an image-less Frame carrying a compressed video packet which is passed through as-is, never decoded."""
+
+        frame          = Frame(data)
+        frame.__packet = packet
+
+        return frame
+
     def copy(self) -> 'Frame':
         """Make a copy of a self, shallow copy of data, image copy of writable image, no copy if image is readonly."""
 
         copy = Frame(self, self.__data.copy())
 
         if isinstance(image := self.__image, ndarray) and image.flags.writeable:
-            copy.__image = image.copy()
+            copy.__image = Frame.copy_image(image)
 
         return copy
 
+    def crop(self, x: int, y: int, w: int, h: int, data: dict | None = None) -> 'Frame':
+        """Return a NEW Frame whose image is a view of the region (x, y, w, h) of this Frame's image, clipped to the
+        image, with same writability and format. No pixels are copied. The crop remembers its parent (the root parent
+        for a crop of a crop) and offset in that parent so that it can be sent as a reference into the parent image if
+        the parent goes out on the same message, see MQ.frames2topicmsgs()."""
+
+        if (shapef := self.__shapef) is None:
+            raise ValueError('can not crop a Frame without an image')
+
+        height, width = shapef[0][:2]
+        x0, y0        = max(0, x), max(0, y)
+        x1, y1        = min(width, x + w), min(height, y + h)
+
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError(f'crop {(x, y, w, h)} is empty or outside of {width}x{height} image')
+
+        crop = Frame(self.image[y0 : y1, x0 : x1], data, shapef[1])
+
+        if (parent := getattr(self, '_Frame__parent', None)) is None:
+            crop.__parent = self
+            crop.__offset = (x0, y0)
+
+        else:
+            crop.__parent = parent
+            crop.__offset = ((offset := self.__offset)[0] + x0, offset[1] + y0)
+
+        return crop
+
     @property
     def image(self):
         """May decode jpg-only frame to ro image if only had jpg and no image yet."""
@@ -280,10 +401,15 @@ class Frame:
     @property
     def jpg(self):
         """Potentially caching jpg encoding, or maybe it came from the network originally encoded and is already
-        available. A jpg is always returned, it is cached in self for future returns if self is readonly."""
+        available. A jpg is always returned, it is cached in self for future returns if self is readonly. A writable
+        image which is an unmodified copy of a jpg image returns that original jpg."""
 
         if (jpg := self.__jpg) is False:
-            image    = self.__image
+            image = self.__image
+
+            if (jpg_src := getattr(self, '_Frame__jpg_src', None)) is not None and Frame.fingerprint(image) == jpg_src[1]:
+                return jpg_src[0]
+
             res, buf = cv2.imencode('.jpg', image)
 
             if not res:
@@ -297,6 +423,12 @@ class Frame:
 
         return jpg
 
+    @property
+    def packet(self):
+        """The compressed video Packet if this is a packet Frame, otherwise None."""
+
+        return getattr(self, '_Frame__packet', None)
+
     @property
     def has_jpg(self):
         """Whether this Frame already has an encoded jpg ready for return without having to encode."""
@@ -343,7 +475,7 @@ class Frame:
         if (image := self.__image) is None or (image is not False and image.flags.writeable):
             return self
 
-        return Frame(self.image.copy(), self, self.__shapef[1])
+        return self.__rw_copy(self.__shapef[1])
 
     @property
     def ro(self):
@@ -353,7 +485,7 @@ class Frame:
         if (image := self.__image) is None or image is False or not image.flags.writeable:
             return self
 
-        new                   = Frame(image := self.image.copy(), self, self.__shapef[1])
+        new                   = Frame(image := Frame.copy_image(self.image), self, self.__shapef[1])
         image.flags.writeable = False
 
         return new
@@ -367,12 +499,12 @@ class Frame:
             return self
 
         if (image := self.image).flags.writeable:
-            new = Frame(cv2.cvtColor(image, cv2.COLOR_RGB2BGR), self, 'RGB')
+            new = Frame(Frame.cvt_color(image, cv2.COLOR_RGB2BGR), self, 'RGB')
         elif (new := getattr(self, '_Frame__ro_rgb', None)) is not None:
             return new
 
         else:
-            self.__ro_rgb = new   = Frame(image := cv2.cvtColor(image, cv2.COLOR_RGB2BGR), self, 'RGB')
+            self.__ro_rgb = new   = Frame(image := Frame.cvt_color(image, cv2.COLOR_RGB2BGR), self, 'RGB')
             image.flags.writeable = False
 
         return new
@@ -386,12 +518,12 @@ class Frame:
             return self
 
         if (image := self.image).flags.writeable:
-            new = Frame(cv2.cvtColor(image, cv2.COLOR_RGB2BGR), self, 'BGR')
+            new = Frame(Frame.cvt_color(image, cv2.COLOR_RGB2BGR), self, 'BGR')
         elif (new := getattr(self, '_Frame__ro_bgr', None)) is not None:
             return new
 
         else:
-            self.__ro_bgr = new   = Frame(image := cv2.cvtColor(image, cv2.COLOR_RGB2BGR), self, 'BGR')
+            self.__ro_bgr = new   = Frame(image := Frame.cvt_color(image, cv2.COLOR_RGB2BGR), self, 'BGR')
             image.flags.writeable = False
 
         return new
@@ -405,12 +537,12 @@ class Frame:
             return self
 
         if (image := self.image).flags.writeable:
-            new = Frame(cv2.cvtColor(image, cv2.COLOR_RGB2GRAY if format == 'RGB' else cv2.COLOR_BGR2GRAY), self, 'GRAY')
+            new = Frame(Frame.cvt_color(image, cv2.COLOR_RGB2GRAY if format == 'RGB' else cv2.COLOR_BGR2GRAY), self, 'GRAY')
         elif (new := getattr(self, '_Frame__ro_gray', None)) is not None:
             return new
 
         else:
-            self.__ro_gray = new  = Frame(image := cv2.cvtColor(image, cv2.COLOR_RGB2GRAY if format == 'RGB' else cv2.COLOR_BGR2GRAY), self, 'GRAY')
+            self.__ro_gray = new  = Frame(image := Frame.cvt_color(image, cv2.COLOR_RGB2GRAY if format == 'RGB' else cv2.COLOR_BGR2GRAY), self, 'GRAY')
             image.flags.writeable = False
 
         return new
@@ -422,9 +554,9 @@ class Frame:
         if (shapef := self.__shapef) is None:
             return self
         if shapef[1] == 'RGB':
-            return self if (image := self.image).flags.writeable else Frame(image.copy(), self, 'RGB')
+            return self if self.image.flags.writeable else self.__rw_copy('RGB')
 
-        return Frame(cv2.cvtColor(self.image, cv2.COLOR_RGB2BGR), self, 'RGB')
+        return Frame(Frame.cvt_color(self.image, cv2.COLOR_RGB2BGR), self, 'RGB')
 
     @property
     def rw_bgr(self):
@@ -433,9 +565,9 @@ class Frame:
         if (shapef := self.__shapef) is None:
             return self
         if shapef[1] == 'BGR':
-            return self if (image := self.image).flags.writeable else Frame(image.copy(), self, 'BGR')
+            return self if self.image.flags.writeable else self.__rw_copy('BGR')
 
-        return Frame(cv2.cvtColor(self.image, cv2.COLOR_RGB2BGR), self, 'BGR')
+        return Frame(Frame.cvt_color(self.image, cv2.COLOR_RGB2BGR), self, 'BGR')
 
     @property
     def ro_rgb(self):
@@ -449,13 +581,13 @@ class Frame:
             if (image := self.__image) is False or not image.flags.writeable:
                 return self
 
-            new = Frame(new_image := image.copy(), self, 'RGB')
+            new = Frame(new_image := Frame.copy_image(image), self, 'RGB')
 
         elif (new := getattr(self, '_Frame__ro_rgb', None)) is not None:
             return new
 
         else:
-            new           = Frame(new_image := cv2.cvtColor(image := self.image, cv2.COLOR_RGB2BGR), self, 'RGB')
+            new           = Frame(new_image := Frame.cvt_color(image := self.image, cv2.COLOR_RGB2BGR), self, 'RGB')
             self.__ro_rgb = new
 
         new_image.flags.writeable = False
@@ -474,19 +606,31 @@ class Frame:
             if (image := self.__image) is False or not image.flags.writeable:
                 return self
 
-            new = Frame(new_image := image.copy(), self, 'BGR')
+            new = Frame(new_image := Frame.copy_image(image), self, 'BGR')
 
         elif (new := getattr(self, '_Frame__ro_bgr', None)) is not None:
             return new
 
         else:
-            new           = Frame(new_image := cv2.cvtColor(image := self.image, cv2.COLOR_RGB2BGR), self, 'BGR')
+            new           = Frame(new_image := Frame.cvt_color(image := self.image, cv2.COLOR_RGB2BGR), self, 'BGR')
             self.__ro_bgr = new
 
         new_image.flags.writeable = False
 
         return new
 
+    @property
+    def parent(self):
+        """The Frame this is a crop of or None if not a crop."""
+
+        return getattr(self, '_Frame__parent', None)
+
+    @property
+    def offset(self):
+        """The (x, y) offset of this crop in the parent image or None if not a crop."""
+
+        return getattr(self, '_Frame__offset', None)
+
     @property
     def fullstr(self):
         return f'{repr(self)[:-1]}, {self.data})'
@@ -0,0 +1,299 @@
+"""Fused image operations. A chain of crop, resize, color convert, flip and rotate operations is compiled once per input
+shape and format into a plan which makes as few full-image passes as possible. Crops become numpy views and are moved to
+the front of the chain, pointwise color conversions are moved to whichever side of a resize touches fewer bytes, flips
+are merged and intermediate results are written with `dst=` into buffers which are preallocated and reused from call to
+call. Only the last pixel-moving step writes to a new (pooled, or caller provided) output array.
+
+Operations, as tuples:
+    ('crop', x, y, w, h)                    - Pixel coordinates, clipped to the image.
+    ('resize', w, h[, interp[, aspect]])    - Unconditional resize, `aspect` True fits inside w x h preserving aspect.
+    ('maxsize', w, h[, interp[, aspect]])   - Only resize down if bigger, `aspect` default True.
+    ('minsize', w, h[, interp[, aspect]])   - Only resize up if smaller, `aspect` default True.
+    ('flip', code)                          - cv2.flip() code, 1 = flip x, 0 = flip y, -1 = both.
+    ('rotate', code)                        - cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_180 or cv2.ROTATE_90_COUNTERCLOCKWISE.
+    ('format', format)                      - Convert to 'RGB', 'BGR' or 'GRAY'.
+    ('swaprgb',)                            - Swap R and B channels without changing the declared format.
+
+`interp` can be None (nearest), 'N', 'L', 'C' or a cv2.INTER_* value.
+
+WARNING! A FrameOps instance reuses its intermediate buffers so it is not thread-safe, use one per thread.
+"""
+
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+from numpy import ndarray
+
+from .bufpool import buffer_pool
+from .frame import Frame
+
+__all__ = ['FrameOps']
+
+INTERPS   = {None: cv2.INTER_NEAREST, 'N': cv2.INTER_NEAREST, 'L': cv2.INTER_LINEAR, 'C': cv2.INTER_CUBIC}
+CVT_CODES = {
+    ('RGB', 'BGR'):  cv2.COLOR_RGB2BGR,
+    ('BGR', 'RGB'):  cv2.COLOR_BGR2RGB,
+    ('RGB', 'GRAY'): cv2.COLOR_RGB2GRAY,
+    ('BGR', 'GRAY'): cv2.COLOR_BGR2GRAY,
+    ('GRAY', 'RGB'): cv2.COLOR_GRAY2RGB,
+    ('GRAY', 'BGR'): cv2.COLOR_GRAY2BGR,
+}
+FLIP_BITS = {1: 1, 0: 2, -1: 3}  # cv2.flip() code -> bitmask of (x, y)
+BITS_FLIP = {1: 1, 2: 0, 3: -1}
+
+
+def parse_interp(interp: str | int | None) -> int:
+    """'near', 'lin', 'cub' (or just first letter) or None to cv2.INTER_*, ints are passed through."""
+
+    return interp if isinstance(interp, int) else INTERPS[interp if interp is None else interp.upper()[:1]]
+
+
+def fit_size(w: int, h: int, width: int, height: int, mode: str, aspect: bool = True) -> tuple[int, int]:
+    """Target (w, h) for an image of size `w` x `h` for 'resize', 'maxsize' or 'minsize' to `width` x `height`."""
+
+    if mode == 'resize':
+        if not aspect or (h == height and w == width):
+            return width, height
+        elif h == height:
+            return width, int(h * width / w)
+        elif w == width:
+            return int(w * height / h), height
+
+        return int(w * (s := min(width / w, height / h))), int(h * s)
+
+    cmp, lim = ((lambda a, b: a > b), min) if mode == 'maxsize' else ((lambda a, b: a < b), max)
+
+    if (hgt := cmp(h, height)) + (wgt := cmp(w, width)) and aspect:
+        if not hgt:
+            h = int(h * width / w)
+        elif not wgt:
+            w = int(w * height / h)
+        else:
+            h = int(h * (s := lim(width / w, height / h)))
+            w = int(w * s)
+
+    return lim(w, width), lim(h, height)
+
+
+class FrameOps:
+    """Compiled chain of image operations, see module docstring. Call with an image (and its format) to get the
+    transformed image, or use apply() with a Frame.
+
+    Usage:
+        ops          = FrameOps([('maxsize', 1280, 720, 'L'), ('flip', 1), ('format', 'RGB')])
+        image, fmt   = ops(image, 'BGR')
+        frame        = ops.apply(frame)
+    """
+
+    def __init__(self, ops: list[tuple], alloc: Callable[[tuple, Any], ndarray] | None = None):
+        """Args:
+            ops: List of operation tuples, see module docstring.
+
+            alloc: Optional allocator `alloc(shape, dtype) -> ndarray` for final output images, default is the shared
+                frame buffer pool.
+        """
+
+        for op in ops:
+            if not op or op[0] not in ('crop', 'resize', 'maxsize', 'minsize', 'flip', 'rotate', 'format', 'swaprgb'):
+                raise ValueError(f'invalid frame op {op!r}')
+            if op[0] == 'format' and op[1] not in Frame.FORMATS:
+                raise ValueError(f'invalid format {op[1]!r}, must be one of {Frame.FORMATS}')
+
+        self.ops   = [tuple(op) for op in ops]
+        self.alloc = alloc or buffer_pool.empty
+        self.plans = {}  # {(shape, dtype, format): (steps, out_format), ...}
+
+    def __bool__(self):
+        return bool(self.ops)
+
+    def __repr__(self):
+        return f'FrameOps({self.ops!r})'
+
+    def resolve(self, shape: tuple, format: str | None) -> tuple[list[tuple], str | None]:
+        """Resolve ops to concrete primitives for this input shape and format and then reorder / merge them. Returns
+        ([('crop', x0, y0, x1, y1) | ('resize', (w, h), interp) | ('cvt', code, ch) | ('flip', code) |
+        ('rotate', code), ...], output format)."""
+
+        h, w, *c = shape
+        c        = c[0] if c else 1
+        prims    = []
+
+        for op in self.ops:
+            name = op[0]
+
+            if name == 'crop':
+                x0 = max(0, min(w, int(op[1])))
+                y0 = max(0, min(h, int(op[2])))
+                x1 = max(x0, min(w, int(op[1] + op[3])))
+                y1 = max(y0, min(h, int(op[2] + op[4])))
+
+                if (x0, y0, x1, y1) != (0, 0, w, h):
+                    prims.append(('crop', x0, y0, x1, y1))
+
+                    w = x1 - x0
+                    h = y1 - y0
+
+            elif name in ('resize', 'maxsize', 'minsize'):
+                interp = parse_interp(op[3] if len(op) > 3 else None)
+                aspect = op[4] if len(op) > 4 else name != 'resize'
+
+                if (size := fit_size(w, h, int(op[1]), int(op[2]), name, aspect)) != (w, h):
+                    prims.append(('resize', size, interp))
+
+                    w, h = size
+
+            elif name == 'flip':
+                prims.append(('flip', op[1]))
+
+            elif name == 'rotate':
+                prims.append(('rotate', op[1]))
+
+                if op[1] != cv2.ROTATE_180:
+                    w, h = h, w
+
+            elif name == 'format':
+                if format is None:
+                    raise ValueError('can not convert format of image without a format')
+
+                if (new_format := op[1]) != format:
+                    prims.append(('cvt', CVT_CODES[(format, new_format)], (c := 1 if new_format == 'GRAY' else 3)))
+
+                    format = new_format
+
+            elif c == 3:  # name == 'swaprgb'
+                prims.append(('cvt', cv2.COLOR_RGB2BGR, 3))
+
+        return self.optimize(prims, shape), format
+
+    @staticmethod
+    def optimize(prims: list[tuple], shape: tuple) -> list[tuple]:
+        h, w, *_ = shape
+        changed  = True
+
+        while changed:  # bubble until nothing moves, chains are short
+            changed = False
+            dims    = [(w, h)]  # (w, h) at input of each prim
+
+            for prim in prims:
+                dw, dh = dims[-1]
+                dims.append(
+                    (prim[3] - prim[1], prim[4] - prim[2]) if prim[0] == 'crop' else
+                    prim[1] if prim[0] == 'resize' else
+                    (dh, dw) if prim[0] == 'rotate' and prim[1] != cv2.ROTATE_180 else
+                    (dw, dh)
+                )
+
+            for i in range(len(prims) - 1):
+                a, b = prims[i], prims[i + 1]
+
+                if a[0] == 'flip' and b[0] == 'flip':  # merge flips
+                    prims[i : i + 2] = [] if not (bits := FLIP_BITS[a[1]] ^ FLIP_BITS[b[1]]) else [('flip', BITS_FLIP[bits])]
+
+                elif a[0] == 'crop' and b[0] == 'crop':  # merge crops
+                    prims[i : i + 2] = [('crop', a[1] + b[1], a[2] + b[2], a[1] + b[3], a[2] + b[4])]
+
+                elif b[0] == 'crop' and a[0] in ('cvt', 'flip'):  # move crop in front of pointwise and flip
+                    if a[0] == 'flip':
+                        fw, fh = dims[i]
+                        _, x0, y0, x1, y1 = b
+
+                        if (bits := FLIP_BITS[a[1]]) & 1:
+                            x0, x1 = fw - x1, fw - x0
+                        if bits & 2:
+                            y0, y1 = fh - y1, fh - y0
+
+                        b = ('crop', x0, y0, x1, y1)
+
+                    prims[i : i + 2] = [b, a]
+
+                elif {a[0], b[0]} == {'cvt', 'resize'}:  # put pointwise color conversion on the cheaper side of resize
+                    (rw, rh), (iw, ih) = (a[1], dims[i]) if a[0] == 'resize' else (b[1], dims[i])
+                    cvt                = a if a[0] == 'cvt' else b
+                    cin                = 3 if cvt[1] not in (cv2.COLOR_GRAY2RGB, cv2.COLOR_GRAY2BGR) else 1
+                    cost_cvt_first     = iw * ih * cvt[2] + rw * rh * cvt[2]
+                    cost_cvt_last      = rw * rh * cin + rw * rh * cvt[2]
+
+                    if (cost_cvt_first < cost_cvt_last) != (a[0] == 'cvt'):
+                        prims[i : i + 2] = [b, a]
+                    else:
+                        continue
+
+                else:
+                    continue
+
+                changed = True
+
+                break
+
+        return prims
+
+    def plan(self, shape: tuple, dtype: Any, format: str | None) -> tuple[list[tuple], str | None]:
+        if (plan := self.plans.get(key := (shape, dtype, format))) is None:
+            prims, out_format = self.resolve(shape, format)
+            h, w, *c          = shape
+            c                 = c[0] if c else 1
+            steps             = []  # [(prim, out_shape or None if view), ...]
+
+            for prim in prims:
+                if (name := prim[0]) == 'crop':
+                    w, h = prim[3] - prim[1], prim[4] - prim[2]
+
+                    steps.append((prim, None))
+
+                else:
+                    if name == 'resize':
+                        w, h = prim[1]
+                    elif name == 'rotate' and prim[1] != cv2.ROTATE_180:
+                        w, h = h, w
+                    elif name == 'cvt':
+                        c = prim[2]
+
+                    steps.append((prim, (h, w) if c == 1 else (h, w, c)))
+
+            last = max((i for i, (_, out_shape) in enumerate(steps) if out_shape is not None), default=-1)
+            bufs = [None if out_shape is None or i == last else np.empty(out_shape, dtype)
+                for i, (_, out_shape) in enumerate(steps)]
+
+            self.plans[key] = plan = ([(prim, out_shape, buf, i == last)
+                for i, ((prim, out_shape), buf) in enumerate(zip(steps, bufs))], out_format)
+
+        return plan
+
+    def __call__(self, image: ndarray, format: str | None = None, dst: ndarray | None = None) -> tuple[ndarray, str | None]:
+        """Run the ops on `image` of `format` returning (new image, new format). If there are no pixel-moving ops (only
+        crops or nothing at all) then the image returned is a view of (or is) `image`. `dst` can be passed as an output
+        buffer for the final step, it must be the correct shape and dtype."""
+
+        steps, out_format = self.plan(image.shape, image.dtype, format)
+
+        for prim, out_shape, buf, is_last in steps:
+            if (name := prim[0]) == 'crop':
+                image = image[prim[2] : prim[4], prim[1] : prim[3]]
+
+                continue
+
+            if is_last:
+                buf = self.alloc(out_shape, image.dtype) if dst is None else dst
+
+            if name == 'resize':
+                image = cv2.resize(image, prim[1], dst=buf, interpolation=prim[2])
+            elif name == 'cvt':
+                image = cv2.cvtColor(image, prim[1], dst=buf)
+            elif name == 'flip':
+                image = cv2.flip(image, prim[1], dst=buf)
+            else:  # name == 'rotate'
+                image = cv2.rotate(image, prim[1], dst=buf)
+
+        return image, out_format
+
+    def apply(self, frame: Frame) -> Frame:
+        """Run the ops on a Frame image returning a new Frame with the same data, or `frame` if it has no image or the ops
+        resolve to nothing for this frame."""
+
+        if not self.ops or not frame.has_image:
+            return frame
+
+        image, format = self(src := frame.image, frame.format)
+
+        return frame if image is src else Frame(image, frame, format)
@@ -0,0 +1,137 @@
+"""End-to-end latency controller for sources. Listens passively ('??') to the '_metrics' of a downstream filter, normally
+the last one in the pipeline or its dedicated `outputs_metrics` address, and adjusts a maximum frame rate for the source
+so that the reported latency stays under a target. Multiplicative decrease towards the rate the downstream filter is
+actually achieving when over target, gradual increase back up when comfortably under, with a hold time between changes
+so that the smoothed downstream latency has time to react.
+
+Environment variables:
+    LATENCY_MIN_FPS: Lowest frame rate the controller will throttle a source down to. Default 1.
+
+    LATENCY_HOLD: Seconds to hold a new rate before changing it again. Default 1.
+"""
+
+import logging
+import os
+from threading import Event, Thread
+from time import time
+
+from .mq import MQ
+from .utils import json_getval
+from .zeromq import ZMQ_POLL_TIMEOUT as POLL_TIMEOUT_MS, ZMQReceiver
+
+__all__ = ['LatencyController']
+
+logger = logging.getLogger(__name__)
+
+LATENCY_MIN_FPS = float(json_getval(os.getenv('LATENCY_MIN_FPS') or 1))
+LATENCY_HOLD    = float(json_getval(os.getenv('LATENCY_HOLD') or 1))
+
+DECREASE = 0.8   # multiply achieved downstream fps by this when over target
+INCREASE = 1.1   # multiply current limit by this when under target with headroom
+HEADROOM = 0.75  # fraction of target latency under which we start to increase rate again
+
+
+class LatencyController:
+    """Keeps `maxfps` (None means unlimited) such that the latency reported downstream stays under `target_ms`. The
+    latency used is 'lat_out' if present, otherwise 'lat_in' (a sink has no output so only reports 'lat_in'), both are
+    measured from the source frame 'meta.ts'."""
+
+    def __init__(self,
+        target_ms: float,
+        addr:      str,
+        max_fps:   float | None = None,
+        *,
+        min_fps:   float | None = None,
+        hold:      float | None = None,
+    ):
+        """Args:
+            target_ms: Target end-to-end latency in milliseconds.
+
+            addr: Address of the downstream filter output to listen to for '_metrics', e.g. 'tcp://localhost:5554'.
+
+            max_fps: Natural frame rate of the source, when the limit grows past this it is removed. If None then it is
+                removed when it grows past twice the rate achieved downstream.
+
+            min_fps: Lowest rate to throttle down to, has env var default.
+
+            hold: Seconds to hold a rate before changing it again, has env var default.
+        """
+
+        self.target_ms = target_ms
+        self.addr      = addr
+        self.max_fps   = max_fps
+        self.min_fps   = LATENCY_MIN_FPS if min_fps is None else min_fps
+        self.hold      = LATENCY_HOLD if hold is None else hold
+        self.maxfps    = None  # current limit, None = unlimited
+        self.lat_ms    = None  # last seen downstream latency
+        self.fps       = None  # last seen downstream fps
+        self.change_t  = 0.
+        self.stop_evt  = Event()
+        self.thread    = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = Thread(target=self.thread_func, daemon=True)
+
+            self.thread.start()
+
+    def stop(self):
+        if (thread := self.thread) is not None:
+            self.stop_evt.set()
+            thread.join()
+
+            self.thread = None
+
+    def update(self, lat_ms: float, fps: float, t: float | None = None) -> float | None:
+        """Feed one downstream latency / fps observation and return the new `maxfps`."""
+
+        self.lat_ms = lat_ms
+        self.fps    = fps
+
+        if (t := time() if t is None else t) - self.change_t < self.hold:
+            return self.maxfps
+
+        if lat_ms > (target_ms := self.target_ms):
+            maxfps = max(self.min_fps, (fps if (cur := self.maxfps) is None else min(cur, fps)) * DECREASE)
+
+        elif (cur := self.maxfps) is not None and lat_ms < target_ms * HEADROOM:
+            maxfps = cur * INCREASE
+
+            if maxfps >= (fps * 2 if (max_fps := self.max_fps) is None else max_fps):
+                maxfps = None
+
+        else:
+            return self.maxfps
+
+        if maxfps != cur:
+            if cur is None:
+                logger.info(f'latency {lat_ms:.0f}ms over target {target_ms:.0f}ms, throttling to {maxfps:.1f} fps')
+            elif maxfps is None:
+                logger.info(f'latency {lat_ms:.0f}ms under target {target_ms:.0f}ms, throttle removed')
+            else:
+                logger.debug(f'latency {lat_ms:.0f}ms, target {target_ms:.0f}ms, throttle {maxfps:.1f} fps')
+
+            self.maxfps   = maxfps
+            self.change_t = t
+
+        return maxfps
+
+    def thread_func(self):
+        receiver = ZMQReceiver([(self.addr.rstrip('?') + '??', [('_metrics', '_metrics')])])
+
+        try:
+            while not self.stop_evt.is_set():
+                if (res := receiver.recv(timeout=POLL_TIMEOUT_MS)) is None or (msg := res[0].get('_metrics')) is None:
+                    continue
+
+                metrics = MQ.topicmsgs2frames({'_metrics': msg})['_metrics'].data
+
+                if (lat_ms := metrics.get('lat_out') or metrics.get('lat_in')) is not None and \
+                        (fps := metrics.get('fps')) is not None:
+                    self.update(lat_ms, fps)
+
+        except Exception as exc:
+            logger.error(f'latency controller stopped: {exc}')
+
+        finally:
+            receiver.destroy()
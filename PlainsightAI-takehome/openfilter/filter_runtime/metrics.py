@@ -15,9 +15,9 @@ from pprint import pformat
 from threading import Event, Thread
 from time import time
 
-from psutil import Process, cpu_count
-
+from .bufpool import buffer_pool
 from .frame import Frame
+from .profiler import FILTER_TIMINGS, Timings
 from .utils import JSONType, json_getval, sizestr, secstr, timestr
 
 __all__ = ['Metrics']
@@ -33,8 +33,10 @@ GPU_METRIC_NAMES     = [(f'gpu{i}', f'gpu{i}_mem') for i in range(8)]
 
 class Metrics:
     def __init__(self):
+        import psutil  # not at top because is only needed if metrics are actually used
+
         self.fps          = 15
-        self.fps_t        = self.uptime_t = time()
+        self.fps_t        = self.uptime_t = self.frame_t = time()  # frame_t is last time a frame came in or went out
         self.fps_td       = 1 / 15
         self.cpu          = 0
         self.mem          = 0
@@ -43,7 +45,8 @@ class Metrics:
         self.gpu          = {}
         self.frame_count  = 0
         self.megapx_count = 0
-        self.proc         = Process()
+        self.proc         = psutil.Process()
+        self.timings      = Timings() if FILTER_TIMINGS else None  # recv / process / send histograms fed by Filter
         self.stop_evt     = Event()
 
         self.cpu_thread = Thread(target=self.cpu_thread_func, args=(self.stop_evt,), daemon=True)
@@ -64,6 +67,8 @@ class Metrics:
         self.cpu_thread.join()
 
     def cpu_thread_func(self, stop_evt: Event):  # we do this in a separate thread because it can take a non-insignificant amount of time
+        from psutil import cpu_count
+
         last_t   = time()
         proc     = self.proc
         cores    = cpu_count(logical=True) or 1
@@ -136,6 +141,8 @@ class Metrics:
         if not frames:  # don't count anything if totally empty or missing (Nnne) frames
             return
 
+        self.frame_t = time()
+
         megapx_count = self.megapx_count
         tss          = []
 
@@ -155,6 +162,10 @@ class Metrics:
     def outgoing(self, frames: dict[str, Frame] | None = None) -> dict[str, JSONType]:
         td          = (t := time()) - self.fps_t
         self.fps_t  = t
+
+        if frames:
+            self.frame_t = t
+
         self.fps_td = fps_td = 0.95 * self.fps_td + 0.05 * td
         self.fps    = fps = 1 / fps_td
 
@@ -188,6 +199,12 @@ class Metrics:
         if megapx_count := self.megapx_count:
             metrics['megapx_count'] = megapx_count
 
+        if (pool := buffer_pool.stats())['hits'] or pool['misses']:
+            metrics['pool_hit'] = pool['hit_rate'] * 100  # percent of frame buffer requests served from the pool
+
+        if (timings := self.timings) is not None:
+            metrics.update(timings.metrics())
+
         return metrics
 
     @staticmethod
@@ -4,6 +4,22 @@ Environment variables:
     OUTPUTS_JPG: If 'true'ish then encode output images to network as jpg, 'false'ish only send decoded, 'null' send
         as is as was passed from process().
 
+    OUTPUTS_JPG_THREADS: Number of threads used to jpg encode output images in parallel, both for multiple topics in one
+        message and to start encoding as soon as process() returns, before downstream asks for the message. 0 disables
+        and encodes serially at send time. Default 4.
+
+    OUTPUTS_CROPS: If 'true'ish then Frame crops (see Frame.crop()) sent on the same message as their parent Frame are sent
+        as references into the parent image instead of as their own images. All receivers must get the parent topic as
+        well or they will not be able to reconstruct the crop. Default false.
+
+    OUTPUTS_DEDUP: If 'true'ish then an image identical to the previous one sent on the same topic is sent as a small "same
+        as previous" marker instead of the image. Only use if all receivers get every message (no ephemeral listeners).
+        Not applied to balanced outputs. Default false.
+
+    OUTPUTS_DEDUP_REFRESH: With dedup, send the full image anyway after this many consecutive "same" markers on a topic,
+        so that a receiver which missed the previous image resyncs. The full image is also sent whenever a new or
+        reconnected receiver shows up. 0 for never. Default 100.
+
     OUTPUTS_METRICS: If true then send metrics as '_metrics' on all zeromq outputs. If false then don't send. If string
         then is address of dedicated sender for metrics (will not be sent on normal senders).
 
@@ -19,34 +35,58 @@ Environment variables:
 
 import logging
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from json import loads as json_loads, dumps as json_dumps
+from threading import Lock
 from time import time
-from typing import Callable
+from typing import Callable, Literal
 
 import numpy as np
 
-from .frame import Frame
+from .frame import Frame, Packet
 from .metrics import Metrics
-from .utils import JSONType, json_getval, rndstr
-from .zeromq import ZMQ_POLL_TIMEOUT as POLL_TIMEOUT_MS, is_zeromq_addr as is_mq_addr, ZMQMessage, ZMQSender, ZMQReceiver
+from .profiler import Timings
+from .utils import JSONType, json_getval, once, rndstr
+from .zeromq import ZMQ_POLL_TIMEOUT as POLL_TIMEOUT_MS, is_zeromq_addr as is_mq_addr, ZMQMessage, ZMQSender, ZMQReceiver, \
+    ZMQStateSend
 
 __all__ = ['is_mq_addr', 'MQ', 'MQSender', 'MQReceiver']
 
 logger = logging.getLogger(__name__)
 
-OUTPUTS_JPG          = None if (_ := json_getval((os.getenv('OUTPUTS_JPG') or 'true').lower())) is None else bool(_)
-OUTPUTS_METRICS      = _ if isinstance(_ := json_getval((os.getenv('OUTPUTS_METRICS') or 'true').lower()), bool) else str(_)
-OUTPUTS_METRICS_PUSH = bool(json_getval((os.getenv('OUTPUTS_METRICS_PUSH') or 'true').lower()))
+OUTPUTS_JPG           = None if (_ := json_getval((os.getenv('OUTPUTS_JPG') or 'true').lower())) is None else bool(_)
+OUTPUTS_JPG_THREADS   = int(os.getenv('OUTPUTS_JPG_THREADS') or 4)
+OUTPUTS_CROPS         = bool(json_getval((os.getenv('OUTPUTS_CROPS') or 'false').lower()))
+OUTPUTS_DEDUP         = bool(json_getval((os.getenv('OUTPUTS_DEDUP') or 'false').lower()))
+OUTPUTS_DEDUP_REFRESH = int(os.getenv('OUTPUTS_DEDUP_REFRESH') or 100)
+OUTPUTS_METRICS       = _ if isinstance(_ := json_getval((os.getenv('OUTPUTS_METRICS') or 'true').lower()), bool) else str(_)
+OUTPUTS_METRICS_PUSH  = bool(json_getval((os.getenv('OUTPUTS_METRICS_PUSH') or 'true').lower()))
+
+MQ_LOG                = json_getval((os.getenv('MQ_LOG') or 'false').lower())
+MQ_MSGID_SYNC         = bool(json_getval((os.getenv('MQ_MSGID_SYNC') or 'true').lower()))
+
+jpg_executor_lock = Lock()
+
+
+def jpg_executor() -> ThreadPoolExecutor:
+    """Shared jpg encode thread pool, created on first use. cv2.imencode() releases the GIL so these run in parallel."""
+
+    if (executor := getattr(jpg_executor, 'executor', None)) is None:
+        with jpg_executor_lock:  # senders of filters in Runner 'thread' mode may get here at the same time
+            if (executor := getattr(jpg_executor, 'executor', None)) is None:
+                executor = jpg_executor.executor = ThreadPoolExecutor(OUTPUTS_JPG_THREADS, thread_name_prefix='jpg')
 
-MQ_LOG               = json_getval((os.getenv('MQ_LOG') or 'false').lower())
-MQ_MSGID_SYNC        = bool(json_getval((os.getenv('MQ_MSGID_SYNC') or 'true').lower()))
+    return executor
 
 
 class DummyMetrics:
-    def __init__(self): self.uptime_t = time()
+    timings = None
+    def __init__(self): self.uptime_t = self.frame_t = time()
     def destroy(self): pass
-    def incoming(self, frames=None): pass
+    def incoming(self, frames=None):
+        if frames: self.frame_t = time()
     def outgoing(self, frames=None) -> dict[str, JSONType]:
+        if frames: self.frame_t = time()
         return {'ts': (t := time()), 'fps': 15.0, 'cpu': 0.0, 'mem': 0.0, 'uptime_count': int(t - self.uptime_t)}
 
 
@@ -64,34 +104,75 @@ class MQ:
         outs_balance:  bool = False,
         outs_required: list[str] | None = None,
         outs_jpg:      bool | None = None,
+        outs_crops:    bool | None = None,
+        outs_dedup:    bool | None = None,
         outs_metrics:  str | bool | None = None,
         metrics_cb:    Callable[[dict], None] | None = None,
         on_exit_msg:   Callable[[str], None] | None = None,
+        on_reconfig:   Callable[[dict], None] | None = None,
+        on_profile:    Callable[[float | None], None] | None = None,
         mq_log:        str | bool | None = None,
         mq_msgid_sync: bool | None = None,
     ):
-        self.mq_id         = mq_id or rndstr(8)
-        on_exit_msg_       = (lambda m: None) if on_exit_msg is None else (lambda m: on_exit_msg(m[0]))
-        self.sender        = ZMQSender(outs_bind, self.mq_id, on_exit_msg_, outs_balance, outs_required) \
+        if outs_dedup and outs_balance:  # consecutive messages go to different receivers, which would not have prev
+            raise ValueError('outputs dedup can not be used with outputs balance')
+
+        self.mq_id         = mq_id = mq_id or rndstr(8)
+
+        def on_oob_msg(msg):  # exit messages are just the reason string, anything else is a dict
+            if not isinstance(xtra := msg[0], dict):
+                if on_exit_msg is not None:
+                    on_exit_msg(xtra)
+
+            elif xtra.get('id', mq_id) != mq_id:
+                pass
+
+            elif (changes := xtra.get('reconfigure')) is not None:
+                if on_reconfig is not None:
+                    on_reconfig(changes)
+
+            elif 'profile' in xtra:
+                if on_profile is not None:
+                    on_profile(xtra['profile'])
+
+        self.sender        = ZMQSender(outs_bind, self.mq_id, on_oob_msg, outs_balance, outs_required) \
             if outs_bind else None
-        self.receiver      = ZMQReceiver(srcs_n_topics, self.mq_id, on_exit_msg_, srcs_balance, srcs_low_lat) \
+        self.receiver      = ZMQReceiver(srcs_n_topics, self.mq_id, on_oob_msg, srcs_balance, srcs_low_lat) \
             if srcs_n_topics else None
         self.outs_jpg      = OUTPUTS_JPG if outs_jpg is None else outs_jpg
+        self.outs_crops    = OUTPUTS_CROPS if outs_crops is None else bool(outs_crops)
         self.outs_metrics  = outs_metrics = OUTPUTS_METRICS if outs_metrics is None else outs_metrics
         self.metrics_cb    = metrics_cb
         self.mq_log        = MQ.LOG_MAP.get(MQ_LOG if mq_log is None else mq_log, False)
         self.mq_msgid_sync = MQ_MSGID_SYNC if mq_msgid_sync is None else mq_msgid_sync
         self.send_state    = None
         self.recv_state    = None
+        self.recv_lock     = Lock()  # recv_state is set by send() and taken by recv(), different threads when pipelined
+        self.send_nconns   = 0   # sender.nconns when send_prev was last valid
+        self.send_prev     = {} if (OUTPUTS_DEDUP and not outs_balance if outs_dedup is None else outs_dedup) else None
+        self.recv_prev     = {}
+        self.jpgs          = {}  # {id(Frame): (Frame, Future), ...} jpg encodes started by prefetch_jpgs()
 
         if isinstance(outs_metrics, str):
-            self.metrics_sender = ZMQSender(outs_metrics, self.mq_id, on_exit_msg_)
+            self.metrics_sender = ZMQSender(outs_metrics, self.mq_id, on_oob_msg)
         else:
             self.metrics_sender = None
 
         self.metrics_ = Metrics() if outs_metrics or metrics_cb else DummyMetrics()
         self.metrics  = {'ts': time(), 'fps': 15.0, 'cpu': 0.0, 'mem': 0.0, 'uptime_count': 0}  # initial guaranteed-to-be-present metrics, for outside querying, not used here
 
+    @property
+    def timings(self) -> Timings | None:
+        """Timing histograms reported in metrics, None if not keeping them."""
+
+        return self.metrics_.timings
+
+    @property
+    def frame_t(self) -> float:
+        """Last time a non-empty set of frames was received or sent, or creation time if none yet."""
+
+        return self.metrics_.frame_t
+
     def destroy(self):
         self.metrics_.destroy()
 
@@ -119,7 +200,15 @@ class MQ:
         if self.metrics_sender is not None:
             self.metrics_sender.send_oob(reason)
 
-    def send(self, frames: dict[str, Frame] | Callable[[], dict[str, Frame] | None] | None, timeout: int | None = None) -> bool:
+    def send(self,
+        frames:  dict[str, Frame] | Callable[[], dict[str, Frame] | None] | None,
+        timeout: int | None = None,
+        state:   ZMQStateSend | None | Literal[False] = False,
+    ) -> bool:
+        """Send `frames`. The `state` is for pipelined operation where recv() and send() do not alternate, it is the
+        state that came with these frames from `recv(pipelined=True)`. False means use the internal state from the
+        last recv()."""
+
         def outgoing():
             nonlocal frames, metrics
 
@@ -154,7 +243,12 @@ class MQ:
             if self.outs_metrics is True:
                 frames = {**frames, '_metrics': Frame(metrics)}
 
-            return MQ.frames2topicmsgs(frames, self.outs_jpg)
+            if (send_prev := self.send_prev) is not None and (nconns := self.sender.nconns) != self.send_nconns:
+                self.send_nconns = nconns
+
+                send_prev.clear()  # new or reconnected receiver doesn't have our previous images
+
+            return MQ.frames2topicmsgs(frames, self.outs_jpg, self.outs_crops, self.send_prev, self.jpgs)
 
         metrics = None
 
@@ -164,10 +258,14 @@ class MQ:
 
             return True
 
-        if (recv_state := self.sender.send(callback, self.send_state if self.mq_msgid_sync else None, timeout)) is None:
+        if (recv_state := self.sender.send(callback, (self.send_state if state is False else state) if self.mq_msgid_sync
+                else None, timeout)) is None:
             return False
 
-        self.recv_state = recv_state if frames is not None else None  # callback might haver returned None in which case send returns same state as previously, we don't want this because it will set recv wrong and cause a newer message warning
+        with self.recv_lock:
+            self.recv_state = recv_state if frames is not None else None  # callback might haver returned None in which case send returns same state as previously, we don't want this because it will set recv wrong and cause a newer message warning
+
+        self.jpgs       = {}
         self.send_state = None  # in case we get another send() without a matching recv(), will increment msg_id otherwise message would be discarded
 
         if metrics is not None:  # could be None because nothing sent (NOT due to timeout but maybe msg_id invalidated as outdated by downstream) so callback not called and metrics not set
@@ -175,62 +273,223 @@ class MQ:
 
         return True
 
-    def recv(self, timeout: int | None = None) -> dict[str, Frame] | None:
+    def prefetch_jpgs(self, frames: dict[str, Frame] | Callable | None):
+        """Start jpg encoding of output `frames` in the background so that they are likely ready by the time downstream
+        requests them in send(). Frames must not be modified after this. Only applies if outputs are definitely jpg."""
+
+        if not isinstance(frames, dict) or self.sender is None or self.outs_jpg is not True or not OUTPUTS_JPG_THREADS \
+                or self.send_prev is not None:  # don't encode ahead with dedup, static scenes would mostly waste it
+            return
+
+        executor = jpg_executor()
+        jpgs     = {}
+
+        for frame in frames.values():
+            if frame.has_raw and not frame.has_jpg and id(frame) not in jpgs and not (self.outs_crops and frame.parent):
+                jpgs[id(frame)] = (frame, executor.submit(getattr, frame, 'jpg'))
+
+        self.jpgs = jpgs
+
+    def recv(self, timeout: int | None = None, pipelined: bool = False) \
+            -> dict[str, Frame] | tuple[dict[str, Frame], ZMQStateSend | None] | None:
+        """Receive frames. If `pipelined` then returns (frames, state) where state must be passed to the send() of the
+        frames that result from these, for when recv() and send() are called from different threads and don't alternate.
+        """
+
         if self.receiver is None:
-            return {}
+            return ({}, None) if pipelined else {}
+
+        with self.recv_lock:  # take it, we use it up so next time increments automatically in case send() is not called to get new state
+            recv_state, self.recv_state = self.recv_state, None
+
+        if recv_state is not None and pipelined and recv_state.msg_id <= self.receiver.prev_id:
+            recv_state = None  # from a send() of an older message than we have already received
+
+        if (res := self.receiver.recv(recv_state if self.mq_msgid_sync else None, timeout)) is None:
+            if recv_state is not None:
+                with self.recv_lock:  # not used up, put it back unless send() has set a newer one in the meantime
+                    if self.recv_state is None:
+                        self.recv_state = recv_state
 
-        if (res := self.receiver.recv(self.recv_state if self.mq_msgid_sync else None, timeout)) is None:
             return None
 
-        topicmsgs, self.send_state = res
-        self.recv_state            = None  # we already used up this recv_state so set to None to increment automatically next time in case send() is not called to get new state
+        topicmsgs, send_state = res
 
-        self.metrics_.incoming(frames := MQ.topicmsgs2frames(topicmsgs))
+        if not pipelined:
+            self.send_state = send_state
 
-        return frames
+        try:
+            frames = MQ.topicmsgs2frames(topicmsgs, self.recv_prev)
+
+        except MQ.MissingPrevImage as exc:  # joined during a static scene, drop messages until the next full image
+            once(logger.warning, f'{exc}, dropping messages until a full image arrives', t=60)
+
+            return None
+
+        self.metrics_.incoming(frames)
+
+        return (frames, send_state) if pipelined else frames
+
+    class MissingPrevImage(RuntimeError):
+        """Received a "same" image marker without having the previous image, see topicmsgs2frames()."""
+
+    @staticmethod
+    def same_as_prev(frame: Frame, topic: str, prev: dict[str, tuple]) -> bool:
+        """Whether the image of `frame` is identical to the previous one seen on `topic` and was not already marked the
+        same OUTPUTS_DEDUP_REFRESH times in a row, updates `prev`."""
+
+        key = (frame.shapef, Frame.fingerprint(frame.image) if frame.has_raw else frame.jpg)
+
+        if (pkey_n := prev.get(topic)) is not None and pkey_n[0] == key and \
+                (not OUTPUTS_DEDUP_REFRESH or pkey_n[1] < OUTPUTS_DEDUP_REFRESH):
+            prev[topic] = (key, pkey_n[1] + 1)
+
+            return True
+
+        prev[topic] = (key, 0)
+
+        return False
 
     @staticmethod
-    def frames2topicmsgs(frames: dict[str, Frame], outs_jpg: bool | None = None) -> dict[str, ZMQMessage]:
+    def frames2topicmsgs(
+        frames:     dict[str, Frame],
+        outs_jpg:   bool | None = None,
+        outs_crops: bool = False,
+        prev:       dict[str, tuple] | None = None,  # if present then dedup against previous images sent per topic
+        jpgs:       dict[int, tuple[Frame, Future]] | None = None,  # jpg encodes already started
+    ) -> dict[str, ZMQMessage]:
         topicmsgs = {}
+        encodes   = []  # [(msg, Frame), ...] jpgs to encode
+        parents   = {}  # {id(parent image): [parent Frame, ref id or None], ...}
+        refs      = {}  # {id(parent image): ref id, ...} - parents which are actually referenced, have 'rid' in xtra
+
+        if outs_crops and any(frame.parent is not None for frame in frames.values()):
+            parents = {id(frame.image): [frame, None] for frame in frames.values() if frame.has_raw and frame.parent is None}
 
         for topic, frame in frames.items():
             data = json_dumps(frame.data, separators=(',', ':')).encode() if frame.data else None
 
+            if not frame.has_image or frame.parent is not None:
+                if prev is not None:
+                    prev.pop(topic, None)
+
             if not frame.has_image:
-                msg = [None] if data is None else [None, data]
+                if (pkt := frame.packet) is None:
+                    msg = [None] if data is None else [None, data]
+
+                else:  # compressed video packet, extradata (if any) goes in front of the packet data
+                    xtra = {'pkt': [pkt.codec, pkt.key, pkt.width, pkt.height, pkt.fps, len(extra := pkt.extra or b'')]}
+                    msg  = [xtra, extra + pkt.data if extra else pkt.data]
+
+                    if data is not None:
+                        msg.append(data)
+
+            elif (parent := frame.parent) is not None and (pf := parents.get(id(parent.image))) is not None and \
+                    pf[0].format == frame.format:  # crop of an image which is going out on this message, send reference
+                if (rid := pf[1]) is None:
+                    rid = pf[1] = refs[id(parent.image)] = rndstr(8)
+
+                xtra = {'img': [frame.height, frame.width, frame.format, 'ref'], 'ref': [rid, *frame.offset]}
+                msg  = [xtra, b''] if data is None else [xtra, b'', data]
+
+            elif prev is not None and MQ.same_as_prev(frame, topic, prev):
+                xtra = {'img': [frame.height, frame.width, frame.format, 'same']}
+                msg  = [xtra, b''] if data is None else [xtra, b'', data]
 
             else:
                 enc  = 'jpg' if (do_jpg := frame.has_jpg if outs_jpg is None else outs_jpg) else 'raw'  # preferentially send jpg if is already encoded
                 xtra = {'img': [frame.height, frame.width, frame.format, enc]}
-                img  = frame.jpg if do_jpg else bytearray(memoryview(frame.image))
+                img  = (frame.jpg if frame.has_jpg else None) if do_jpg else bytearray(memoryview(frame.image))
                 msg  = [xtra, img] if data is None else [xtra, img, data]
 
+                if img is None:  # needs encoding, done below all together
+                    encodes.append((msg, frame))
+
             topicmsgs[topic] = msg
 
+        if encodes:
+            if len(encodes) == 1 and not jpgs or not OUTPUTS_JPG_THREADS:
+                for msg, frame in encodes:
+                    msg[1] = frame.jpg
+
+            else:  # encode in parallel, possibly already started by prefetch_jpgs()
+                executor = jpg_executor()
+                futures  = {}
+
+                for _, frame in encodes:
+                    if (fid := id(frame)) not in futures:
+                        futures[fid] = fj[1] if jpgs and (fj := jpgs.get(fid)) else executor.submit(getattr, frame, 'jpg')
+
+                for msg, frame in encodes:
+                    msg[1] = futures[id(frame)].result()
+
+        if prev is not None and len(prev) > len(frames):  # forget topics not sent this time
+            for topic in [t for t in prev if t not in frames]:
+                del prev[topic]
+
+        if refs:  # mark referenced parents, done after because we only know which are referenced after all crops seen
+            for topic, frame in frames.items():
+                if (rid := refs.get(id(frame.image) if frame.has_raw else None)) is not None and frame.parent is None:
+                    topicmsgs[topic][0]['rid'] = rid
+
         return topicmsgs
 
     @staticmethod
-    def topicmsgs2frames(topicmsgs: dict[str, ZMQMessage]) -> dict[str, Frame]:
-        frames = {}
+    def topicmsgs2frames(
+        topicmsgs: dict[str, ZMQMessage],
+        prev:      dict[str, Frame] | None = None,  # previous Frames with images per topic for "same" images
+    ) -> dict[str, Frame]:
+        frames  = {}
+        parents = {}  # {ref id: parent Frame, ...}
+        crops   = []  # [(topic, xtra, ref, data), ...]
 
         for topic, msg in topicmsgs.items():
-            xtra    = xtra['img'] if (xtra := msg[0]) else None
-            dataidx = 2 if xtra else 1
+            xtra    = xtra_.get('img') if (xtra_ := msg[0]) else None
+            dataidx = 2 if xtra_ else 1
 
             if (lmsg := len(msg)) > dataidx + 1:
                 raise RuntimeError(f'incorrect number of messages: {lmsg}')
 
-            data  = json_loads(msg[dataidx].decode()) if lmsg > dataidx else None
-            frame = (
-                Frame(data)
-                if xtra is None else
-                Frame(np.frombuffer(msg[1], np.uint8).reshape(xtra[:2] if xtra[2] == 'GRAY' else (xtra[0], xtra[1], 3)), data, xtra[2])
-                if xtra[3] == 'raw' else
-                Frame.from_jpg(msg[1], data, xtra[0], xtra[1], xtra[2])
-            )
+            data = json_loads(msg[dataidx].decode()) if lmsg > dataidx else None
+
+            if xtra and xtra[3] == 'ref':  # crop referencing parent image, resolve once all parents are available
+                crops.append((topic, xtra, xtra_['ref'], data))
+
+                continue
+
+            if xtra and xtra[3] == 'same':
+                if (frame := None if prev is None else prev.get(topic)) is None:
+                    raise MQ.MissingPrevImage(f'received same-as-previous image without a previous image on {topic!r}')
+
+                frame = Frame(frame, data)
+
+            elif xtra is None and xtra_ and (pkt := xtra_.get('pkt')) is not None:  # compressed video packet
+                buf   = memoryview(msg[1])
+                frame = Frame.from_packet(Packet(bytes(buf[pkt[5]:]), *pkt[:5], bytes(buf[:pkt[5]]) or None), data)
+
+            else:
+                frame = (
+                    Frame(data)
+                    if xtra is None else
+                    Frame(np.frombuffer(msg[1], np.uint8).reshape(xtra[:2] if xtra[2] == 'GRAY' else (xtra[0], xtra[1], 3)), data, xtra[2])
+                    if xtra[3] == 'raw' else
+                    Frame.from_jpg(msg[1], data, xtra[0], xtra[1], xtra[2])
+                )
 
             frames[topic] = frame
 
+            if prev is not None and frame.has_image:
+                prev[topic] = frame
+
+            if xtra and (rid := xtra_.get('rid')) is not None:
+                parents[rid] = frame
+
+        for topic, xtra, (rid, x, y), data in crops:
+            if (parent := parents.get(rid)) is None:
+                raise RuntimeError(f'parent image of crop {topic!r} not received, are all topics subscribed?')
+
+            frames[topic] = parent.crop(x, y, xtra[1], xtra[0], data)
+
         return frames
 
 
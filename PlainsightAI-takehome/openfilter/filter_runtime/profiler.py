@@ -0,0 +1,176 @@
+"""Per-call timing histograms and an on-demand sampling profiler for live filters.
+
+Timings are kept for receive wait, process() and send wait of each loop in log-spaced histograms over a rolling window
+and reported as percentiles in the filter's metrics. The sampling profiler periodically snapshots the Python stacks of
+all threads of the process for some time and writes them in collapsed format (one 'thread;outer;...;inner count' line
+per unique stack), which is what flamegraph.pl and speedscope read.
+
+Environment variables:
+    FILTER_TIMINGS: If 'true'ish then keep recv / process / send timing histograms and report their percentiles in
+        metrics. Default true.
+
+    FILTER_TIMINGS_WINDOW: Seconds per timing histogram window, percentiles cover between one and two windows.
+        Default 10.
+
+    PROFILE_SIGNAL: Signal which starts the sampling profiler in a running filter, e.g. 'SIGUSR2', 'none' to not hook
+        any. Only hooked in the main thread of a process. Default 'SIGUSR2'.
+
+    PROFILE_DURATION: Default seconds to run the sampling profiler for. Default 10.
+
+    PROFILE_INTERVAL: Seconds between stack samples. Default 0.005.
+"""
+
+import logging
+import os
+import signal
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from math import log2
+from threading import Lock
+from time import perf_counter, sleep, time
+
+from .utils import JSONType, json_getval
+
+__all__ = ['FILTER_TIMINGS', 'PROFILE_SIGNAL', 'PROFILE_DURATION', 'Timings', 'SamplingProfiler']
+
+logger = logging.getLogger(__name__)
+
+FILTER_TIMINGS        = bool(json_getval((os.getenv('FILTER_TIMINGS') or 'true').lower()))
+FILTER_TIMINGS_WINDOW = float(os.getenv('FILTER_TIMINGS_WINDOW') or 10)
+PROFILE_SIGNAL        = None if (_ := (os.getenv('PROFILE_SIGNAL') or 'SIGUSR2').upper()) in ('NONE', 'FALSE') else \
+    getattr(signal, _ if _.startswith('SIG') else f'SIG{_}', None)
+PROFILE_DURATION      = float(os.getenv('PROFILE_DURATION') or 10)
+PROFILE_INTERVAL      = float(os.getenv('PROFILE_INTERVAL') or 0.005)
+
+BUCKET_MIN = 0.00001  # 10us, upper bound of first bucket
+BUCKET_DIV = 4        # buckets per doubling, so values are reported within 19%
+BUCKET_NUM = 100      # up to ~340s, anything over goes in the last bucket
+
+
+class Timings:
+    """Thread-safe log-spaced histograms of seconds per named phase, e.g. 'recv', 'process', 'send'."""
+
+    def __init__(self, window: float | None = None):
+        self.window   = FILTER_TIMINGS_WINDOW if window is None else window
+        self.window_t = time()
+        self.hists    = {}  # {'phase': [count per bucket, ...], ...} current window
+        self.prev     = {}  # previous window
+        self.cache    = None
+        self.cache_t  = 0.
+        self.lock     = Lock()
+
+    @staticmethod
+    def bucket(seconds: float) -> int:
+        return 0 if seconds <= BUCKET_MIN else min(BUCKET_NUM - 1, int(log2(seconds / BUCKET_MIN) * BUCKET_DIV) + 1)
+
+    @staticmethod
+    def bucket_max(bucket: int) -> float:
+        return BUCKET_MIN * 2 ** (bucket / BUCKET_DIV)
+
+    def add(self, phase: str, seconds: float):
+        with self.lock:
+            if (t := time()) - self.window_t >= self.window:
+                self.prev     = self.hists if t - self.window_t < self.window * 2 else {}
+                self.hists    = {}
+                self.window_t = t
+
+            if (hist := self.hists.get(phase)) is None:
+                self.hists[phase] = hist = [0] * BUCKET_NUM
+
+            hist[self.bucket(seconds)] += 1
+
+    def percentiles(self, phase: str, pcts: tuple[float, ...] = (50, 90, 99)) -> list[float] | None:
+        """Upper bounds in seconds of the buckets the percentiles fall in, over current and previous window."""
+
+        with self.lock:
+            hists = [h for h in (self.hists.get(phase), self.prev.get(phase)) if h is not None]
+
+        if not hists or not (total := sum(counts := [sum(c) for c in zip(*hists)])):
+            return None
+
+        res   = []
+        cum   = 0
+        pcts  = iter(sorted(pcts))
+        limit = (pct := next(pcts)) * total / 100
+
+        for bucket, count in enumerate(counts):
+            cum += count
+
+            while cum >= limit:
+                res.append(self.bucket_max(bucket))
+
+                if (pct := next(pcts, None)) is None:
+                    return res
+
+                limit = pct * total / 100
+
+        return res
+
+    def metrics(self, every: float = 1) -> dict[str, JSONType]:
+        """{'recv_p50': ms, 'recv_p99': ms, 'process_p50': ...}, recomputed at most `every` seconds."""
+
+        if (t := time()) - self.cache_t >= every:
+            self.cache_t = t
+            self.cache   = {f'{phase}_p{pct}': round(p * 1000, 3)  # milliseconds
+                for phase in list(self.hists) for pct, p in zip((50, 99), self.percentiles(phase, (50, 99)) or ())}
+
+        return self.cache
+
+
+class SamplingProfiler:
+    """Sample stacks of all other threads every `interval` seconds and write collapsed stacks to a file in `path`."""
+
+    def __init__(self, path: str, interval: float | None = None):
+        self.path     = path
+        self.interval = PROFILE_INTERVAL if interval is None else interval
+
+    @staticmethod
+    def collapse(frame) -> list[str]:
+        stack = []
+
+        while frame is not None:
+            code  = frame.f_code
+            stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'.replace(';', ':'))
+            frame = frame.f_back
+
+        return stack[::-1]
+
+    def sample(self, duration: float) -> Counter:
+        """Collect {'thread;outer;...;inner': count, ...} for `duration` seconds."""
+
+        own    = threading.get_ident()
+        stacks = Counter()
+        end_t  = perf_counter() + duration
+
+        while (t := perf_counter()) < end_t:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    stacks[';'.join([names.get(ident, str(ident)), *self.collapse(frame)])] += 1
+
+            if (tleft := self.interval - (perf_counter() - t)) > 0:
+                sleep(tleft)
+
+        return stacks
+
+    def run(self, duration: float | None = None) -> str:
+        """Profile for `duration` seconds and return the name of the file written."""
+
+        duration = PROFILE_DURATION if duration is None else duration
+        fnm      = os.path.join(self.path, f'profile_{datetime.now().strftime("%Y%m%d_%H%M%S")}.folded')
+
+        logger.info(f'profiling for {duration}s to {fnm!r}')
+
+        stacks = self.sample(duration)
+
+        os.makedirs(self.path, exist_ok=True)
+
+        with open(fnm, 'w') as f:
+            f.writelines(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+        logger.info(f'profile written: {fnm!r}  ({sum(stacks.values())} samples, {len(stacks)} unique stacks)')
+
+        return fnm
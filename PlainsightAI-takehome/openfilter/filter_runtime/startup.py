@@ -0,0 +1,111 @@
+"""Startup profiling. When enabled, every module import is timed from the moment openfilter.filter_runtime is first
+imported and each Filter logs the slowest imports, its startup time and the time to its first frame received and sent.
+Only imports from the standard library so that it is in place before anything heavy gets imported.
+
+Environment variables:
+    OPENFILTER_PROFILE_STARTUP: If 'true'ish then time imports and log startup profile of each filter.
+
+    OPENFILTER_PROFILE_STARTUP_TOP: Number of slowest imports to log. Default 20.
+"""
+
+import builtins
+import logging
+import os
+import sys
+import threading
+from importlib.util import resolve_name
+from time import perf_counter, time
+
+__all__ = ['PROFILE_STARTUP', 'START_T', 'start_time', 'import_times', 'log_import_times']
+
+logger = logging.getLogger(__name__)
+
+PROFILE_STARTUP     = (os.getenv('OPENFILTER_PROFILE_STARTUP') or 'false').lower() not in ('', '0', 'false', 'no', 'off')
+PROFILE_STARTUP_TOP = int(os.getenv('OPENFILTER_PROFILE_STARTUP_TOP') or 20)
+
+START_T = time()  # fallback start time if we can't get the real one, this module is imported very early
+
+import_times = {}  # {'module': (self seconds, cumulative seconds), ...}
+
+_import_times_logged = False
+
+_orig_import  = builtins.__import__
+_import_local = threading.local()  # per-thread stack of time spent in nested imports
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    try:
+        absname = resolve_name('.' * level + name, (globals or {}).get('__package__')) if level else name
+    except Exception:
+        return _orig_import(name, globals, locals, fromlist, level)
+
+    if (module := sys.modules.get(absname)) is not None:  # most import statements, but may be 'from pkg import sub'
+        if not (fromlist and (subs := [n for f in fromlist if f != '*' and not hasattr(module, f) and
+                (n := f'{absname}.{f}') not in sys.modules])):
+            return _orig_import(name, globals, locals, fromlist, level)
+
+        absname = subs[0]
+
+    if (stack := getattr(_import_local, 'stack', None)) is None:
+        _import_local.stack = stack = []
+
+    stack.append(0.)
+
+    t = perf_counter()
+
+    try:
+        return _orig_import(name, globals, locals, fromlist, level)
+
+    finally:
+        cum   = perf_counter() - t
+        inner = stack.pop()
+
+        if stack:
+            stack[-1] += cum
+
+        if absname not in import_times:
+            import_times[absname] = (cum - inner, cum)
+
+
+if PROFILE_STARTUP:
+    builtins.__import__ = _timed_import
+
+
+def start_time() -> float:
+    """Start time of the current filter, which is the start of the Runner thread if running in one, otherwise the start
+    of the process if psutil is already loaded (we don't import it just for this) and otherwise the time this module
+    was imported."""
+
+    if (thread := threading.current_thread()) is not threading.main_thread():
+        if (start_t := getattr(thread, 'start_t', None)) is not None:  # Runner.Thread
+            return start_t
+
+    elif (psutil := sys.modules.get('psutil')) is not None:
+        try:
+            return psutil.Process().create_time()
+        except Exception:
+            pass
+
+    return START_T
+
+
+def log_import_times(top: int | None = None):
+    """Log the slowest imports by self time, cumulative time includes nested imports. Only once per process since the
+    imports are shared by all filters running in it."""
+
+    global _import_times_logged
+
+    if _import_times_logged:
+        return
+
+    _import_times_logged = True
+
+    top   = PROFILE_STARTUP_TOP if top is None else top
+    times = sorted(import_times.items(), key=lambda item: -item[1][0])[:top]
+    total = sum(t for t, _ in import_times.values())
+    width = max((len(name) for name, _ in times), default=0)
+    lines = '\n'.join(f'  {name:<{width}}  {self_t * 1000:8.1f}ms  {cum_t * 1000:8.1f}ms' for name, (self_t, cum_t)
+        in times)
+
+    logger.info(f'imports: {len(import_times)} modules in {total:.3f}s, slowest {len(times)} (self, cumulative):\n'
+        f'{lines}')
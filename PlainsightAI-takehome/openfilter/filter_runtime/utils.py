@@ -1,4 +1,4 @@
-import importlib.util, importlib.metadata
+import importlib, importlib.util, importlib.metadata
 import logging
 import os
 import re
@@ -23,8 +23,8 @@ __all__ = [
     'parse_time_interval', 'parse_date_and_or_time',
     'pascal_to_snake_case', 'hide_uri_pwds', 'hide_uri_users_and_pwds', 'levenshteinish_distance', 'once',
     'get_real_module_name', 'get_packages', 'get_package_version',
-    'set_env_vars', 'running_in_container', 'setLogLevelGlobal',
-    'adict', 'FnmLock', 'Deque', 'DaemonicTimer', 'SignalStopper'
+    'set_env_vars', 'running_in_container', 'parse_cpu_list', 'numa_nodes', 'setLogLevelGlobal',
+    'adict', 'LazyModule', 'FnmLock', 'Deque', 'DaemonicTimer', 'SignalStopper'
 ]
 
 
@@ -397,6 +397,44 @@ def running_in_container() -> bool:
     return os.path.exists('/.dockerenv') or os.path.exists('/run/.containerenv')
 
 
+def parse_cpu_list(cpus: str | int | Sequence[int]) -> list[int]:
+    """Sorted list of CPU numbers from a Linux style cpu list like '0-3,8,10-11' (as in taskset or sysfs), an int or a
+    list of ints."""
+
+    if isinstance(cpus, int):
+        return [cpus]
+
+    if not isinstance(cpus, str):
+        return sorted(set(int(cpu) for cpu in cpus))
+
+    res = set()
+
+    for part in cpus.replace(' ', '').split(','):
+        if part:
+            first, _, last = part.partition('-')
+            res.update(range(int(first), int(last or first) + 1))
+
+    return sorted(res)
+
+
+def numa_nodes() -> dict[int, list[int]]:
+    """{node: [cpu, ...], ...} of NUMA nodes which have CPUs, empty if this information is not available."""
+
+    nodes = {}
+
+    try:
+        for name in os.listdir(path := '/sys/devices/system/node'):
+            if name.startswith('node') and name[4:].isdigit():
+                with open(f'{path}/{name}/cpulist') as f:
+                    if cpus := parse_cpu_list(f.read().strip()):
+                        nodes[int(name[4:])] = cpus
+
+    except OSError:
+        pass
+
+    return dict(sorted(nodes.items()))
+
+
 def set_env_vars(vars: dict[str, str | None] | None) -> dict[str, str | None] | None:
     """Set or delete environment variables returning the previous values of those variables or None if did not exist.
     Call again with returned dict to set env vars back to what they were before the first call."""
@@ -441,6 +479,24 @@ class adict(dict):
         return self
 
 
+class LazyModule:
+    """Stand-in for a module which is only actually imported on first attribute access, for heavy modules which may not
+    be used at all, e.g. `cv2 = LazyModule('cv2')`. After the import, attributes are served straight from here."""
+
+    def __init__(self, name: str):
+        self.__name = name
+
+    def __getattr__(self, name):
+        module = importlib.import_module(self.__name)
+
+        self.__dict__.update(vars(module))
+
+        return getattr(module, name)
+
+    def __repr__(self):
+        return f'<LazyModule {self.__name!r}>'
+
+
 class FnmLock:
     def __init__(self, fnm: str, timeout: float | None = None, orphan_timeout: float = 10, retry_time: float = 0.05) -> Callable[[], None]:
         """Lock on a 'FILENAME' by creating 'FILENAME.lock'. Returns a callable which should be called to unlock.
@@ -535,6 +591,10 @@ class Deque:
 
             return self.deque.popleft()
 
+    def clear(self):
+        with self.cond:
+            self.deque.clear()
+
 
 class DaemonicTimer(Thread):
     """It's very annoying that threading.Timer doesn't have a settable daemon flag."""
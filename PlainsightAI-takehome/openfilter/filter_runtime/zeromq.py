@@ -73,6 +73,7 @@ import logging
 import os
 import re
 from json import dumps as json_dumps, loads as json_loads
+from threading import Lock
 from time import time_ns, sleep
 from typing import Callable, NamedTuple
 
@@ -132,21 +133,26 @@ class ZMQStateRecv(NamedTuple):  # for ZMQReceiver.recv() from ZMQSender.send()
     msg_id: int
 
 
+zmq_context_lock = Lock()
+
+
 class ZMQContext:
     context = (None, 0)
 
     @staticmethod
     def get():
-        ZMQContext.context = (ZMQContext.context[0], c + 1) if (c := ZMQContext.context[1]) else (zmq.Context(), 1)
+        with zmq_context_lock:  # filters in Runner 'thread' mode create and destroy their senders / receivers concurrently
+            ZMQContext.context = (ZMQContext.context[0], c + 1) if (c := ZMQContext.context[1]) else (zmq.Context(), 1)
 
-        return ZMQContext.context[0]
+            return ZMQContext.context[0]
 
     @staticmethod
     def free():
-        ZMQContext.context = (ZMQContext.context[0], (c := ZMQContext.context[1] - 1))
+        with zmq_context_lock:
+            ZMQContext.context = (ZMQContext.context[0], (c := ZMQContext.context[1] - 1))
 
-        if not c:
-            ZMQContext.context[0].destroy()  # linger=0)
+            if not c:
+                ZMQContext.context[0].destroy()  # linger=0)
 
 
 class ZMQSender:
@@ -185,6 +191,7 @@ class ZMQSender:
         self.balance       = balance
         self.outs_required = outs_required or []
         self.clients       = {}  # {'full_id': Client, ...}
+        self.nconns        = 0   # count of new or reconnected clients so far, so users can tell when one shows up
         self.min_send_id   = MSG_ID_INITIAL
         self.pull2addr     = pull2addr = {}  # {PULL Socket: 'addr', ...}
         context            = ZMQContext.get()
@@ -374,6 +381,9 @@ class ZMQSender:
 
                 break
 
+            if full_id not in clients or env.get('new'):  # new client or existing one which lost the connection
+                self.nconns += 1
+
             clients[full_id] = ZMQSender.Client(client_id, pull, t, True, ephemeral, prev_id)
 
             if prev_id >= msg_id and not ephemeral:  # if requesting higher frame number than we are sending then discard and return
@@ -0,0 +1,98 @@
+"""
+Unit tests for the frame buffer pool.
+
+Test ID: TC-UNIT-009
+Description: Tests buffer reuse, release on dereference, hit-rate statistics and the byte limit scaling with the
+    largest buffer in use
+Priority: Medium
+"""
+import pytest
+import numpy as np
+
+from openfilter.filter_runtime.bufpool import BufferPool
+from openfilter.filter_runtime.frame import Frame
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestBufferPool:
+    """Test BufferPool behavior."""
+
+    def test_reuse_after_release(self):
+        """A buffer is reused once nothing references it anymore."""
+        pool = BufferPool(1_000_000)
+        buf  = pool.empty((10, 10, 3))
+        addr = buf.ctypes.data
+
+        del buf
+
+        assert pool.empty((10, 10, 3)).ctypes.data == addr
+        assert pool.stats()['hits'] == 1
+
+    def test_no_reuse_while_referenced(self):
+        """Buffers still in use, including through views, are never handed out again."""
+        pool = BufferPool(1_000_000)
+        buf  = pool.empty((10, 10))
+        view = buf[2:4]
+
+        del buf
+
+        assert pool.empty((10, 10)).ctypes.data != view.base.ctypes.data
+        assert pool.stats() == {'hits': 0, 'misses': 2, 'hit_rate': 0., 'buffers': 2, 'bytes': 200}
+
+    def test_readonly_reset(self):
+        """Buffers marked readonly by a Frame come back writable."""
+        pool = BufferPool(1_000_000)
+        buf  = pool.empty((4, 4))
+
+        buf.flags.writeable = False
+
+        del buf
+
+        assert pool.empty((4, 4)).flags.writeable
+
+    def test_limit_and_trim(self):
+        """Over the byte limit idle buffers of other sizes are dropped, otherwise allocations go untracked."""
+        pool = BufferPool(150)
+        a    = pool.empty((100,))
+
+        pool.empty((50,))  # dropped immediately, idle
+        pool.empty((100,))  # trims the idle 50 but still can not fit next to `a`
+
+        assert pool.stats()['bytes'] == 100
+        assert a is not None
+
+    def test_limit_scales_with_size(self):
+        """Only `max_frames` times the largest buffer handed out is tracked, up to `max_bytes`."""
+        pool = BufferPool(1_000_000, 4)
+        bufs = [pool.empty((100,)) for _ in range(6)]  # last two untracked
+
+        assert pool.stats()['buffers'] == 4 and pool.limit == 400
+
+        bufs += [pool.empty((1000,)) for _ in range(4)]  # limit grows, last one untracked
+
+        assert pool.limit == 4000 and pool.stats()['bytes'] == 3400
+
+        pool = BufferPool(3000, 4)
+
+        pool.empty((1000,))
+
+        assert pool.limit == 3000
+        assert BufferPool(1_000_000, 0).limit == 1_000_000
+
+    def test_disabled(self):
+        """A zero size pool is just np.empty()."""
+        pool = BufferPool(0)
+
+        pool.empty((4, 4))
+
+        assert pool.stats()['misses'] == 0
+
+    def test_frame_conversions(self):
+        """Frame conversions produce correct images from pooled buffers."""
+        image = np.random.RandomState(0).randint(0, 256, (8, 8, 3), np.uint8)
+        frame = Frame(image, {}, 'BGR')
+
+        assert np.array_equal(frame.rgb.image, image[..., ::-1])
+        assert np.array_equal(frame.ro.image, image)
+        assert frame.gray.image.shape == (8, 8)
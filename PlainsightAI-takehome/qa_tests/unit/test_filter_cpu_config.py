@@ -0,0 +1,96 @@
+"""
+Unit tests for CPU affinity, NUMA placement and thread caps.
+
+Test ID: TC-UNIT-017
+Description: Tests cpu_affinity / numa_node / threads config validation, application, that threads leaves OpenCV and the
+    environment alone off the main thread and Runner NUMA placement
+Priority: Medium
+"""
+import os
+from threading import Thread
+
+import cv2
+import pytest
+
+from openfilter.filter_runtime import Filter, FilterConfig
+from openfilter.filter_runtime import filter as filter_module
+from openfilter.filter_runtime.utils import parse_cpu_list
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestCpuConfig:
+    """Test per-filter CPU config."""
+
+    def test_parse_cpu_list(self):
+        """Linux style cpu lists, ints and lists of ints."""
+        assert parse_cpu_list('0-3,8,10-11') == [0, 1, 2, 3, 8, 10, 11]
+        assert parse_cpu_list(' 2, 1 ') == [1, 2]
+        assert parse_cpu_list(5) == [5]
+        assert parse_cpu_list([3, 1, 3]) == [1, 3]
+
+    def test_normalize_config(self):
+        """Valid values are normalized, invalid ones rejected."""
+        config = Filter.normalize_config(FilterConfig(sources='tcp://a', cpu_affinity='0-1', numa_node=0, threads=2))
+
+        assert (config.cpu_affinity, config.numa_node, config.threads) == ([0, 1], 0, 2)
+
+        for bad in ({'cpu_affinity': 'x'}, {'cpu_affinity': '-1'}, {'numa_node': -1}, {'threads': 0}):
+            with pytest.raises(ValueError):
+                Filter.normalize_config(FilterConfig(sources='tcp://a', **bad))
+
+    def test_threads_env(self):
+        """Thread caps map to the library env vars."""
+        assert Filter.threads_env(None) == {}
+        assert Filter.threads_env(3)['OMP_NUM_THREADS'] == '3'
+
+    def test_apply_threads_off_main_thread(self, monkeypatch):
+        """Process-global thread caps are not touched by filters running as threads."""
+        nthreads = cv2.getNumThreads()
+        filter   = Filter.__new__(Filter)
+
+        monkeypatch.delenv('OMP_NUM_THREADS', raising=False)
+
+        thread = Thread(target=filter.apply_cpu_config, args=(FilterConfig(threads=nthreads + 1),))
+        thread.start()
+        thread.join()
+
+        assert cv2.getNumThreads() == nthreads
+        assert 'OMP_NUM_THREADS' not in os.environ
+
+    @pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason='no sched_setaffinity')
+    def test_apply_cpu_affinity(self):
+        """Affinity is applied to the calling thread, intersected with the NUMA node CPUs."""
+        cpu     = min(os.sched_getaffinity(0))
+        results = []
+        filter  = Filter.__new__(Filter)
+
+        def target():
+            filter.apply_cpu_config(FilterConfig(cpu_affinity=[cpu]))
+            results.append(os.sched_getaffinity(0))
+
+        thread = Thread(target=target)
+        thread.start()
+        thread.join()
+
+        assert results == [{cpu}]
+
+        with pytest.raises(ValueError):  # affinity does not intersect node
+            filter.apply_cpu_config(FilterConfig(cpu_affinity=[10_000], numa_node=0)
+                if 0 in filter_module.numa_nodes() else FilterConfig(cpu_affinity=[]))
+
+    def test_runner_numa_placement(self, monkeypatch):
+        """Filters are spread over NUMA nodes in contiguous runs, explicit settings are kept."""
+        monkeypatch.setattr(filter_module, 'numa_nodes', lambda: {0: [0, 1], 1: [2, 3]})
+
+        filters = [(Filter, {}), (Filter, {}), (Filter, {'cpu_affinity': [3]}), (Filter, {})]
+        runner  = Filter.Runner(filters, placement='numa', start=False, sig_stop=False)
+
+        assert [c.get('numa_node') for _, c in runner.filters] == [0, 0, None, 1]
+
+        runner = Filter.Runner(filters, placement='none', start=False, sig_stop=False)
+
+        assert all('numa_node' not in c for _, c in runner.filters)
+
+        with pytest.raises(ValueError):
+            Filter.Runner(filters, placement='bogus', start=False)
@@ -0,0 +1,116 @@
+"""
+Unit tests for fused in-process filter execution.
+
+Test ID: TC-UNIT-013
+Description: Tests that Filter.run_fused() passes frames by reference through a DAG of filters in topological order,
+    applies reconfigures between steps and rejects configurations it can not honor
+Priority: Medium
+"""
+from queue import Queue
+
+import numpy as np
+import pytest
+
+from openfilter.filter_runtime import Filter, Frame
+
+
+class Source(Filter):
+    def setup(self, config):
+        self.count = 0
+
+    def process(self, frames):
+        if (count := self.count) >= 3:
+            self.exit()
+
+        self.count = count + 1
+
+        return Frame(self.config.image, {'n': count}, 'BGR')
+
+
+class Stepped(Source):
+    RECONFIGURABLE = ('step',)
+
+    def process(self, frames):
+        if self.count == 1:
+            self.request_reconfigure({'step': 2})
+
+        frame = super().process(frames)
+
+        return Frame(frame, {**frame.data, 'step': self.config.step})
+
+
+class Tag(Filter):
+    def process(self, frames):
+        frame = frames['main']
+
+        assert frame.is_ro
+
+        return Frame(frame, {**frame.data, self.config.id: np.shares_memory(frame.image, self.config.image)})
+
+
+class Sink(Filter):
+    def process(self, frames):
+        self.config.queue.put(frames)
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestFilterFused:
+    """Test Filter.run_fused()."""
+
+    def test_dag(self):
+        """Fan-out and fan-in with topic mapping, frames shared without copy."""
+        queue = Queue()
+        image = np.zeros((4, 4, 3), np.uint8)
+
+        Filter.run_fused([
+            (Source, dict(id='src', outputs='ipc://fused-src', image=image)),
+            (Tag, dict(id='a', sources='ipc://fused-src', outputs='ipc://fused-a', image=image)),
+            (Tag, dict(id='b', sources='ipc://fused-src', outputs='tcp://*:5990', image=image)),
+            (Sink, dict(id='sink', sources=['ipc://fused-a;main>a', 'tcp://localhost:5990;main>b'], queue=queue)),
+        ], sig_stop=False)
+
+        results = [queue.get_nowait() for _ in range(queue.qsize())]
+
+        assert [sorted(r) for r in results] == [['a', 'b']] * 3
+        assert [r['a'].data for r in results] == [{'n': n, 'a': True} for n in range(3)]
+        assert [r['b'].data for r in results] == [{'n': n, 'b': True} for n in range(3)]
+
+    def test_cycle(self):
+        """Circular connections are rejected."""
+        with pytest.raises(ValueError):
+            Filter.run_fused([
+                (Tag, dict(id='a', sources='ipc://fused-b', outputs='ipc://fused-a')),
+                (Tag, dict(id='b', sources='ipc://fused-a', outputs='ipc://fused-b')),
+            ], sig_stop=False)
+
+    def test_reconfigure(self):
+        """A reconfigure requested while fused is applied before the next step."""
+        queue = Queue()
+
+        Filter.run_fused([
+            (Stepped, dict(id='src', outputs='ipc://fused-src', image=np.zeros((4, 4, 3), np.uint8), step=1)),
+            (Sink, dict(id='sink', sources='ipc://fused-src', queue=queue)),
+        ], sig_stop=False)
+
+        assert [queue.get_nowait()['main'].data['step'] for _ in range(queue.qsize())] == [1, 1, 2]
+
+    def test_unsupported(self):
+        """Partial topic wildcards and different CPU settings between fused filters are rejected."""
+        with pytest.raises(ValueError):
+            Filter.run_fused([
+                (Source, dict(id='src', outputs='ipc://fused-src')),
+                (Sink, dict(id='sink', sources='ipc://fused-src;*>a')),
+            ], sig_stop=False)
+
+        with pytest.raises(ValueError):
+            Filter.run_fused([
+                (Source, dict(id='src', outputs='ipc://fused-src', threads=1)),
+                (Sink, dict(id='sink', sources='ipc://fused-src', threads=2)),
+            ], sig_stop=False)
+
+    def test_fused_addr(self):
+        """Source and output addresses are matched regardless of host alias, topics and options."""
+        assert Filter.fused_addr('tcp://*:5552') == Filter.fused_addr('tcp://localhost:5552;main>x?')
+        assert Filter.fused_addr('ipc://x') == ('ipc', 'x')
+        assert Filter.fused_addr('file://video.mp4') is None
@@ -0,0 +1,133 @@
+"""
+Unit tests for the pipelined filter loop.
+
+Test ID: TC-UNIT-012
+Description: Tests that the pipelined recv / process / send loop and process() workers preserve message order and
+    validate their config, that the send state handed from the send thread to the recv thread is not lost and that Util
+    xforms give the same images with concurrent thread workers
+Priority: Medium
+"""
+import multiprocessing as mp
+from time import sleep
+
+import numpy as np
+import pytest
+
+from openfilter.filter_runtime import Filter, FilterConfig, Frame
+from openfilter.filter_runtime.filters.util import Util
+from openfilter.filter_runtime.mq import MQ
+from openfilter.filter_runtime.test import QueueToFilters, FiltersToQueue, RunnerContext
+from openfilter.filter_runtime.zeromq import ZMQStateRecv, ZMQStateSend
+
+
+class SlowFilter(Filter):
+    def process(self, frames):
+        sleep(0.005 * (frames['main'].data['i'] % 3))  # uneven so that workers finish out of order
+
+        return {t: Frame({**f.data, 'seen': True}) for t, f in frames.items()}
+
+
+def run_slow(tmp_path, **config):
+    qin  = mp.Queue()
+    qout = FiltersToQueue.Queue()
+
+    for i in range(20):
+        qin.put({'main': Frame({'i': i})})
+
+    with RunnerContext([
+        (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin)),
+        (SlowFilter, dict(sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b', **config)),
+        (FiltersToQueue, dict(sources=f'ipc://{tmp_path}/b', queue=qout.child_queue)),
+    ], [qout]):
+        return [qout.get(timeout=30)['main'].data for _ in range(20)]
+
+
+def run_util(tmp_path, **config):
+    qin  = mp.Queue()
+    qout = FiltersToQueue.Queue()
+    rnd  = np.random.RandomState(0)
+
+    for i in range(20):
+        qin.put({'main': Frame(rnd.randint(0, 256, (90, 160, 3), np.uint8), {'i': i}, 'BGR')})
+
+    with RunnerContext([
+        (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin)),
+        (Util, dict(sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b', outputs_jpg=False,
+            xforms='flipx, resize 3840x2160, fmtgray, maxsize 640x360', **config)),
+        (FiltersToQueue, dict(sources=f'ipc://{tmp_path}/b', queue=qout.child_queue)),
+    ], [qout]):
+        return [qout.get(timeout=30)['main'] for _ in range(20)]
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestFilterPipeline:
+    """Test Filter `pipeline` option."""
+
+    @pytest.mark.parametrize('pipeline', [True, 3])
+    def test_order_preserved(self, pipeline, tmp_path):
+        """All messages come out processed and in order."""
+        assert run_slow(tmp_path, pipeline=pipeline) == [{'i': i, 'seen': True} for i in range(20)]
+
+    @pytest.mark.parametrize('workers_mode', ['thread', 'process'])
+    def test_workers_order_preserved(self, workers_mode, tmp_path):
+        """Results from parallel workers are sent in original message order."""
+        assert run_slow(tmp_path, workers=4, workers_mode=workers_mode) == [{'i': i, 'seen': True} for i in range(20)]
+
+    def test_recv_state_handover(self):
+        """A state from send() which arrives while recv() is waiting, or a recv() which times out, is not lost."""
+        mq    = MQ(None, None, outs_metrics=False)
+        seen  = []
+        reses = [None, ({}, ZMQStateSend(1)), ({}, ZMQStateSend(2))]
+
+        class Sender:
+            def send(self, callback, state, timeout):
+                return ZMQStateRecv(len(seen) + 4)
+
+        class Receiver:
+            prev_id = 0
+
+            def recv(self, state, timeout):
+                seen.append(state)
+
+                if len(seen) == 2:
+                    mq.send({}, state=None)  # the send thread finishes while we wait
+
+                return reses[len(seen) - 1]
+
+        mq.sender, mq.receiver = Sender(), Receiver()
+
+        mq.send({}, state=None)
+
+        assert mq.recv(pipelined=True) is None  # timed out
+        assert mq.recv(pipelined=True) is not None
+        assert mq.recv(pipelined=True) is not None
+        assert seen == [ZMQStateRecv(4), ZMQStateRecv(4), ZMQStateRecv(6)]
+
+    def test_util_thread_workers(self, tmp_path):
+        """Util xforms running concurrently in thread workers don't share intermediate buffers."""
+        (seq := tmp_path / 'seq').mkdir()
+        (par := tmp_path / 'par').mkdir()
+
+        expected = run_util(seq)
+        frames   = run_util(par, workers=4, workers_mode='thread')
+
+        assert [f.data['i'] for f in frames] == list(range(20))
+        assert frames[0].shape[:2] == (360, 640) and frames[0].is_gray
+        assert all(np.array_equal(f.image, e.image) for f, e in zip(frames, expected))
+
+    def test_invalid_config(self):
+        """Only bools and non-negative ints are accepted."""
+        assert Filter.normalize_config(FilterConfig(pipeline=2)).pipeline == 2
+
+        with pytest.raises(ValueError):
+            Filter.normalize_config(FilterConfig(pipeline=-1))
+
+        with pytest.raises(ValueError):
+            Filter.normalize_config(FilterConfig(pipeline='yes'))
+
+        with pytest.raises(ValueError):
+            Filter.normalize_config(FilterConfig(workers=0))
+
+        with pytest.raises(ValueError):
+            Filter.normalize_config(FilterConfig(workers=2, workers_mode='fiber'))
@@ -0,0 +1,84 @@
+"""
+Unit tests for runtime reconfiguration.
+
+Test ID: TC-UNIT-016
+Description: Tests that filters can be reconfigured without restarting, per opted in field, locally and out-of-band
+Priority: Medium
+"""
+import multiprocessing as mp
+from threading import Thread
+
+import pytest
+
+from openfilter.filter_runtime import Filter, FilterConfig, Frame
+from openfilter.filter_runtime.test import QueueToFilters, FiltersToQueue, RunnerContext
+
+
+class Tagger(Filter):
+    RECONFIGURABLE = ('tag',)
+
+    @classmethod
+    def normalize_config(cls, config):
+        config = super().normalize_config(config)
+
+        if not isinstance(config.tag, str):
+            raise ValueError('tag must be a str')
+
+        return config
+
+    def setup(self, config):
+        self.tag = config.tag
+
+    def reconfigure(self, config):
+        self.tag = config.tag
+
+    def process(self, frames):
+        return {t: Frame({**f.data, 'tag': self.tag}) for t, f in frames.items()}
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestFilterReconfigure:
+    """Test Filter reconfigure()."""
+
+    def test_apply(self):
+        """Only opted in fields are changed and invalid values are rejected leaving the old config."""
+        filter = Tagger(FilterConfig(tag='a', log_path=False))
+        filter.setup(filter.config)
+
+        assert filter.apply_reconfigure({'tag': 'b'})
+        assert (filter.tag, filter.config.tag) == ('b', 'b')
+        assert not filter.apply_reconfigure({'tag': 1})
+        assert not filter.apply_reconfigure({'sources': 'tcp://localhost'})
+        assert (filter.tag, filter.config.tag) == ('b', 'b')
+
+    def test_oob(self, tmp_path):
+        """A running filter picks up an out-of-band reconfigure sent to its output without interrupting the stream."""
+        qin  = mp.Queue()
+        qout = FiltersToQueue.Queue()
+
+        with RunnerContext([
+            (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin)),
+            (Tagger, dict(sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b', tag='old')),
+            (FiltersToQueue, dict(sources=f'ipc://{tmp_path}/b', queue=qout.child_queue)),
+        ], [qout], mode='thread'):
+            qin.put({'main': Frame({'i': 0})})
+
+            assert qout.get(timeout=30)['main'].data == {'i': 0, 'tag': 'old'}
+
+            sent = []
+            (thread := Thread(target=lambda: sent.append(Filter.send_reconfigure(f'ipc://{tmp_path}/b',
+                {'tag': 'new'})))).start()
+
+            for i in range(1, 1000):
+                qin.put({'main': Frame({'i': i})})
+
+                if (data := qout.get(timeout=30)['main'].data)['tag'] == 'new':
+                    break
+
+                assert data == {'i': i, 'tag': 'old'}
+
+            thread.join()
+
+            assert sent == [True]
+            assert data['tag'] == 'new'
@@ -0,0 +1,199 @@
+"""
+Unit tests for Runner modes.
+
+Test ID: TC-UNIT-014
+Description: Tests that filters run and exit cleanly as threads or forkserver processes and are restarted according
+    to restart policy and health checks (a stuck process(), not an idle filter), with the restart count reset after a
+    filter stays up
+Priority: Medium
+"""
+import multiprocessing as mp
+from time import sleep
+
+import pytest
+
+from openfilter.filter_runtime import Filter, Frame
+from openfilter.filter_runtime import filter as filter_module
+from openfilter.filter_runtime.test import QueueToFilters, FiltersToQueue, RunnerContext
+
+
+class Tag(Filter):
+    def process(self, frames):
+        return {t: Frame({**f.data, 'tagged': True}) for t, f in frames.items()}
+
+
+class Flaky(Filter):
+    runs = 0
+
+    def setup(self, config):
+        Flaky.runs += 1
+
+    def process(self, frames):
+        if Flaky.runs == 1:
+            raise RuntimeError('flaked')
+
+        return {t: Frame({**f.data, 'run': Flaky.runs}) for t, f in frames.items()}
+
+
+class Crashy(Filter):
+    def process(self, frames):
+        if frames['main'].data.get('crash'):
+            raise RuntimeError('crashed')
+
+        return frames
+
+
+class Idle(Filter):
+    def process(self, frames):
+        sleep(0.01)
+
+
+class Stuck(Filter):
+    def process(self, frames):
+        sleep(0.5)
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestRunnerMode:
+    """Test Runner `mode` option."""
+
+    def test_thread_run_and_exit(self, tmp_path):
+        """Frames pass through the threaded chain and everything exits cleanly on propagated exit."""
+        qin  = mp.Queue()
+        qout = FiltersToQueue.Queue()
+
+        for i in range(5):
+            qin.put({'main': Frame({'i': i})})
+
+        qin.put(False)
+
+        with RunnerContext([
+            (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin)),
+            (Tag, dict(sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b')),
+            (FiltersToQueue, dict(sources=f'ipc://{tmp_path}/b', queue=qout.child_queue)),
+        ], [qout], mode='thread') as runner:
+            assert [qout.get(timeout=30)['main'].data for _ in range(5)] == [{'i': i, 'tagged': True} for i in range(5)]
+
+            while not (retcodes := runner.step(0.05)):
+                pass
+
+        assert retcodes == [0, 0, 0]
+        assert all(isinstance(proc, Filter.Runner.Thread) for proc in runner.procs)
+
+    def test_forkserver_exit(self, tmp_path):
+        """Filter started from the forkserver runs and exits cleanly."""
+        (qin := mp.get_context('forkserver').Queue()).put(False)
+
+        with RunnerContext([(QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin))], [], mode='forkserver') \
+                as runner:
+            while not (retcodes := runner.step(0.05)):
+                pass
+
+        assert retcodes == [0]
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            Filter.Runner([(Tag, dict(sources='tcp://localhost'))], mode='fiber', start=False)
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestRunnerRestart:
+    """Test Runner `restart` and `health_timeout` options."""
+
+    def setup_method(self):
+        Flaky.runs = 0
+
+    def test_restart_on_error(self, tmp_path, monkeypatch):
+        """An erroring filter is restarted alone and the pipeline keeps going."""
+        monkeypatch.setattr(filter_module, 'RUNNER_RESTART_BACKOFF', 0.01)
+
+        qin  = mp.Queue()
+        qout = FiltersToQueue.Queue()
+
+        with RunnerContext([
+            (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin)),
+            (Flaky, dict(sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b')),
+            (FiltersToQueue, dict(sources=f'ipc://{tmp_path}/b', queue=qout.child_queue)),
+        ], [qout], mode='thread', restart=['never', 'on-error', 'never']) as runner:
+            qin.put({'main': Frame({'i': 0})})
+
+            while not runner.nrestarts[1]:
+                assert not runner.step(0.05)
+
+            qin.put({'main': Frame({'i': 1})})
+
+            assert qout.get(timeout=30)['main'].data == {'i': 1, 'run': 2}
+
+            qin.put(False)
+
+            while not (retcodes := runner.step(0.05)):
+                pass
+
+        assert retcodes == [0, 0, 0]
+        assert runner.nrestarts == [0, 1, 0]
+
+    def test_restart_count_reset(self, tmp_path, monkeypatch):
+        """A filter which stays up long enough gets its restarts back, so max_restarts is not a lifetime cap."""
+        monkeypatch.setattr(filter_module, 'RUNNER_RESTART_BACKOFF', 0.01)
+        monkeypatch.setattr(filter_module, 'RUNNER_RESTART_RESET', 0.2)
+
+        qin  = mp.Queue()
+        qout = FiltersToQueue.Queue()
+
+        with RunnerContext([
+            (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin)),
+            (Crashy, dict(sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b')),
+            (FiltersToQueue, dict(sources=f'ipc://{tmp_path}/b', queue=qout.child_queue)),
+        ], [qout], mode='thread', restart=['never', 'on-error', 'never'], max_restarts=1) as runner:
+            for _ in range(2):  # second crash would be one too many without the reset
+                qin.put({'main': Frame({'crash': True})})
+
+                while not runner.restarted_ts[1]:
+                    assert not runner.step(0.05)
+
+                while runner.nrestarts[1]:
+                    assert not runner.step(0.05)
+
+            qin.put({'main': Frame({'i': 1})})
+
+            assert qout.get(timeout=30)['main'].data == {'i': 1}
+
+            qin.put(False)
+
+            while not (retcodes := runner.step(0.05)):
+                pass
+
+        assert retcodes == [0, 0, 0]
+
+    def test_health_restart(self, monkeypatch):
+        """A filter stuck in process() is stopped and restarted until it runs out of restarts."""
+        monkeypatch.setattr(filter_module, 'RUNNER_RESTART_BACKOFF', 0.01)
+
+        with RunnerContext([(Stuck, {})], [], mode='thread', restart='on-error', max_restarts=1,
+                health_timeout=0.2) as runner:
+            while not runner.step(0.05):
+                pass
+
+        assert runner.nrestarts == [1]
+
+    def test_health_idle(self, tmp_path):
+        """A filter waiting on a source which sends nothing is idle, not unhealthy."""
+        with RunnerContext([
+            (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=mp.Queue())),
+            (Tag, dict(sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b')),
+            (Tag, dict(sources=f'ipc://{tmp_path}/b', outputs=f'ipc://{tmp_path}/c', pipeline=True)),
+        ], [], mode='thread', restart='on-error', health_timeout=0.3) as runner:
+            for _ in range(20):
+                assert not runner.step(0.05)
+
+            assert runner.nrestarts == [0, 0, 0] and runner.unhealthy_ts == [None, None, None]
+            assert all(h is not None and h < 0.3 for h in runner.health())
+
+    def test_invalid_restart(self):
+        with pytest.raises(ValueError):
+            Filter.Runner([(Idle, {})], restart='sometimes', start=False)
+
+        with pytest.raises(ValueError):
+            Filter.Runner([(Idle, {})], restart=['never', 'always'], start=False)
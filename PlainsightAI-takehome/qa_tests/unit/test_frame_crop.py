@@ -0,0 +1,65 @@
+"""
+Unit tests for Frame crops and crop references over the message queue.
+
+Test ID: TC-UNIT-010
+Description: Tests view-backed Frame crops and sending them as references into the parent image
+Priority: Medium
+"""
+import pytest
+import numpy as np
+
+from openfilter.filter_runtime.frame import Frame
+from openfilter.filter_runtime.mq import MQ
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestFrameCrop:
+    """Test Frame.crop() and crop passing in MQ.frames2topicmsgs() / topicmsgs2frames()."""
+
+    def setup_method(self):
+        self.image = np.random.RandomState(0).randint(0, 256, (48, 64, 3), np.uint8)
+
+    def test_crop_is_view(self):
+        """Crop shares memory with parent and records parent and offset, crop of crop goes to the root."""
+        frame = Frame(self.image, {}, 'BGR')
+        crop  = frame.crop(10, 5, 20, 10, {'cls': 'a'})
+        crop2 = crop.crop(2, 3, 4, 4)
+
+        assert np.shares_memory(crop.image, frame.image)
+        assert (crop.width, crop.height, crop.format, crop.data) == (20, 10, 'BGR', {'cls': 'a'})
+        assert crop.parent is frame and crop.offset == (10, 5)
+        assert crop2.parent is frame and crop2.offset == (12, 8)
+        assert Frame(crop, {}).parent is frame
+        assert crop.rgb.parent is None and frame.parent is None
+
+    def test_crop_clipped(self):
+        """Crops are clipped to the image and empty crops rejected."""
+        crop = Frame(self.image, {}, 'BGR').crop(-5, 40, 20, 20)
+
+        assert (crop.offset, crop.width, crop.height) == ((0, 40), 15, 8)
+
+        with pytest.raises(ValueError):
+            Frame(self.image, {}, 'BGR').crop(64, 0, 10, 10)
+
+    def test_crop_refs(self):
+        """Crops sent with their parent go as references and are reconstructed as crops on receive."""
+        frame     = Frame(self.image, {}, 'BGR')
+        frames    = {'main': frame, 'c0': frame.crop(1, 2, 8, 6, {'i': 0}), 'c1': frame.crop(30, 20, 10, 10)}
+        topicmsgs = MQ.frames2topicmsgs(frames, False, True)
+        recvd     = MQ.topicmsgs2frames(topicmsgs)
+
+        assert topicmsgs['c0'][0]['img'][3] == 'ref'
+        assert topicmsgs['c0'][0]['ref'][0] == topicmsgs['main'][0]['rid']
+        assert recvd['c0'].parent is recvd['main'] and recvd['c0'].data == {'i': 0}
+        assert np.array_equal(recvd['c0'].image, self.image[2:8, 1:9])
+        assert np.array_equal(recvd['c1'].image, self.image[20:30, 30:40])
+
+    def test_crop_no_refs(self):
+        """Crops without parent on the message or with refs off are sent as normal images."""
+        frame = Frame(self.image, {}, 'BGR')
+        crop  = frame.crop(1, 2, 8, 6)
+
+        assert MQ.frames2topicmsgs({'main': frame, 'c0': crop}, False)['c0'][0]['img'][3] == 'raw'
+        assert MQ.frames2topicmsgs({'c0': crop}, False, True)['c0'][0]['img'][3] == 'raw'
+        assert np.array_equal(MQ.topicmsgs2frames(MQ.frames2topicmsgs({'c0': crop}, True))['c0'].shape, (6, 8, 3))
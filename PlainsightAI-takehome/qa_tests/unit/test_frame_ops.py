@@ -0,0 +1,81 @@
+"""
+Unit tests for fused frame operations.
+
+Test ID: TC-UNIT-008
+Description: Tests that compiled FrameOps chains match the equivalent step by step cv2 calls
+Priority: High
+"""
+import pytest
+import cv2
+import numpy as np
+
+from openfilter.filter_runtime.frame import Frame
+from openfilter.filter_runtime.frame_ops import FrameOps, fit_size
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestFrameOps:
+    """Test FrameOps compilation and execution."""
+
+    def setup_method(self):
+        self.image = np.random.RandomState(0).randint(0, 256, (48, 64, 3), np.uint8)
+
+    def test_crop_moved_before_flip(self):
+        """Crop after flip is resolved to a mirrored crop view in front of the flip."""
+        ops      = FrameOps([('flip', 1), ('crop', 10, 5, 20, 10)])
+        prims, _ = ops.resolve(self.image.shape, 'BGR')
+        out, fmt = ops(self.image, 'BGR')
+
+        assert prims[0] == ('crop', 34, 5, 54, 15)
+        assert fmt == 'BGR'
+        assert np.array_equal(out, cv2.flip(self.image, 1)[5:15, 10:30])
+
+    def test_flips_cancel(self):
+        """Two identical flips resolve to nothing and return the input itself."""
+        ops = FrameOps([('flip', 0), ('flip', 0)])
+
+        assert ops.resolve(self.image.shape, 'BGR')[0] == []
+        assert ops(self.image, 'BGR')[0] is self.image
+
+    def test_resize_and_format(self):
+        """Downscale then color convert matches cv2 and reuses intermediate buffers across calls."""
+        ops  = FrameOps([('format', 'RGB'), ('resize', 32, 24, 'lin')])
+        ref  = cv2.resize(cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB), (32, 24), interpolation=cv2.INTER_LINEAR)
+        out1 = ops(self.image, 'BGR')
+        out2 = ops(self.image, 'BGR')
+
+        assert out1[1] == 'RGB'
+        assert np.array_equal(out1[0], ref)
+        assert np.array_equal(out2[0], ref)
+        assert out1[0] is not out2[0]  # final output is never a reused buffer
+
+    def test_gray_and_rotate(self):
+        """Grayscale conversion and rotation produce the right shape and format."""
+        out, fmt = FrameOps([('format', 'GRAY'), ('rotate', cv2.ROTATE_90_CLOCKWISE)])(self.image, 'BGR')
+
+        assert fmt == 'GRAY'
+        assert np.array_equal(out, cv2.rotate(cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY), cv2.ROTATE_90_CLOCKWISE))
+
+    def test_apply_frame(self):
+        """apply() keeps frame data and returns the same Frame when nothing needs to be done."""
+        frame = Frame(self.image, {'a': 1}, 'BGR')
+        new   = FrameOps([('maxsize', 32, 32)]).apply(frame)
+
+        assert FrameOps([('format', 'BGR')]).apply(frame) is frame
+        assert (new.width, new.height, new.data) == (32, 24, {'a': 1})
+
+    def test_fit_size(self):
+        """Size computations for maxsize / minsize / resize."""
+        assert fit_size(640, 480, 320, 320, 'maxsize') == (320, 240)
+        assert fit_size(640, 480, 320, 320, 'maxsize', False) == (320, 320)
+        assert fit_size(320, 240, 640, 640, 'minsize') == (853, 640)
+        assert fit_size(640, 480, 100, 100, 'resize', False) == (100, 100)
+
+    def test_invalid_op(self):
+        """Unknown ops and formats are rejected."""
+        with pytest.raises(ValueError):
+            FrameOps([('blur', 3)])
+
+        with pytest.raises(ValueError):
+            FrameOps([('format', 'YUV')])
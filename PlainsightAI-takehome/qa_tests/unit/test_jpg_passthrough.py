@@ -0,0 +1,193 @@
+"""
+Unit tests for jpg passthrough of unmodified writable frames, same-as-previous dedup and parallel jpg encoding.
+
+Test ID: TC-UNIT-011
+Description: Tests that unmodified rw copies of jpg frames reuse the original jpg and identical images are deduplicated,
+    and that parallel / prefetched encoding gives the same messages as serial encoding with one shared thread pool
+Priority: Medium
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Barrier, Event, Thread
+from time import sleep, time
+
+import pytest
+import cv2
+import numpy as np
+
+from openfilter.filter_runtime.filter import Filter, FilterConfig
+from openfilter.filter_runtime.frame import Frame
+from openfilter.filter_runtime import mq as mq_module
+from openfilter.filter_runtime.mq import MQ
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestJpgPassthrough:
+    """Test Frame jpg passthrough and MQ dedup."""
+
+    def setup_method(self):
+        self.image = np.random.RandomState(0).randint(0, 256, (48, 64, 3), np.uint8)
+        self.jpg   = cv2.imencode('.jpg', self.image)[1].tobytes()
+
+    def test_rw_unmodified_passthrough(self):
+        """rw copy of a jpg frame returns the original jpg until modified."""
+        frame = Frame.from_jpg(self.jpg, {}, 48, 64, 'BGR')
+        rw    = frame.rw
+
+        assert rw.is_rw and not rw.has_jpg
+        assert rw.jpg is self.jpg
+        assert rw.rw_bgr.jpg is self.jpg
+        assert Frame(rw, {'a': 1}).jpg is self.jpg
+
+        rw.image[0, 0] = ~rw.image[0, 0]
+
+        assert rw.jpg is not self.jpg
+        assert frame.rw_rgb.jpg is not self.jpg  # converted, different image
+
+    def test_dedup(self):
+        """Identical consecutive images go out as a 'same' marker and are rebuilt from the previous Frame."""
+        send_prev, recv_prev = {}, {}
+        msgs1  = MQ.frames2topicmsgs({'main': Frame(self.image, {}, 'BGR')}, False, prev=send_prev)
+        msgs2  = MQ.frames2topicmsgs({'main': Frame(self.image.copy(), {'n': 2}, 'BGR')}, False, prev=send_prev)
+        msgs3  = MQ.frames2topicmsgs({'main': Frame(self.image[::-1].copy(), {}, 'BGR')}, False, prev=send_prev)
+        frame1 = MQ.topicmsgs2frames(msgs1, recv_prev)['main']
+        frame2 = MQ.topicmsgs2frames(msgs2, recv_prev)['main']
+
+        assert msgs1['main'][0]['img'][3] == 'raw'
+        assert msgs2['main'][0]['img'][3] == 'same'
+        assert msgs3['main'][0]['img'][3] == 'raw'
+        assert frame2.data == {'n': 2} and frame2.image is frame1.image
+
+        with pytest.raises(MQ.MissingPrevImage):  # never an imageless Frame on an image topic
+            MQ.topicmsgs2frames(msgs2, {})
+
+    def test_dedup_refresh(self, monkeypatch):
+        """A full image goes out again after OUTPUTS_DEDUP_REFRESH 'same' markers in a row."""
+        monkeypatch.setattr(mq_module, 'OUTPUTS_DEDUP_REFRESH', 2)
+
+        prev  = {}
+        frame = Frame(self.image, {}, 'BGR')
+        encs  = [MQ.frames2topicmsgs({'main': frame}, False, prev=prev)['main'][0]['img'][3] for _ in range(7)]
+
+        assert encs == ['raw', 'same', 'same', 'raw', 'same', 'same', 'raw']
+
+    def test_dedup_resync_new_receiver(self, tmp_path, monkeypatch):
+        """A receiver which connects during a static scene gets a full image first, then markers."""
+        monkeypatch.setattr(mq_module, 'OUTPUTS_DEDUP_REFRESH', 0)  # only the resync on connect
+
+        addr   = f'ipc://{tmp_path}/dedup'
+        sender = MQ(None, addr, outs_jpg=False, outs_dedup=True, outs_metrics=False)
+        stop   = Event()
+        frame  = Frame(self.image, {}, 'BGR')
+        thread = Thread(target=lambda: [sender.send({'main': frame}, 50) for _ in iter(stop.is_set, True)])
+        recvs  = [MQ(addr, None, 'a')]
+
+        thread.start()
+
+        try:
+            def recv_all():
+                got   = [None] * len(recvs)
+                end_t = time() + 10
+
+                while not all(got):
+                    assert time() < end_t, 'receiver never got a full image'
+
+                    for i, recv in enumerate(recvs):
+                        if not got[i] and (frames := recv.recv(50)) is not None:
+                            got[i] = frames
+
+                return got
+
+            first = [recv_all()[0] for _ in range(3)]
+
+            recvs.append(MQ(addr, None, 'b'))
+
+            later = [recv_all() for _ in range(3)]
+
+        finally:
+            stop.set()
+            thread.join()
+
+            for mq in [sender, *recvs]:
+                mq.destroy()
+
+        assert all(frames['main'].has_image for frames in first)
+        assert all(frames['main'].has_image for got in later for frames in got)
+        assert np.array_equal(later[0][1]['main'].image, self.image)
+
+    def test_fingerprint(self):
+        """Fingerprint is a 128 bit digest of the pixels, independent of memory layout."""
+        changed       = self.image.copy()
+        changed[0, 0] = ~changed[0, 0]
+
+        assert len(Frame.fingerprint(self.image)) == 16
+        assert Frame.fingerprint(self.image) == Frame.fingerprint(np.asfortranarray(self.image))
+        assert Frame.fingerprint(self.image) != Frame.fingerprint(changed)
+
+    def test_dedup_not_balanced(self):
+        """Dedup is rejected with balanced outputs, where receivers don't see every message."""
+        with pytest.raises(ValueError):
+            MQ(None, 'tcp://*:5993', outs_balance=True, outs_dedup=True)
+        with pytest.raises(ValueError):
+            Filter.normalize_config(FilterConfig(outputs='tcp://*', outputs_balance=True, outputs_dedup=True))
+
+    def test_dedup_forgets_missing_topics(self):
+        """A topic not sent in a message is sent in full the next time."""
+        prev  = {}
+        frame = Frame(self.image, {}, 'BGR')
+
+        MQ.frames2topicmsgs({'a': frame, 'b': frame}, False, prev=prev)
+        MQ.frames2topicmsgs({'a': frame}, False, prev=prev)
+
+        assert MQ.frames2topicmsgs({'a': frame, 'b': frame}, False, prev=prev)['b'][0]['img'][3] == 'raw'
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestJpgParallelEncode:
+    """Test parallel and prefetched jpg encoding in MQ."""
+
+    def setup_method(self):
+        self.image = np.random.RandomState(0).randint(0, 256, (48, 64, 3), np.uint8)
+
+    def test_parallel_encode(self):
+        """Multiple topics are encoded, the same Frame on two topics only once, results match serial encode."""
+        frames    = {f't{i}': Frame(self.image[:, ::-1].copy() if i else self.image, {}, 'BGR') for i in range(4)}
+        frames['dup'] = frames['t0']
+        topicmsgs = MQ.frames2topicmsgs(frames, True)
+
+        for topic, frame in frames.items():
+            assert topicmsgs[topic][0]['img'][3] == 'jpg'
+            assert topicmsgs[topic][1] == frame.jpg
+
+    def test_prefetched(self):
+        """Encodes started by prefetch are used instead of encoding again."""
+        frame  = Frame(self.image, {}, 'BGR')
+        future = Future()
+
+        future.set_result(b'prefetched')
+
+        assert MQ.frames2topicmsgs({'main': frame}, True, jpgs={id(frame): (frame, future)})['main'][1] == b'prefetched'
+
+    def test_executor_created_once(self, monkeypatch):
+        """Threads asking for the shared encode pool at the same time all get the same one."""
+        def slow_executor(*args, **kwargs):
+            sleep(0.05)
+
+            return ThreadPoolExecutor(*args, **kwargs)
+
+        monkeypatch.setattr(mq_module.jpg_executor, 'executor', None, raising=False)  # restored after
+        monkeypatch.setattr(mq_module, 'ThreadPoolExecutor', slow_executor)
+
+        barrier   = Barrier(4)
+        executors = []
+        threads   = [Thread(target=lambda: (barrier.wait(), executors.append(mq_module.jpg_executor()))) for _ in range(4)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(executors) == 4 and len(set(map(id, executors))) == 1
+
+        executors[0].shutdown()
@@ -0,0 +1,80 @@
+"""
+Unit tests for the end-to-end latency controller.
+
+Test ID: TC-UNIT-018
+Description: Tests that source throttling follows downstream latency against a target, and the VideoIn config for it
+Priority: Medium
+"""
+import time
+
+import pytest
+
+from openfilter.filter_runtime.filters.video_in import VideoIn
+from openfilter.filter_runtime.latency import LatencyController
+from openfilter.filter_runtime.mq import MQSender
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestLatencyController:
+    """Test LatencyController rate decisions."""
+
+    def test_throttle_and_release(self):
+        """Over target throttles below achieved fps, under target with headroom ramps back up and releases."""
+        ctl = LatencyController(100, 'tcp://127.0.0.1', 30, hold=1)
+
+        assert ctl.update(50, 30, t=10) is None
+        assert ctl.update(300, 20, t=11) == pytest.approx(16)
+        assert ctl.update(300, 16, t=11.5) == pytest.approx(16)  # held
+        assert ctl.update(300, 16, t=12.5) == pytest.approx(12.8)
+        assert ctl.update(90, 12.8, t=14) == pytest.approx(12.8)  # under target but not enough headroom
+
+        t = 14
+
+        while (maxfps := ctl.update(10, 12.8, t=(t := t + 1))) is not None:
+            assert maxfps < 30
+
+    def test_min_fps(self):
+        """Never throttles below min_fps."""
+        ctl = LatencyController(100, 'tcp://127.0.0.1', min_fps=2, hold=0)
+
+        for t in range(20):
+            ctl.update(1000, 1, t=t)
+
+        assert ctl.maxfps == 2
+
+    def test_listens_to_metrics(self):
+        """Picks up '_metrics' from a dedicated downstream metrics output."""
+        sender = MQSender(None, outs_metrics='tcp://127.0.0.1:5596')
+        ctl    = LatencyController(100, 'tcp://127.0.0.1:5596', 30, hold=0)
+
+        ctl.start()
+
+        try:
+            for _ in range(200):
+                sender.metrics_.lat_in = 0.5
+                sender.send(None)
+
+                if ctl.maxfps is not None:
+                    break
+
+                time.sleep(0.02)
+
+            assert ctl.lat_ms == pytest.approx(500)
+            assert ctl.maxfps is not None
+
+        finally:
+            ctl.stop()
+            sender.destroy()
+
+    def test_video_in_config(self):
+        """target_latency_ms is validated and requires a zeromq latency_metrics address."""
+        config = VideoIn.normalize_config({'sources': 'file://a.mp4', 'outputs': 'tcp://*',
+            'target_latency_ms': 200, 'latency_metrics': 'tcp://localhost:5554'})
+
+        assert config.target_latency_ms == 200
+
+        for bad in ({'target_latency_ms': 0, 'latency_metrics': 'tcp://localhost'}, {'target_latency_ms': 200},
+                {'target_latency_ms': 200, 'latency_metrics': 'file://x'}):
+            with pytest.raises(ValueError):
+                VideoIn.normalize_config({'sources': 'file://a.mp4', 'outputs': 'tcp://*', **bad})
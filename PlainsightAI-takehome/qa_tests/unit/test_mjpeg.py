@@ -0,0 +1,110 @@
+"""
+Unit tests for MJPEG sources emitting jpg frames without decoding.
+
+Test ID: TC-UNIT-022
+Description: Tests jpg header parsing and that MJPEG files and HTTP multipart streams give jpg-only Frames with the
+    original jpgs
+Priority: Medium
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import cv2
+import numpy as np
+import pytest
+
+from openfilter.filter_runtime.filters.video_in import VideoReader, jpg_header
+
+
+def jpg(value, shape=(48, 64, 3)):
+    return cv2.imencode('.jpg', np.full(shape, value, np.uint8))[1].tobytes()
+
+
+@pytest.fixture
+def mjpeg_file(tmp_path):
+    fnm    = str(tmp_path / 'video.avi')
+    writer = cv2.VideoWriter(fnm, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 20, np.uint8))
+
+    writer.release()
+
+    return f'file://{fnm}'
+
+
+@pytest.fixture
+def mjpeg_http():
+    jpgs = [jpg(i * 20) for i in range(5)]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=frame')
+            self.end_headers()
+
+            for i, data in enumerate(jpgs):  # every other part without Content-Length, split across writes
+                length = f'Content-Length: {len(data)}\r\n' if i % 2 else ''
+                part   = f'--frame\r\nContent-Type: image/jpeg\r\n{length}\r\n'.encode() + data + b'\r\n'
+
+                self.wfile.write(part[:len(part) // 2])
+                self.wfile.flush()
+                self.wfile.write(part[len(part) // 2:])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f'http://127.0.0.1:{server.server_address[1]}/video.mjpg', jpgs
+
+    server.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestMJPEG:
+    """Test MJPEG source mode."""
+
+    def test_jpg_header(self):
+        """Dimensions and channels come from the frame header, incomplete data gives None."""
+        color, gray = jpg(0), jpg(0, (20, 30))
+
+        assert jpg_header(color)[:3] == (48, 64, 3)
+        assert jpg_header(b'xx' + gray, 2)[:3] == (20, 30, 1)
+        assert jpg_header(color[:20]) is None
+
+        with pytest.raises(ValueError):
+            jpg_header(b'not a jpg')
+
+    def test_mjpeg_file(self, mjpeg_file):
+        """MJPEG file frames come out as the jpgs stored in the file, not decoded."""
+        reader = VideoReader(mjpeg_file, mjpeg=True, sync=True)
+        reader.start()
+
+        frames = list(reader)
+
+        assert len(frames) == 10
+        assert all(frame.has_jpg and not frame.has_raw for frame in frames)
+        assert frames[0].shape == (48, 64, 3) and frames[0].format == 'BGR'
+        assert abs(int(frames[-1].image.mean()) - 9 * 20) <= 4
+
+    def test_mjpeg_http(self, mjpeg_http):
+        """HTTP multipart parts are split into the original jpgs."""
+        url, jpgs = mjpeg_http
+        reader    = VideoReader(url, mjpeg=True)
+
+        reader.stream.start()
+
+        assert [reader.stream.read() for _ in range(5)] == jpgs
+        assert reader.stream.read() is None
+
+        reader.stream.stop()
+
+    def test_mjpeg_validation(self, mjpeg_file):
+        with pytest.raises(ValueError):
+            VideoReader(mjpeg_file, mjpeg=True, maxsize='32x24')
+        with pytest.raises(ValueError):
+            VideoReader(mjpeg_file, mjpeg=True, decoder='vidgear')
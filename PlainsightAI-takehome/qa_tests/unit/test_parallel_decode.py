@@ -0,0 +1,112 @@
+"""
+Unit tests for parallel keyframe-aligned segment decoding of sync video files.
+
+Test ID: TC-UNIT-025
+Description: Tests that a sync file decoded in several worker processes gives the same frames as sequential decoding,
+    in file order or unordered with the original frame index, that decoding ahead is bounded, that a worker which
+    can't open the file ends the video and validation of the parallel options
+Priority: Medium
+"""
+import os
+from time import sleep
+
+import cv2
+import numpy as np
+import pytest
+
+from openfilter.filter_runtime.filters.video_in import SEGMENT_MIN, SEGMENT_QUEUE, VideoIn, VideoReader
+
+
+@pytest.fixture
+def video(tmp_path):
+    fnm    = str(tmp_path / 'video.mp4')
+    writer = cv2.VideoWriter(fnm, cv2.VideoWriter_fourcc(*'mp4v'), 30, (64, 48))
+
+    for i in range(SEGMENT_MIN * 4):
+        writer.write(np.full((48, 64, 3), i * 2, np.uint8))
+
+    writer.release()
+
+    return f'file://{fnm}'
+
+
+def read_all(reader):
+    reader.start()
+
+    try:
+        images = []
+
+        while (image := reader.read()) is not None:
+            images.append((reader.index, image))
+
+    finally:
+        reader.stop()
+
+    return images
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestParallelDecode:
+    """Test VideoReader parallel decode."""
+
+    def test_ordered(self, video):
+        """Frames come out in file order and identical to sequential decode, workers apply maxsize and RGB."""
+        images   = read_all(VideoReader(video, sync=True, parallel=3, maxsize='32x24', bgr=False))
+        expected = read_all(VideoReader(video, sync=True, decoder='opencv', maxsize='32x24', bgr=False))
+
+        assert len(images) == SEGMENT_MIN * 4
+        assert [idx for idx, _ in images] == list(range(SEGMENT_MIN * 4))
+        assert all(np.array_equal(image, exp) for (_, image), (_, exp) in zip(images, expected))
+        assert images[0][1].shape == (24, 32, 3)
+
+    def test_unordered(self, video):
+        """Every frame comes out once with its original index in the file."""
+        images = read_all(VideoReader(video, sync=True, parallel=3, ordered=False))
+
+        assert sorted(idx for idx, _ in images) == list(range(SEGMENT_MIN * 4))
+        assert all(abs(int(image.mean()) - idx * 2) <= 4 for idx, image in images)
+
+    def test_bounded(self, video):
+        """Workers decode at most SEGMENT_QUEUE frames ahead while nothing is read."""
+        reader = VideoReader(video, sync=True, parallel=1)
+        reader.start()
+
+        try:
+            sleep(1)
+
+            queued = reader.stream.queues[0].qsize()
+
+            assert reader.read() is not None
+
+        finally:
+            reader.stop()
+
+        assert SEGMENT_QUEUE // 2 <= queued <= SEGMENT_QUEUE + 1
+
+    def test_worker_fails(self, video):
+        """A worker which can't open the file ends the video instead of hanging."""
+        reader = VideoReader(video, sync=True, parallel=2)
+
+        os.remove(video[7:])  # after the keyframe scan, before the workers open it
+        reader.start()
+
+        try:
+            assert reader.read() is None
+
+        finally:
+            reader.stop()
+
+    def test_parallel_validation(self, video):
+        with pytest.raises(ValueError):
+            VideoReader(video, parallel=2)  # not sync
+        with pytest.raises(ValueError):
+            VideoReader(video, sync=True, loop=True, parallel=2)
+        with pytest.raises(ValueError):
+            VideoReader(video, sync=True, parallel=2, decoder='ffmpeg')
+        with pytest.raises(ValueError):
+            VideoReader(video, sync=True, parallel=0)
+
+        config = VideoIn.normalize_config({'sources': f'{video}!parallel=4!no-ordered', 'outputs': 'tcp://*'})
+
+        assert config.sources[0].options == {'parallel': 4, 'ordered': False}
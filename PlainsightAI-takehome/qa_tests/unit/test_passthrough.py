@@ -0,0 +1,101 @@
+"""
+Unit tests for compressed video packet passthrough from VideoIn to VideoOut.
+
+Test ID: TC-UNIT-021
+Description: Tests that packet Frames survive serialization, that VideoReader passthrough reads packets without decoding
+    and that VideoWriter passthrough muxes them into a playable file without reencoding
+Priority: Medium
+"""
+import pickle
+
+import cv2
+import numpy as np
+import pytest
+
+from openfilter.filter_runtime.filters.video_in import VideoIn, VideoReader
+from openfilter.filter_runtime.filters.video_out import VideoOut, VideoWriter
+from openfilter.filter_runtime.frame import Frame, Packet
+from openfilter.filter_runtime.mq import MQ
+
+
+@pytest.fixture
+def video(tmp_path):
+    fnm    = str(tmp_path / 'video.mp4')
+    writer = cv2.VideoWriter(fnm, cv2.VideoWriter_fourcc(*'mp4v'), 30, (64, 48))
+
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, np.uint8))
+
+    writer.release()
+
+    return f'file://{fnm}'
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestPassthrough:
+    """Test packet Frames, VideoReader and VideoWriter passthrough."""
+
+    def test_packet_frame_serialization(self):
+        """Packet with extradata and data survives the wire format and pickling."""
+        packet = Packet(b'\0\0\1\xb6abc', 'FMP4', True, 64, 48, 30.0, b'\0\0\1\xb0xyz')
+        frame  = Frame.from_packet(packet, {'meta': {'id': 1}})
+        msgs   = MQ.frames2topicmsgs({'main': frame, 'other': Frame.from_packet(packet._replace(extra=None, key=False))})
+        frames = MQ.topicmsgs2frames(msgs)
+
+        assert not frame.has_image and Frame(frame, {}).packet == packet
+        assert msgs['main'][0] == {'pkt': ['FMP4', True, 64, 48, 30.0, 7]}
+        assert frames['main'] == frame and frames['main'].packet == packet
+        assert frames['other'].packet.extra is None and frames['other'].data == {}
+        assert pickle.loads(pickle.dumps(frame)).packet == packet
+        assert repr(frame) == 'Frame(FMP4:64x48+key)'
+
+    def test_reader_passthrough(self, video):
+        """Passthrough reader returns compressed packets, not images."""
+        reader = VideoReader(video, passthrough=True, sync=True)
+        reader.start()
+
+        packets = list(reader)
+
+        assert len(packets) == 30
+        assert all(isinstance(p, Packet) for p in packets)
+        assert packets[0].key and packets[0].extra and (packets[0].width, packets[0].height) == (64, 48)
+        assert sum(len(p.data) for p in packets) < 64 * 48 * 3
+
+    def test_passthrough_validation(self, video):
+        """Options which would need to drop or modify single frames are rejected."""
+        with pytest.raises(ValueError):
+            VideoReader(video, passthrough=True, decoder='ffmpeg')
+        with pytest.raises(ValueError):
+            VideoReader(video, passthrough=True, maxsize='32x24')
+        with pytest.raises(ValueError):
+            VideoReader(video, passthrough=True, step=2)
+        with pytest.raises(ValueError):
+            VideoWriter('rtsp://localhost:8554/a', passthrough=True)
+
+        assert VideoIn.normalize_config({'sources': f'{video}!passthrough', 'outputs': 'tcp://*'}) \
+            .sources[0].options.passthrough is True
+        assert VideoOut.normalize_config({'sources': 'tcp://localhost', 'outputs': 'file://a.mp4!passthrough'}) \
+            .outputs[0].options == {'passthrough': True}
+
+    def test_writer_passthrough(self, video, tmp_path):
+        """Packets muxed without reencode decode back to the original frames, starting at a keyframe."""
+        reader = VideoReader(video, passthrough=True, sync=True)
+        writer = VideoWriter(f'file://{tmp_path / "out.mp4"}', fps=None, passthrough=True)
+
+        reader.start()
+
+        for packet in reader:
+            writer.write(packet)
+
+        writer.stop()
+
+        cap    = cv2.VideoCapture(str(tmp_path / 'out.mp4'))
+        images = []
+
+        while (res := cap.read())[0]:
+            images.append(res[1])
+
+        assert cap.get(cv2.CAP_PROP_FPS) == 30
+        assert len(images) == 30
+        assert abs(int(images[-1].mean()) - 29 * 8) <= 4
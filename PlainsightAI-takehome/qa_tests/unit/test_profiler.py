@@ -0,0 +1,154 @@
+"""
+Unit tests for timing histograms and the sampling profiler.
+
+Test ID: TC-UNIT-019
+Description: Tests recv / process / send timing percentiles, also with process() in worker processes, and on-demand
+    collapsed stack profiles of live filters, started only once when requested concurrently
+Priority: Medium
+"""
+import multiprocessing as mp
+import time
+from threading import Barrier, Thread
+
+import pytest
+
+from openfilter.filter_runtime import Filter, FilterConfig, Frame
+from openfilter.filter_runtime.utils import adict
+from openfilter.filter_runtime.profiler import Timings, SamplingProfiler
+from openfilter.filter_runtime.test import QueueToFilters, FiltersToQueue, RunnerContext
+
+
+class Sleeper(Filter):
+    def process(self, frames):
+        time.sleep(0.002)
+
+        return frames
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestProfiler:
+    """Test Timings and SamplingProfiler."""
+
+    def test_percentiles(self):
+        """Percentiles land in the bucket of the right value, within bucket resolution."""
+        timings = Timings()
+
+        for i in range(100):
+            timings.add('process', 0.001 if i < 90 else 0.1)
+
+        p50, p90, p99 = timings.percentiles('process')
+
+        assert 0.001 <= p50 < 0.0012
+        assert 0.001 <= p90 < 0.0012
+        assert 0.1 <= p99 < 0.12
+        assert timings.percentiles('send') is None
+        assert set(timings.metrics()) == {'process_p50', 'process_p99'}
+
+    def test_window(self):
+        """Old windows roll off."""
+        timings = Timings(window=0.05)
+
+        timings.add('recv', 1)
+        time.sleep(0.06)
+        timings.add('recv', 0.001)
+
+        assert timings.percentiles('recv', (100,))[0] >= 1
+
+        time.sleep(0.11)
+        timings.add('recv', 0.001)
+
+        assert timings.percentiles('recv', (100,))[0] < 0.0012
+
+    def test_sampling_profiler(self, tmp_path):
+        """Collapsed stacks of other threads are written with counts."""
+        def busy(end_t):
+            while time.time() < end_t:
+                pass
+
+        (thread := Thread(target=busy, args=(time.time() + 1,), name='busy')).start()
+
+        fnm = SamplingProfiler(str(tmp_path), 0.001).run(0.2)
+
+        thread.join()
+
+        lines = open(fnm).read().splitlines()
+
+        assert any(line.startswith('busy;') and 'busy (test_profiler.py:' in line for line in lines)
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+    def test_live_filter(self, tmp_path):
+        """A running filter reports timing metrics and profiles on an out-of-band request."""
+        qin  = mp.Queue()
+        qout = FiltersToQueue.Queue()
+
+        with RunnerContext([
+            (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin)),
+            (Sleeper, dict(id='sleeper', sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b',
+                log_path=str(tmp_path / 'logs'))),
+            (FiltersToQueue, dict(sources=f'ipc://{tmp_path}/b;*', queue=qout.child_queue)),
+        ], [qout], mode='thread'):
+            sent = []
+            (thread := Thread(target=lambda: sent.append(Filter.send_profile(f'ipc://{tmp_path}/b', 0.3)))).start()
+
+            for i in range(1000):
+                qin.put({'main': Frame({'i': i})})
+
+                frames = qout.get(timeout=30)
+
+                if sent and i >= 20:
+                    break
+
+            thread.join()
+
+            assert sent == [True]
+            assert frames['_metrics'].data['process_p50'] >= 2
+
+            for _ in range(100):
+                if list((tmp_path / 'logs' / 'sleeper' / 'profile').glob('profile_*.folded')):
+                    break
+
+                time.sleep(0.05)
+
+            else:
+                assert False, 'no profile written'
+
+    def test_process_workers_timed(self, tmp_path):
+        """process() in worker processes is still reported, timed from submit to result."""
+        qin  = mp.Queue()
+        qout = FiltersToQueue.Queue()
+
+        with RunnerContext([
+            (QueueToFilters, dict(outputs=f'ipc://{tmp_path}/a', queue=qin)),
+            (Sleeper, dict(sources=f'ipc://{tmp_path}/a', outputs=f'ipc://{tmp_path}/b', workers=2,
+                workers_mode='process')),
+            (FiltersToQueue, dict(sources=f'ipc://{tmp_path}/b;*', queue=qout.child_queue)),
+        ], [qout]):
+            for i in range(1000):
+                qin.put({'main': Frame({'i': i})})
+
+                if (metrics := qout.get(timeout=30).get('_metrics')) is not None and 'process_p50' in metrics.data:
+                    break
+
+            assert metrics.data['process_p50'] >= 2
+
+    def test_profile_once(self, tmp_path):
+        """Concurrent profile requests start a single profiler."""
+        filter        = Filter.__new__(Filter)
+        filter.config = FilterConfig(id='f')
+        filter.logger = adict(log_path=str(tmp_path))
+        barrier       = Barrier(8)
+        started       = []
+
+        def target():
+            barrier.wait()
+            started.append(filter.profile(0.2))
+
+        for thread in (threads := [Thread(target=target) for _ in range(8)]):
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        filter.profiler.join()
+
+        assert sorted(started) == [False] * 7 + [True]
@@ -0,0 +1,53 @@
+"""
+Unit tests for startup profiling and lazy imports.
+
+Test ID: TC-UNIT-015
+Description: Tests import timing and that heavy modules are only imported when used
+Priority: Low
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import openfilter
+from openfilter.filter_runtime import startup
+from openfilter.filter_runtime.utils import LazyModule
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestStartup:
+    """Test startup profiling helpers."""
+
+    def test_lazy_module(self, monkeypatch):
+        """LazyModule only imports on first attribute access."""
+        monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+
+        colorsys = LazyModule('colorsys')
+
+        assert 'colorsys' not in sys.modules
+        assert colorsys.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+        assert 'colorsys' in sys.modules
+
+    def test_timed_import(self, monkeypatch):
+        """Import hook records self and cumulative time of new imports only."""
+        monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+        monkeypatch.setattr(startup, 'import_times', times := {})
+
+        startup._timed_import('colorsys')
+        startup._timed_import('os')
+
+        assert list(times) == ['colorsys']
+        assert 0 <= times['colorsys'][0] <= times['colorsys'][1]
+
+    def test_no_heavy_imports(self):
+        """Importing the runtime does not pull in modules which are only needed for some filters."""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(openfilter.__file__)))  # the same openfilter as here
+        env  = {**os.environ, 'PYTHONPATH': os.pathsep.join(p for p in (root, os.getenv('PYTHONPATH')) if p)}
+        out  = subprocess.run([sys.executable, '-c', 'import sys, openfilter.filter_runtime.filter; '
+            'print(*(m for m in ("cv2", "requests", "psutil") if m in sys.modules))'],
+            capture_output=True, text=True, check=True, env=env).stdout
+
+        assert out.strip() == ''
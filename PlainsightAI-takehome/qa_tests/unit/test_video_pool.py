@@ -0,0 +1,105 @@
+"""
+Unit tests for VideoPool many-source ingest.
+
+Test ID: TC-UNIT-023
+Description: Tests that a small worker pool reads many sources at their own rate, emits per source without waiting for
+    the others, keeps retrying dead sources with backoff and that VideoIn emits their frames
+Priority: Medium
+"""
+from time import time
+
+import cv2
+import numpy as np
+import pytest
+
+from openfilter.filter_runtime.filters.video_in import VideoIn, VideoPool
+
+
+@pytest.fixture
+def video(tmp_path):
+    fnm    = str(tmp_path / 'video.mp4')
+    writer = cv2.VideoWriter(fnm, cv2.VideoWriter_fourcc(*'mp4v'), 30, (64, 48))
+
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 8, np.uint8))
+
+    writer.release()
+
+    return f'file://{fnm}'
+
+
+def read_for(pool, seconds):
+    counts = {}
+    end_t  = time() + seconds
+
+    while time() < end_t:
+        for idx in pool.read():
+            counts[idx] = counts.get(idx, 0) + 1
+
+    return counts
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestVideoPool:
+    """Test VideoPool."""
+
+    def test_pool_reads_all_at_own_rate(self, video):
+        """Three sources on two workers each come in at about their own frame rate, restarting at end of file."""
+        pool = VideoPool([video] * 3, [{}, {}, {'maxfps': 10, 'maxsize': '32x24'}], workers=2)
+        pool.start()
+
+        try:
+            counts = read_for(pool, 1)
+            image  = pool.read()
+
+        finally:
+            pool.stop()
+
+        assert 15 <= counts[0] <= 40 and 15 <= counts[1] <= 40  # 10 frame file at 30 fps, so looped
+        assert 4 <= counts[2] <= 14
+        assert all(img.shape[:2] in ((48, 64), (24, 32)) for img in image.values())
+        assert pool.read() is None
+
+    def test_dead_source_does_not_stall(self, video, tmp_path):
+        """A source which can't be opened backs off and retries while the others keep going."""
+        pool = VideoPool([video, f'file://{tmp_path / "missing.mp4"}'], workers=1)
+        pool.start()
+
+        try:
+            counts = read_for(pool, 0.5)
+
+        finally:
+            pool.stop()
+
+        assert counts.get(0, 0) >= 5 and 1 not in counts
+        assert pool.videos[1].state == 'backoff' and pool.videos[1].fails >= 1
+
+    def test_videoin_workers(self, video):
+        """VideoIn with workers emits Frames from the pool with their meta."""
+        filter = VideoIn.__new__(VideoIn)
+        filter.setup(VideoIn.normalize_config({'sources': f'{video}, {video};b', 'outputs': 'tcp://*', 'workers': 1}))
+
+        try:
+            end_t  = time() + 2
+            frames = {}
+
+            while time() < end_t and not {'main', 'b'} <= set(frames):
+                frames.update(filter.process({})() or {})
+
+        finally:
+            filter.shutdown()
+
+        assert set(frames) == {'main', 'b', '_metrics'}  # workers always have reconnect metrics
+        assert frames['main'].shape == (48, 64, 3) and frames['b'].data['meta']['src'] == video
+        assert 'src_frame' not in frames['main'].data['meta']
+
+    def test_workers_config(self, video):
+        config = VideoIn.normalize_config({'sources': f'{video}!maxfps=5, {video};b', 'outputs': 'tcp://*', 'workers': 2})
+
+        assert config.workers == 2
+
+        with pytest.raises(ValueError):
+            VideoIn.normalize_config({'sources': f'{video}!sync', 'outputs': 'tcp://*', 'workers': 2})
+        with pytest.raises(ValueError):
+            VideoIn.normalize_config({'sources': video, 'outputs': 'tcp://*', 'workers': 0})
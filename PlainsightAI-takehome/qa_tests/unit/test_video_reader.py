@@ -0,0 +1,210 @@
+"""
+Unit tests for VideoReader decoder backends and options.
+
+Test ID: TC-UNIT-020
+Description: Tests VideoReader decoding through the opencv and ffmpeg backends, ffmpeg / ffprobe command lines for
+    different ffmpeg versions and probe timeout, validation of decoder options, sync prefetch and MultiVideoReader emit
+    policies
+Priority: Medium
+"""
+import json
+import shutil
+import subprocess
+from time import sleep
+
+import cv2
+import numpy as np
+import pytest
+
+from openfilter.filter_runtime.filters import video_in
+from openfilter.filter_runtime.filters.video_in import FFmpegStream, MultiVideoReader, VideoIn, VideoReader, parse_emit, \
+    parse_size
+
+
+@pytest.fixture
+def video(tmp_path):
+    fnm    = str(tmp_path / 'video.mp4')
+    writer = cv2.VideoWriter(fnm, cv2.VideoWriter_fourcc(*'mp4v'), 30, (64, 48))
+
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, np.uint8))
+
+    writer.release()
+
+    return f'file://{fnm}'
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestVideoReader:
+    """Test VideoReader decoders."""
+
+    def test_opencv_decoder(self, video):
+        """Direct cv2 decoder with threads reads all frames of a sync file."""
+        reader = VideoReader(video, decoder='opencv', threads=2, sync=True)
+        reader.start()
+
+        images = list(reader)
+
+        assert reader.fps == 30
+        assert len(images) == 30
+        assert images[0].shape == (48, 64, 3)
+        assert abs(int(images[-1].mean()) - 29 * 8) <= 4
+
+    @pytest.mark.skipif(shutil.which('ffmpeg') is None or shutil.which('ffprobe') is None, reason='no ffmpeg')
+    def test_ffmpeg_decoder(self, video):
+        """ffmpeg subprocess decoder with reduced resolution decode."""
+        reader = VideoReader(video, decoder='ffmpeg', threads=2, lowres=1, sync=True)
+        reader.start()
+
+        images = list(reader)
+
+        assert len(images) == 30
+        assert images[0].shape == (24, 32, 3)
+
+    def test_ffmpeg_scale_and_format(self, monkeypatch):
+        """ffmpeg is asked for the final size and pixel format directly."""
+        monkeypatch.setattr(FFmpegStream, 'probe', staticmethod(lambda source, timeout=None: {'width': 3840, 'height': 2160,
+            'pix_fmt': 'yuv420p', 'avg_frame_rate': '30000/1001'}))
+
+        stream = FFmpegStream('rtsp://cam', step=2, size=parse_size('1280x720lin'), rgb=True)
+        cmd    = ' '.join(stream.cmd)
+
+        assert stream.shape == (720, 1280, 3)
+        assert stream.framerate == pytest.approx(30000 / 1001)
+        assert "-vf select='not(mod(n,2))',scale=1280:720:flags=bilinear" in cmd
+        assert '-pix_fmt rgb24' in cmd and '-rtsp_transport tcp' in cmd
+
+        stream = FFmpegStream('rtsp://cam', size=parse_size('640x640'))
+
+        assert stream.shape == (360, 640, 3)
+        assert 'scale=640:360:flags=neighbor' in ' '.join(stream.cmd)
+        assert FFmpegStream('rtsp://cam', size=parse_size('5000x5000')).cmd.count('-vf') == 0
+
+    @pytest.mark.parametrize('version, timeout_opt, fps_mode_opt', [((4, 4), '-stimeout', '-vsync'),
+        ((5, 0), '-timeout', '-vsync'), ((5, 1), '-timeout', '-fps_mode'), (None, '-timeout', '-fps_mode')])
+    def test_ffmpeg_version_options(self, monkeypatch, version, timeout_opt, fps_mode_opt):
+        """Options renamed between ffmpeg versions are picked by version, ffprobe gets the same input options as ffmpeg
+        and does not wait longer than the timeout."""
+        calls = []
+
+        def run(cmd, **kwargs):
+            calls.append((cmd, kwargs))
+
+            return subprocess.CompletedProcess(cmd, 0, json.dumps({'streams': [{'width': 640, 'height': 480}]}), '')
+
+        monkeypatch.setattr(video_in.ffmpeg_version, 'version', version, raising=False)
+        monkeypatch.setattr(video_in.subprocess, 'run', run)
+
+        stream         = FFmpegStream('rtsp://cam', step=2, timeout=5)
+        (cmd, kwargs), = calls
+        opts           = ['-rtsp_transport', 'tcp', timeout_opt, '5000000']
+
+        assert kwargs['timeout'] == 5
+        assert ' '.join(opts) in ' '.join(cmd) and ' '.join(opts) in ' '.join(stream.cmd)
+        assert f'{fps_mode_opt} passthrough' in ' '.join(stream.cmd)
+        assert '-rw_timeout 5000000' in ' '.join(FFmpegStream('http://cam/video', timeout=5).cmd)
+
+    def test_ffmpeg_probe_timeout(self, monkeypatch):
+        """A hanging ffprobe is a failed open, which reconnect retries."""
+        def run(cmd, **kwargs):
+            raise subprocess.TimeoutExpired(cmd, kwargs['timeout'])
+
+        monkeypatch.setattr(video_in.subprocess, 'run', run)
+
+        with pytest.raises(RuntimeError, match='timed out'):
+            FFmpegStream.probe('rtsp://cam', 1)
+
+    def test_invalid_options(self, video):
+        """Decoder options are validated and only allowed with decoders which support them."""
+        for bad in ({'decoder': 'gstreamer'}, {'decoder': 'opencv', 'threads': 0}, {'decoder': 'ffmpeg', 'lowres': 4},
+                {'decoder': 'vidgear', 'threads': 2}, {'decoder': 'opencv', 'skip_nonkey': True}):
+            with pytest.raises(ValueError):
+                VideoReader(video, **bad)
+
+        with pytest.raises(ValueError):
+            VideoReader('webcam://0', decoder='ffmpeg')
+
+    def test_source_options(self):
+        """Per-source '!' decoder options are parsed."""
+        config = VideoIn.normalize_config({'sources': 'rtsp://cam!decoder=ffmpeg!threads=4!skip_nonkey!lowres=2',
+            'outputs': 'tcp://*'})
+
+        assert dict(config.sources[0].options) == {'decoder': 'ffmpeg', 'threads': 4, 'skip_nonkey': True, 'lowres': 2}
+
+    def test_step(self, video):
+        """Subsampling a file returns every nth frame and divides the fps."""
+        reader = VideoReader(video, decoder='opencv', sync=True, step=3)
+        reader.start()
+
+        images = list(reader)
+
+        assert reader.fps == 10
+        assert len(images) == 10
+        assert [round(image.mean() / 8) for image in images] == list(range(0, 30, 3))
+
+    def test_step_seek(self, video, monkeypatch):
+        """Large steps seek instead of grabbing."""
+        from openfilter.filter_runtime.filters import video_in
+
+        monkeypatch.setattr(video_in, 'VIDEO_IN_SEEK_MIN', 5)
+
+        reader = VideoReader(video, decoder='opencv', sync=True, step=10)
+        reader.start()
+
+        assert [round(image.mean() / 8) for image in reader] == [0, 10, 20]
+
+    def test_maxfps_grab(self, video):
+        """Frames dropped for maxfps are grabbed but not retrieved."""
+        reader   = VideoReader(video, decoder='opencv', maxfps=10)
+        retrieve = reader.stream.retrieve
+        calls    = []
+        reader.stream.retrieve = lambda: calls.append(1) or retrieve()
+        reader.start()
+
+        images = list(reader)
+
+        assert 0 < len(images) == len(calls) < 20
+
+    def test_prefetch(self, video):
+        """Sync prefetch decodes a bounded number of frames ahead and still delivers every frame in order."""
+        reader = VideoReader(video, decoder='opencv', sync=True, prefetch=8)
+        reader.start()
+        sleep(0.2)
+
+        assert len(reader.deque.deque) == 8
+
+        images = list(reader)
+
+        assert [round(image.mean() / 8) for image in images] == list(range(30))
+
+        with pytest.raises(ValueError):
+            VideoReader(video, sync=True, prefetch=0)
+
+    def test_emit_any(self, video):
+        """With emit 'any' each video comes at its own rate and reading goes on until all have ended."""
+        reader = MultiVideoReader([video, video], [{'decoder': 'opencv', 'maxfps': 10}, {'decoder': 'opencv'}], 'any')
+        reader.start()
+
+        counts = [0, 0]
+
+        for images in reader:
+            for idx in images:
+                counts[idx] += 1
+
+        assert 0 < counts[0] < 15 and counts[1] > 20
+
+    def test_emit_timeout(self, video):
+        """With emit 'timeout:ms' a lagging video is left out of a message once the timeout passes."""
+        reader = MultiVideoReader([video, video], [{'decoder': 'opencv', 'maxfps': 5}, {'decoder': 'opencv'}],
+            'timeout:10')
+        reader.start()
+
+        sizes = [len(images) for images in reader]
+
+        assert 1 in sizes and 2 in sizes
+        assert parse_emit('timeout:50') == 0.05
+
+        for bad in ('some', 'timeout:', 'timeout:-1'):
+            with pytest.raises(ValueError):
+                parse_emit(bad)
@@ -0,0 +1,137 @@
+"""
+Unit tests for automatic reconnect of lost network video streams.
+
+Test ID: TC-UNIT-024
+Description: Tests that a VideoReader on a dropped or stalled stream reconnects with backoff and keeps delivering frames
+    with reconnect metrics, that without reconnect the video ends and that reads can time out while waiting
+Priority: High
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Thread
+from time import sleep, time
+
+import cv2
+import numpy as np
+import pytest
+
+from openfilter.filter_runtime.filters import video_in
+from openfilter.filter_runtime.filters.video_in import MultiVideoReader, VideoIn, VideoReader
+
+
+@pytest.fixture
+def mjpeg_http():
+    """MJPEG server which sends 3 jpgs per connection then drops it, or stalls after them if `stall` is set."""
+
+    jpgs  = [cv2.imencode('.jpg', np.full((48, 64, 3), i * 20, np.uint8))[1].tobytes() for i in range(3)]
+    stall = Event()
+    conns = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            conns.append(self)
+            self.send_response(200)
+            self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=frame')
+            self.end_headers()
+
+            for data in jpgs:
+                self.wfile.write(b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + data + b'\r\n')
+                self.wfile.flush()
+                sleep(0.02)  # so that the reader keeps up and doesn't drop frames to stay realtime
+
+            if stall.is_set():
+                sleep(2)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f'http://127.0.0.1:{server.server_address[1]}/video.mjpg', stall, conns
+
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(video_in, 'VIDEO_IN_BACKOFF_MIN', 0.01)
+    monkeypatch.setattr(video_in, 'VIDEO_IN_BACKOFF_MAX', 0.05)
+
+
+@pytest.mark.unit
+@pytest.mark.pyramid_unit
+class TestVideoReconnect:
+    """Test VideoReader reconnect and timed out reads."""
+
+    def test_reconnect_after_drop(self, mjpeg_http):
+        """Frames keep coming across dropped connections and reconnects are counted."""
+        url, _, conns = mjpeg_http
+        reader        = VideoReader(url, mjpeg=True)
+        reader.start()
+
+        try:
+            frames = [reader.read() for _ in range(7)]
+
+        finally:
+            reader.stop()
+
+        assert all(frame is not None for frame in frames)
+        assert len(conns) >= 3 and reader.reconnects >= 2
+        assert reader.downtime > 0
+
+    def test_reconnect_after_stall(self, mjpeg_http):
+        """A stream which stops delivering frames is considered lost after `stale_timeout`."""
+        url, stall, conns = mjpeg_http
+        stall.set()
+
+        reader = VideoReader(url, mjpeg=True, stale_timeout=0.2)
+        reader.start()
+
+        try:
+            t      = time()
+            frames = [reader.read() for _ in range(4)]
+
+        finally:
+            reader.stop()
+
+        assert all(frame is not None for frame in frames)
+        assert len(conns) == 2 and 0.2 <= time() - t < 1.5
+
+    def test_no_reconnect(self, mjpeg_http):
+        """Without reconnect the video ends when the connection drops."""
+        url, _, conns = mjpeg_http
+        reader        = VideoReader(url, mjpeg=True, reconnect=False)
+        reader.start()
+
+        assert [reader.read() is not None for _ in range(4)] == [True, True, True, False]
+        assert len(conns) == 1 and reader.reconnects == 0 and reader.stopped
+
+    def test_read_timeout(self, mjpeg_http):
+        """Reads time out with nothing while waiting on a stalled stream instead of blocking."""
+        url, stall, _ = mjpeg_http
+        stall.set()
+
+        readers = MultiVideoReader([url], [{'mjpeg': True, 'stale_timeout': 5}])
+        readers.start()
+
+        try:
+            assert [len(readers.read(timeout=1)) for _ in range(3)] == [1, 1, 1]
+
+            t = time()
+
+            assert readers.read(timeout=0.1) == {}
+            assert time() - t < 0.5
+
+        finally:
+            readers.stop()
+
+    def test_reconnect_config(self):
+        config = VideoIn.normalize_config({'sources': 'rtsp://a!no-reconnect!stale_timeout=5, rtsp://b;b',
+            'outputs': 'tcp://*', 'reconnect': True})
+
+        assert config.sources[0].options == {'reconnect': False, 'stale_timeout': 5}
+        assert config.reconnect is True
+
+        with pytest.raises(ValueError):
+            VideoReader('file:///nonexistent.mp4', stale_timeout=0)